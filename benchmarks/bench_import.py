@@ -0,0 +1,62 @@
+"""
+Import time budget : each module is imported in fresh interpreters and the median import time is compared to
+its budget. Exits with status 1 if any budget is exceeded, so it can gate a CI job.
+
+    python benchmarks/bench_import.py --runs 7
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ["pandas", "numpy", "bs4", "requests", "tqdm"]
+
+# module -> budget in seconds, the lightweight entry points must not pull any heavy dependency
+BUDGETS = {
+    "sysyphus": 0.05,
+    "sysyphus.scripts.search": 0.05,
+    "sysyphus.scripts.vocabulary": 0.05,
+    "sysyphus.scripts.metrics": 0.05,
+    "sysyphus.models.boulder": 3.0,
+}
+
+PROBE = """
+import sys
+from time import perf_counter
+t_zero = perf_counter()
+import {module}
+elapsed = perf_counter() - t_zero
+print(elapsed, ",".join(name for name in {heavy} if name in sys.modules))
+"""
+
+
+def measure(module: str, runs: int) -> tuple:
+    """Returns the median import time of `module` over `runs` fresh interpreters and the heavy modules it loaded."""
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        loaded = output[1] if len(output) > 1 else ""
+    return statistics.median(timings), loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = []
+    for module, budget in BUDGETS.items():
+        elapsed, loaded = measure(module=module, runs=args.runs)
+        status = "OK" if elapsed <= budget else "OVER"
+        print(f"{module:<30} {elapsed * 1000:8.1f} ms (budget {budget * 1000:.0f} ms) {status:<4} {loaded}")
+        if status == "OVER":
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"Import time budget exceeded: {', '.join(over_budget)}")
+        sys.exit(1)
@@ -0,0 +1,66 @@
+"""
+Scraping throughput benchmark, run against a local stand-in server so it needs no network access
+and never touches MetBull.
+
+    python benchmarks/bench_scrape.py --pages 200 --latency 0.05 --throttle-rate 0.02
+"""
+import argparse
+import tempfile
+
+from time import perf_counter
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import transport
+from sysyphus.scripts.standin import StandInServer, render_page
+from sysyphus.scripts.user_requests import request_selected
+
+
+METBULL_URL = "https://www.lpi.usra.edu/meteor/metbull.php?code={code}"
+
+
+def build_cassette(directory: str, pages: int) -> list:
+    """Writes `pages` synthetic meteorite pages to a cassette and returns their urls."""
+    cassette = transport.Cassette(directory)
+    urls = []
+    for code in range(pages):
+        url = METBULL_URL.format(code=code)
+        page = render_page(f"Catalina {code}", {
+            "Latitude:": "25°4'51.93\"S", "Longitude:": "69°55'46.79\"W",
+            "Weathering grade:": "W1", "Magnetic suscept.:": "5.26", "Fayalite (mol%):": "18.8±0.3",
+        })
+        cassette.put(url=url, status=200, headers={"Content-Type": "text/html"}, body=page.encode("utf-8"))
+        urls.append(url)
+    return urls
+
+
+def run(urls: list, rate_limiter: int) -> float:
+    meteorites = [
+        Meteorite(name=f"Catalina {i}", year="2019", country="Chile", type="H5", mass="20", url=url)
+        for i, url in enumerate(urls)
+    ]
+    t_zero = perf_counter()
+    request_selected(meteorites=meteorites, rate_limiter=rate_limiter)
+    return perf_counter() - t_zero
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rates", default="1,4,8,25", help="comma separated rate_limiter values")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cassette_dir:
+        urls = build_cassette(directory=cassette_dir, pages=args.pages)
+        server = StandInServer(
+            cassette_dir=cassette_dir, latency=args.latency, error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate, retry_after=0, seed=0,
+        )
+        with server:
+            transport.configure(base_url=server.url, backoff=0.01)
+            for rate_limiter in [int(rate) for rate in args.rates.split(",")]:
+                elapsed = run(urls=urls, rate_limiter=rate_limiter)
+                print(f"rate_limiter={rate_limiter:>2}: {elapsed:.2f}s, {len(urls) / elapsed:.1f} pages/s")
+        print(f"responses by status: {server.hits}")
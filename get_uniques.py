@@ -1,34 +1,23 @@
-import json
-import sysyphus
-
 from time import perf_counter
 
+from sysyphus.scripts import builder, datasets
+
 
-def get_uniques(boulder: sysyphus.Boulder) -> None:
+def get_uniques(df) -> None:
     """
-    Get unique countries and types from the boulder object and save them to a json file.
+    Get unique countries and types from the dataset and save them to a json file.
+    `python -m sysyphus build` writes them along with the dataset it builds.
 
     Args:
-    - boulder: sysyphus.Boulder object
+    - df: the dataset (sy_df), no Boulder is needed
     """
-
-    unique_countries = boulder.sy_df["country"].unique().tolist()
-    unique_types = boulder.sy_df["type"].unique().tolist()
-
-    unique_types = [str(mtype).lower().strip() for mtype in unique_types]
-    unique_countries = [str(country).lower().strip() for country in unique_countries]
-
-    with open("sysyphus/utils/country_validation.json", "w") as f:
-        json.dump(unique_countries, f)
-
-    with open("sysyphus/utils/type_validation.json", "w") as f:
-        json.dump(unique_types, f)
+    builder.write_vocabularies(df, directory="sysyphus/utils")
 
 
 if __name__ == "__main__":
     print("Getting unique countries and types...")
     t_zero = perf_counter()
-    boulder = sysyphus.Boulder()
-    get_uniques(boulder)
+    df, _ = datasets.load()
+    get_uniques(df)
 
     print(f"Time taken: {perf_counter() - t_zero:.2f} seconds")
@@ -6,6 +6,7 @@ setup(
     author="Pierre Sempéré",
     author_email="pierre.sempere.01@gmail.com",
     packages=find_packages(),
+    package_data={"sysyphus": ["utils/*.json"]},
     install_requires=[
         "pandas",
         "numpy",
@@ -13,6 +14,12 @@ setup(
         "requests",
         "tqdm",
     ],
+    extras_require={
+        "arrow": ["pyarrow"],  # parquet outputs, Arrow exports & shared memory
+    },
+    entry_points={
+        "console_scripts": ["sysyphus=sysyphus.__main__:main"],
+    },
     python_requires=">=3.10",
     description="""Structured meteorite data access using MetBull: Query, filter, and analyze with ease.""",
     long_description=open("README.md").read(),
@@ -1,5 +1,18 @@
 # sysyphus/__init__.py
-
-from .models.boulder import Boulder
+# Boulder (and with it pandas, numpy, bs4, requests & tqdm) is only imported on first access,
+# so tools that only need the lightweight modules (search validation, vocabulary, metrics) start fast.
 
 __all__ = ["Boulder"]
+
+
+def __getattr__(name: str):
+    if name == "Boulder":
+        from .models.boulder import Boulder
+
+        globals()["Boulder"] = Boulder
+        return Boulder
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list:
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,48 @@
+import argparse
+
+from sysyphus.models.client import DEFAULT_HOST, DEFAULT_PORT
+
+
+def main(argv: list = None) -> None:
+    """Command line entry point : `sysyphus serve|enrich|build` (or `python -m sysyphus serve|enrich|build`)."""
+    parser = argparse.ArgumentParser(prog="sysyphus", description="Structured meteorite data access using MetBull.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="keep the dataset loaded and answer local queries")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST)
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument("--pickle", action="store_true", help="load the pickle dataset instead of the JSON")
+    serve_parser.add_argument("--scrape-cache", default=None, help="scrape cache sqlite file")
+
+    enrich_parser = commands.add_parser("enrich", help="compile the scrape cache into an enriched bundle")
+    enrich_parser.add_argument("output", help="bundle path, without extension")
+    enrich_parser.add_argument("--scrape-cache", default=None, help="scrape cache sqlite file")
+    enrich_parser.add_argument("--pickle", action="store_true", help="load the pickle dataset instead of the JSON")
+
+    build_parser = commands.add_parser("build", help="build the dataset from the MetBull listing pages")
+    build_parser.add_argument("output", help="datasets directory, the previous build found there is updated")
+    build_parser.add_argument("--version", default=None, help="version of the build, the current month by default")
+    build_parser.add_argument("--page-size", type=int, default=None, help="meteorites per listing page")
+
+    args = parser.parse_args(argv)
+    if args.command == "serve":
+        from sysyphus.scripts.daemon import serve
+
+        serve(host=args.host, port=args.port, use_json=not args.pickle, scrape_cache=args.scrape_cache)
+    elif args.command == "enrich":
+        from sysyphus.scripts import datasets, enriched
+        from sysyphus.scripts.scrape_cache import ScrapeCache
+
+        df, version = datasets.load(use_json=not args.pickle, incremental=True)
+        bundle = enriched.build(records=ScrapeCache(path=args.scrape_cache).items(), df=df, version=version)
+        print(f"enriched bundle: {bundle.save(args.output)} ({len(bundle)} meteorites, dataset {version})")
+    elif args.command == "build":
+        from sysyphus.scripts import builder
+
+        report = builder.build(args.output, version=args.version, page_size=args.page_size or builder.PAGE_SIZE)
+        print(f"dataset {report['version']}: {report['rows']} meteorites, {report['changed_pages']} of "
+              f"{report['pages']} listing pages parsed, delta {report['delta']}")
+
+
+if __name__ == "__main__":
+    main()
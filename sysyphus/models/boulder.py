@@ -1,15 +1,27 @@
 import pandas as pd
 import numpy as np
 
+import hashlib
+import json
+import os
+import time
 import warnings
 
-from sysyphus.scripts import remote_load, search, rendering
+from sysyphus.scripts import classification, datasets, delta, enriched, explain, metrics, remote_load, search
+from sysyphus.scripts import memory, prefetch, rendering
+from sysyphus.scripts import scheduler, snapshot_store, spatial, summaries, tracing, vocabulary, writers
 from sysyphus.scripts import user_requests as u_requests
 from sysyphus.scripts.preprocessing import handle_mass
+from sysyphus.scripts.scrape_cache import ScrapeCache
 
 
 class Boulder:
-    def __init__(self, use_json: bool = True) -> None:
+    def __init__(
+            self, use_json: bool = True, stats: metrics.Stats = None, scrape_cache: ScrapeCache | str = None,
+            incremental: bool = False, shared: bool = True, as_of: str = None,
+            enriched_bundle: enriched.EnrichedBundle | str = None,
+            memory_budget: memory.MemoryBudget | int | str = None, prefetch: bool = False,
+            ) -> None:
         """
         Initializes the Boulder object for streamlined access to meteorite data. This object checks for an internet
         connection and loads the latest meteorite dataset, available as JSON or pickle.
@@ -20,35 +32,109 @@ class Boulder:
         handling and analysis without needing extensive programming knowledge.
 
         Attributes:
-        - sy_df (pd.DataFrame): Holds the meteorite data.
+        - sy_df (pd.DataFrame): Holds the meteorite data, a view of the dataset shared by the Boulders of the process.
         - made_requests (bool): Indicates if detailed data requests have been made.
         - selected_meteorites (pd.DataFrame): Holds the user selection pre request on metbull,
         refine directly for better control
         - met_list (list): Holds the meteorite objects created from the selected_meteorites DataFrame.
         - df_searched (pd.DataFrame): Holds the meteorite properties after requests on metbull have been made.
         It would contain all of the publicly available info on the MetBull for each selected met.
+        - stats (metrics.Stats): Per stage timings (download, dataset_parse, search, make_meteorites, http,
+        page_read, html_parse, extract...) and counters (bytes, retries, cache hits). Pass a
+        `metrics.Stats(track_urls=True)` for per url latencies as well.
+        Register callbacks with `boulder.stats.add_hook(callback)`.
+        - scrape_cache (ScrapeCache): If set, meteorites already scraped are loaded from it instead of requested.
+        - enriched_bundle (EnrichedBundle): If set, properties compiled ahead of time, looked up before the cache.
+        - dataset_version (str | None): Version of the loaded dataset, when known (incremental loading, as_of).
+        - memory (MemoryBudget): Accounts for the memory held by the Boulder, see `memory_usage`.
+        - prefetcher (Prefetcher | None): The background prefetch of the last selection, see `start_prefetch`.
 
         Methods:
         - make_search: Prompts the user for search parameters and returns a filtered DataFrame.
+        - search: Same as make_search, with the parameters passed as arguments instead of prompted.
+        - explain: Reports the filters a search runs, the rows, time and memory of each one (search(profile=True)).
         - validate_selection: Validates and instanciates the selection contained in `self.selected_meteorites`.
+        - make_meteorites: Instanciates the meteorite objects of the selection, without the size check.
         - dump_search: Deletes the attributes `self.selected_meteorites` & `self.meteorite_objects`
         useful for a fresh start and freeing up memory.
         - request_metbull: Uses threading to request all the meteorites in the meteorites list in parallel.
+        - request_chunked: Same for very large selections, by chunks written to disk as they complete.
         - display_search: Collects and displays properties of meteorite objects in a structured format.
         - save_search: Saves the search results to a file in the specified format (CSV by default).
+        - refresh_dataset: Applies the dataset deltas published since the loaded version.
+        - refresh_scraped: Revalidates the scrape cache, only the pages that changed are parsed again.
+        - spatial_search: Meteorites near a location (radius, k nearest, bounding box) among the scraped ones.
+        - summarize: Counts & mass statistics by type, country, year or decade, from precomputed summaries.
+        - to_arrow / share: Arrow Table of the dataset or results, optionally placed in shared memory.
+        - start_trace / stop_trace: Opt-in tracing of every stage, exported as a Chrome trace (Perfetto) file.
+        - memory_usage: Bytes held by the dataset, selection, meteorites, parsed html, results and indexes.
+        - start_prefetch / cancel_prefetch: Fetches the pages of the selection in the background, before requesting.
 
         Prefer JSON for quicker data loading and processing. Boulder serves as the primary tool within the package,
         aimed at facilitating the exploration and analysis of meteorite data.
-        """
 
-        if not remote_load.check_internet_connection():
-            raise ConnectionError("The application has no access to the internet")
-        print("cnx: OK")
-        self.sy_df = remote_load.get_remote_data(as_pd=True, use_json=use_json)
-        self.sy_df["numeric_id"] = self.sy_df["numeric_id"].astype("Int64")
-        self.sy_df["year"] = self.sy_df["year"].astype("Int64")
+        Args:
+        - use_json (bool): load the JSON dataset (default) rather than the pickle
+        - stats (metrics.Stats): share an existing stats object, a new one is created otherwise
+        - scrape_cache (ScrapeCache | str): a scrape cache, or the path of its sqlite file. None (default)
+        requests every page.
+        - incremental (bool): keep a local snapshot of the dataset and only download the monthly row level deltas
+        published since (falls back to a full download when none are available)
+        - shared (bool): use the process wide dataset (see sysyphus.scripts.datasets), loaded by the first Boulder
+        only. Every Boulder gets a copy-on-write view : the selections and results stay per Boulder, and changing
+        one `sy_df` never affects the others. False loads a private copy.
+        - as_of (str): open the dataset as it was at a past version ("2026-03") or date, from the local snapshot
+        store (see sysyphus.scripts.snapshot_store, needs pyarrow) : no download, and never shared. The versions
+        are recorded there as they are loaded with a known version (incremental loading).
+        - enriched_bundle (EnrichedBundle | str): a bundle of pre-scraped properties (see
+        sysyphus.scripts.enriched.build), or the path of its parquet file : the meteorites it holds are served
+        without any request, only the others are scraped.
+        - memory_budget (MemoryBudget | int | str): bytes (or "2GB") the Boulder may hold. Over it, the parsed html
+        trees kept by the meteorites are purged first, then the spatial index, summaries and query report are dropped
+        (rebuilt on next use), then the selection and results are spilled to disk (read back on next access).
+        A memory.MemoryBudget (one per Boulder) gives the policy (soups_first or lru) and spill directory. None
+        (default) only accounts for the memory.
+        - prefetch (bool): after each search, fetch the pages of the selection in the background at low priority
+        (see `start_prefetch`), so request_metbull finds them ready. Off by default, it requests pages that may never
+        be looked at.
+        """
 
-        print("remote content: Loaded")
+        self.stats = stats if stats is not None else metrics.Stats()
+        if isinstance(scrape_cache, str):
+            scrape_cache = ScrapeCache(path=scrape_cache)
+        self.scrape_cache = scrape_cache
+        self.enriched_bundle = enriched.open_bundle(enriched_bundle)
+        self.tracer = None
+        self._summaries = None
+        self._spatial_index = None
+        self.prefetch = prefetch
+        self.prefetcher = None
+        if isinstance(memory_budget, memory.MemoryBudget):
+            self.memory = memory_budget
+        else:
+            self.memory = memory.MemoryBudget(limit=memory_budget)
+        self.track_memory()
+
+        self.shared = shared and as_of is None
+        self.as_of = as_of
+        self.use_json = use_json
+        if as_of is not None:
+            df, self.dataset_version = snapshot_store.open_version(as_of, stats=self.stats)
+            self.sy_df = datasets.prepare(df, stats=self.stats, register=False)  # the other Boulders keep theirs
+            print(f"snapshot {self.dataset_version}: Loaded")
+        else:
+            if not (shared and datasets.is_loaded(use_json)):
+                if not remote_load.check_internet_connection():
+                    raise ConnectionError("The application has no access to the internet")
+                print("cnx: OK")
+            load = datasets.get if shared else datasets.load
+            self.sy_df, self.dataset_version = load(use_json=use_json, incremental=incremental, stats=self.stats)
+            print("remote content: Loaded")
+
+        bundle_version = getattr(self.enriched_bundle, "version", None)
+        if None not in [bundle_version, self.dataset_version] and bundle_version != self.dataset_version:
+            warnings.warn(f"The enriched bundle was built for the dataset {bundle_version}, {self.dataset_version} "
+                          "is loaded : the meteorites changed since are served as they were then")
         self.made_requests = False
 
     def make_search(self, verbose_results: bool = True) -> pd.DataFrame:
@@ -66,30 +152,100 @@ class Boulder:
         search parameters. If no parameters are matched, an empty DataFrame is returned.
         """
 
-        result = self.sy_df.copy(deep=True)
         search_parameters = search.search_prompts()
+        return self.run_search(search_parameters=search_parameters, verbose_results=verbose_results)
+
+    def search(
+            self, name: str = None, numeric_range: int | list = None, country: str = None, mtype: str = None,
+            classification: dict = None, verbose_results: bool = True, profile: bool = False,
+            ) -> pd.DataFrame:
+        """
+        Non interactive `make_search` : same filters and validation as the prompts, passed as arguments.
+
+        Args:
+        - name (str): the character part of the meteorite names (min. 2 chars)
+        - numeric_range (int | list): exact numeric id or [start, end] (inclusive), used with name only
+        - country (str): fall country, case insensitive
+        - mtype (str): meteorite type, case insensitive exact match
+        - classification (dict): parsed type criteria, e.g. {"group": "H"}, {"class": "iron", "group": "IAB"} or
+        {"group": "LL", "petrologic_type": 3, "modifier": "breccia"} (see classification.select)
+        - verbose_results (bool): whether or not to return the dataframe of the results
+        - profile (bool): keep the explain report of the search as `self.query_report` (see `explain`)
+
+        Raises:
+        - ValueError: if a parameter does not pass the validation of the prompts
+        """
+        search_parameters = search.build_parameters(
+            name=name, numeric_range=numeric_range, country=country, mtype=mtype,
+            classification_criteria=classification,
+            )
+        return self.run_search(search_parameters=search_parameters, verbose_results=verbose_results, profile=profile)
+
+    def explain(
+            self, name: str = None, numeric_range: int | list = None, country: str = None, mtype: str = None,
+            classification: dict = None, memory: bool = True,
+            ) -> explain.QueryReport:
+        """
+        Function:
+        - Runs a search (same arguments as `search`) and reports how it was executed, without changing the
+        selection : the filters in order, how each one reached the rows (column scanned, precomputed columns),
+        the rows surviving each one, its wall time and the memory it allocated.
+
+        Args:
+        - memory (bool): trace the allocations (tracemalloc), False for the timings alone
+
+        Returns:
+        - explain.QueryReport: `print(report)` for a summary, `report.to_dict()` / `report.as_frame()` to compare
 
+        Raises:
+        - ValueError: if a parameter does not pass the validation of the prompts
+        """
+        search_parameters = search.build_parameters(
+            name=name, numeric_range=numeric_range, country=country, mtype=mtype,
+            classification_criteria=classification,
+            )
+        report = explain.QueryReport(parameters=search_parameters, dataset=self.describe_dataset(), memory=memory)
+        search.apply_filters(df=self.sy_df, parameters=search_parameters, report=report)
+        return report
+
+    def describe_dataset(self) -> dict:
+        """What a search runs on : rows, version and source of `sy_df`."""
+        if self.shared:
+            source = "shared dataset, loaded once per process"
+        elif self.as_of is not None:
+            source = f"snapshot {self.dataset_version}"
+        else:
+            source = "private copy"
+        return {"rows": len(self.sy_df), "version": self.dataset_version, "source": source}
+
+    def run_search(self, search_parameters: dict, verbose_results: bool = True, profile: bool = False) -> pd.DataFrame:
+        """
+        Applies validated search parameters (see `search.apply_filters`) and keeps the selection. With `profile`,
+        the explain report of the search is kept as `self.query_report`.
+        """
         if len(search_parameters.keys()) < 1:
             raise ValueError("No search parameters provided, please retry.")
 
-        if "namespace" in search_parameters.keys():
-            if "numeric_range" in search_parameters.keys():
-                numeric_range = search_parameters["numeric_range"]
-            else:
-                numeric_range = None
-            result = search.search_by_name(
-                df=result, name_query=search_parameters["namespace"], numeric_range=numeric_range
-                )
-        if "country" in search_parameters.keys():
-            result = search.search_by_country(df=result, query=search_parameters["country"])
-        if "type" in search_parameters.keys():
-            result = search.search_by_type(df=result, query=search_parameters["type"])
+        report = None
+        if profile:
+            report = explain.QueryReport(parameters=search_parameters, dataset=self.describe_dataset())
+        with self.stats.timer("search"):
+            result = search.apply_filters(df=self.sy_df, parameters=search_parameters, report=report)
+        if profile:
+            self.query_report = report
+            self.memory.touch("query_report")
 
         if result.__len__() == 0:
             warnings.warn(
                 message=f"No meteorite found for the requested search parameters:\n{search_parameters}")
         if result.__len__() > 0:
+            self.memory.discard("selected_meteorites")  # a new selection replaces the spilled one
             self.selected_meteorites = result
+            self.memory.touch("selected_meteorites")
+            self.cancel_prefetch()  # prefetching the previous selection is wasted from now on
+            if self.prefetch:
+                self.start_prefetch()
+        self.memory.enforce()
 
         if verbose_results:
             return result
@@ -102,7 +258,8 @@ class Boulder:
         """
         if len(self.selected_meteorites) >= 200:
             warnings.warn(f"You have requested information on {len(self.selected_meteorites)} meteorites. "
-                          "This may stress the server and the app. Proceed?")
+                          "This may stress the server and the app (see request_chunked for large selections). "
+                          "Proceed?")
 
             while True:
                 confirm = input("Enter N|No|Blank to abort, Y|Yes to proceed: ").lower().strip()
@@ -111,19 +268,26 @@ class Boulder:
                     warnings.warn("Search halted. Reduce dataset size or allow potentially slow requests.")
                     break
                 elif confirm in ["y", "yes"]:
-                    self.met_list = u_requests.make_meteorites(selected_meteorites=self.selected_meteorites)
+                    self.make_meteorites()
                     print("Meteorite objects created and ready to request.")
                     return
                 else:
                     print("Invalid input. Please enter Y|Yes to proceed or N|No|Blank to abort.")
 
-        self.met_list = u_requests.make_meteorites(selected_meteorites=self.selected_meteorites)
+        self.make_meteorites()
+
+    def make_meteorites(self):
+        """Instanciates `self.met_list` from `self.selected_meteorites`, the objects share the Boulder stats."""
+        with self.stats.timer("make_meteorites", rows=len(self.selected_meteorites)):
+            self.met_list = u_requests.make_meteorites(selected_meteorites=self.selected_meteorites, stats=self.stats)
 
     def dump_search(self):
         """
         Deletes the attributes `self.selected_meteorites` & `self.meteorite_objects` - useful for a fresh start
         and freeing up memory. Error handling will skip the non initialized attributes.
         """
+        self.memory.discard("selected_meteorites")
+        self.cancel_prefetch()
         try:
             del self.selected_meteorites
         except AttributeError:
@@ -136,7 +300,7 @@ class Boulder:
 
         self.made_requests = False
 
-    def request_metbull(self, rate_limiter: int = 25) -> None:
+    def request_metbull(self, rate_limiter: int = 25, on_result: callable = None, priority: str | int = None) -> None:
         """
         Function:
             Uses threading to request all the meteorites in the meteorites list in parallel.
@@ -147,6 +311,11 @@ class Boulder:
 
         Args:
         - rate_limiter : maximum concurrent requests (hard ceilling set to 25)
+        - on_result : called with each meteorite as soon as it is scraped (or loaded from the scrape cache),
+        e.g. `writers.ResultWriter(...).add` to stream the results to disk by batches
+        - priority : interactive, normal or bulk (or an int, lower first). Every Boulder and job of the process
+        shares one budget of concurrent requests (see sysyphus.scripts.scheduler), interactive requests go before
+        bulk ones. None (default) : interactive up to 50 meteorites, bulk above
         """
 
         if not isinstance(rate_limiter, int):
@@ -163,8 +332,138 @@ class Boulder:
         if rate_limiter > len(self.met_list):
             rate_limiter = len(self.met_list)  # limiter not higher than total search : no extra threads
 
-        u_requests.request_selected(meteorites=self.met_list, rate_limiter=rate_limiter)
+        if self.prefetcher is not None:
+            # Hand off : what is left is requested at the priority of the user, the pages in flight move up to it
+            in_flight_priority = priority if priority is not None else scheduler.default_priority(len(self.met_list))
+            self.prefetcher.cancel(priority=in_flight_priority)
+        with self.stats.timer("scrape", meteorites=len(self.met_list), rate_limiter=rate_limiter):
+            u_requests.request_cached(
+                meteorites=self.met_list, rate_limiter=rate_limiter, cache=self.scrape_cache, stats=self.stats,
+                on_result=on_result, bundle=self.enriched_bundle, priority=priority, job_name="request_metbull",
+                prefetched=self.prefetcher,
+                )
         self.made_requests = True
+        self._spatial_index = None  # New coordinates
+        self.memory.enforce()
+
+    def request_chunked(
+            self, directory: str, chunk_size: int = 1000, rate_limiter: int = 25, file_format: str = "parquet",
+            compression: str | None = None, partition_cols: list = None, ommit: list = [], resume: bool = True,
+            priority: str | int = "bulk",
+            ) -> list:
+        """
+        Function:
+        - Requests the whole selection by chunks of `chunk_size` meteorites : the objects of a chunk are created,
+        scraped (or served by the bundle / scrape cache), written to `directory` and released before the next chunk,
+        so memory stays the same whatever the size of the selection (e.g. every meteorite of a country).
+        - The results are not kept as `df_searched`, read them back from `directory` (e.g. pd.read_parquet or
+        writers.read_partitioned). The progress is saved after each chunk : with `resume`, a run interrupted
+        with the same selection (same urls, in the same order) and chunk size continues after the last chunk
+        written. A chunk written but not recorded yet is written again : part files are replaced, partitioned
+        outputs are upserted on the meteorite name.
+
+        Args:
+        - directory (str): where the chunks are written, one part file per chunk (part-00000...)
+        - chunk_size (int): meteorites per chunk
+        - rate_limiter (int): maximum concurrent requests (hard ceilling set to 25)
+        - file_format (str): format of the part files, parquet is required with `partition_cols`
+        - compression (str): codec, see writers.COMPRESSIONS
+        - partition_cols (list): if set, chunks are added to a partitioned dataset instead (see writers.ResultWriter)
+        - ommit (list): properties left out, like display_search
+        - resume (bool): continue an interrupted run in `directory` instead of starting over
+        - priority (str | int): scheduling of the requests, bulk by default (see request_metbull)
+
+        Returns:
+        - list: the paths of the files written by this run
+
+        Raises:
+        - AttributeError: if there is no selection
+        - ValueError: if `directory` holds the progress of another selection or chunk size
+        """
+        if not hasattr(self, "selected_meteorites"):
+            raise AttributeError("No selection to request. Please perform a search first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size should be at least 1")
+
+        total = len(self.selected_meteorites)
+        chunks = -(-total // chunk_size)
+        progress_path = os.path.join(directory, "_progress.json")
+        urls = pd.util.hash_pandas_object(self.selected_meteorites["URL"], index=False).to_numpy()
+        selection = hashlib.sha256(urls.tobytes()).hexdigest()
+        progress = {"rows": total, "chunk_size": chunk_size, "selection": selection, "chunks_done": 0}
+        if resume and os.path.exists(progress_path):
+            with open(progress_path, mode="r") as file:
+                saved = json.load(file)
+            if (saved["rows"], saved["chunk_size"], saved.get("selection")) != (total, chunk_size, selection):
+                raise ValueError(f"{directory} holds the progress of another selection or chunk size, "
+                                 "use another directory or resume=False")
+            progress = saved
+
+        if self.prefetcher is not None:
+            self.prefetcher.cancel(priority=priority)
+        writer = writers.ResultWriter(
+            directory=directory, file_format=file_format, partition_cols=partition_cols, compression=compression,
+            batch_size=chunk_size, ommit=ommit, first_part=progress["chunks_done"],
+            mode="upsert" if partition_cols else "append",  # a chunk replayed on resume must not add its rows twice
+            )
+        for chunk in range(progress["chunks_done"], chunks):
+            rows = self.selected_meteorites.iloc[chunk * chunk_size:(chunk + 1) * chunk_size]
+            with self.stats.timer("chunk", chunk=chunk, rows=len(rows)):
+                meteorites = u_requests.make_meteorites(selected_meteorites=rows, stats=self.stats)
+                u_requests.request_cached(
+                    meteorites=meteorites, rate_limiter=min(rate_limiter, len(meteorites)), cache=self.scrape_cache,
+                    stats=self.stats, on_result=writer.add, bundle=self.enriched_bundle, priority=priority,
+                    job_name="request_chunked", prefetched=self.prefetcher,
+                    )
+                writer.flush()
+                del meteorites
+
+            progress["chunks_done"] = chunk + 1
+            with writers.atomic_path(progress_path) as tmp_path:
+                with open(tmp_path, mode="w") as file:
+                    json.dump(progress, file)
+        return writer.written
+
+    def start_prefetch(
+            self, rate_limiter: int = prefetch.DEFAULT_WORKERS, limit: int = prefetch.DEFAULT_LIMIT,
+            ) -> prefetch.Prefetcher:
+        """
+        Function:
+        - Fetches the pages of the selection in the background (see sysyphus.scripts.prefetch), while the results
+        are looked at : a low priority job of the shared request budget, any other request goes first. The pages
+        served by the enriched bundle or the scrape cache are skipped, the ones prefetched are added to the cache.
+        - request_metbull then loads the meteorites prefetched, joins the requests still running and cancels the
+        rest. A new search or dump_search cancels the prefetch.
+
+        Args:
+        - rate_limiter (int): concurrent prefetch requests
+        - limit (int): only the first `limit` meteorites of the selection are prefetched, a larger selection is a
+        sweep better left to request_chunked
+
+        Returns:
+        - Prefetcher: the prefetch started, also kept as `self.prefetcher`
+
+        Raises:
+        - AttributeError: if there is no selection
+        """
+        if not hasattr(self, "selected_meteorites"):
+            raise AttributeError("No selection to prefetch. Please perform a search first.")
+        self.cancel_prefetch()
+        selection = self.selected_meteorites.head(limit)
+        meteorites = u_requests.make_meteorites(selected_meteorites=selection, stats=self.stats)
+        for source in [self.enriched_bundle, self.scrape_cache]:
+            if source is not None:
+                meteorites = source.hydrate(meteorites)
+        self.prefetcher = prefetch.Prefetcher(
+            meteorites=meteorites, cache=self.scrape_cache, rate_limiter=rate_limiter, stats=self.stats,
+            )
+        return self.prefetcher
+
+    def cancel_prefetch(self) -> None:
+        """Stops the background prefetch, if any, the pages already prefetched are kept in the scrape cache."""
+        if self.prefetcher is not None:
+            self.prefetcher.cancel()
+            self.prefetcher = None
 
     def display_search(self, ommit: list = [], as_pandas: bool = True) -> pd.DataFrame | dict:
         """
@@ -184,13 +483,18 @@ class Boulder:
         """
 
         if hasattr(self, "met_list") and self.made_requests:
-            self.df_searched = rendering.show_properties(meteorite_list=self.met_list, as_pd=as_pandas, ommit=ommit)
+            with self.stats.timer("render"):
+                self.df_searched = rendering.show_properties(meteorite_list=self.met_list, as_pd=as_pandas, ommit=ommit)
             self.df_searched["mass"] = self.df_searched["mass"].apply(handle_mass)
             try:
                 self.df_searched["mass"] = self.df_searched["mass"].astype(np.float32)
             except AttributeError:
                 pass
-            return self.df_searched
+            result = self.df_searched
+            self.memory.discard("df_searched")
+            self.memory.touch("df_searched")
+            self.memory.enforce()
+            return result
         elif hasattr(self, "met_list") and not self.made_requests:
             warnings.warn(message="Selection made but no requests have been made on metbull server")
 
@@ -210,11 +514,17 @@ class Boulder:
             err_message = "No search & selection were made - use this method once selection and obj. creation are made"
             raise AttributeError(err_message)
 
-    def save_search(self, filepath: str, file_format: str = "csv") -> None:
+    def save_search(
+            self, filepath: str, file_format: str = "csv", compression: str | None = None,
+            partition_cols: list = None, mode: str = "overwrite", key: str = "name",
+            ) -> str | list:
         """
         Function:
         - Saves the search results to a file in the specified format (CSV by default).
-        - The file is saved in the specified location with the specified name.
+        - The file is saved in the specified location with the specified name, atomically : an existing file is
+        only replaced once the new one is complete.
+        - With `partition_cols`, the results are saved as a parquet dataset partitioned by these columns
+        (see sysyphus.scripts.writers.save_partitioned), `filepath` being its root directory.
 
         Supported formats : csv, pickle, json, parquet
 
@@ -222,9 +532,17 @@ class Boulder:
         - filepath (str): The path to the directory where the file should be saved.
         - file_format (str): The format in which the file should be saved. Default is "csv".
         Options are csv, pickle, json & parquet.
+        - compression (str): codec (gzip, bz2, zip, xz, zstd, + snappy, brotli & lz4 for parquet), None by default
+        - partition_cols (list): e.g. ["fall_country", "type", "fall_year"], parquet only
+        - mode (str): overwrite (default), append or upsert into the existing file or dataset
+        - key (str): column identifying a meteorite for upserts, the name by default
 
         Returns:
-        - None
+        - str | list: the path of the saved file, or the list of files written for a partitioned dataset
+
+        Raises:
+        - ValueError: invalid format, compression, mode or partitioning
+        - OSError: the file could not be written
         """
 
         if not hasattr(self, "df_searched"):
@@ -233,18 +551,327 @@ class Boulder:
         if file_format not in ["csv", "pickle", "json", "parquet"]:
             raise ValueError(f"Invalid file format '{file_format}'. Options are csv, pickle, json & parquet.")
 
-        try:
-            if file_format == "csv":
-                self.df_searched.to_csv(f"{filepath}.csv", index=True)
-            elif file_format == "pickle":
-                self.df_searched.to_pickle(f"{filepath}.pkl")
-            elif file_format == "json":
-                self.df_searched.to_json(f"{filepath}.json", orient="records", lines=True)
-            elif file_format == "parquet":
-                self.df_searched.to_parquet(f"{filepath}.parquet")
-            print(f"file saved as {file_format} at {filepath}")
-        except Exception as e:
-            print(f"An error occurred while saving the file: {e}")
+        if partition_cols:
+            if file_format != "parquet":
+                raise ValueError("Partitioned outputs are only available with the parquet format")
+            written = writers.save_partitioned(
+                self.df_searched, directory=filepath, partition_cols=partition_cols,
+                compression=compression or "snappy", mode=mode, key=key,
+            )
+            print(f"{len(written)} partition file(s) saved at {filepath}")
+            return written
+
+        written = writers.save(
+            self.df_searched, filepath=filepath, file_format=file_format, compression=compression, mode=mode, key=key
+        )
+        print(f"file saved as {file_format} at {filepath}")
+        return written
+
+    def refresh_dataset(self) -> dict:
+        """
+        Function:
+        - Brings `sy_df` to the latest published version by applying the row level deltas published since
+        `dataset_version`, and updates what depends on it incrementally : the validation vocabularies get the new
+        terms, and the scrape cache drops the meteorites that changed. Falls back to a full reload when no chain
+        of deltas leads from the loaded version.
+
+        Returns:
+        - dict: the new version and the number of added, changed & removed rows (None if fully reloaded)
+        """
+        manifest = remote_load.fetch_manifest()
+        if manifest is None:
+            raise ConnectionError("No dataset manifest available, the dataset cannot be refreshed incrementally")
+        if manifest["version"] == self.dataset_version:
+            return {"version": self.dataset_version, "added": 0, "changed": 0, "removed": 0}
+
+        deltas = None
+        if self.dataset_version is not None:
+            deltas = remote_load.fetch_deltas(manifest=manifest, version=self.dataset_version, stats=self.stats)
+
+        self._summaries = None
+        self._spatial_index = None  # Removed and changed meteorites
+        if deltas is None:
+            warnings.warn("No delta chain from the loaded version, reloading the whole dataset")
+            self.sy_df, self.dataset_version = datasets.load(use_json=self.use_json, incremental=True, stats=self.stats)
+            if self.shared:
+                datasets.publish(df=self.sy_df, version=self.dataset_version, use_json=self.use_json)
+            return {"version": self.dataset_version, "added": None, "changed": None, "removed": None}
+
+        summary = {"version": manifest["version"], "added": 0, "changed": 0, "removed": 0}
+        with self.stats.timer("delta_apply", deltas=len(deltas)):
+            for row_delta in deltas:
+                self.sy_df = delta.apply_delta(classification.drop_columns(self.sy_df), row_delta)
+                vocabulary.update_dataset(row_delta["added"])
+                vocabulary.update_dataset(row_delta["changed"])
+                for source in [self.scrape_cache, self.enriched_bundle]:
+                    if source is not None:
+                        source.discard(delta.touched_urls(row_delta))
+                for part in ["added", "changed", "removed"]:
+                    summary[part] += len(row_delta[part])
+
+        self.sy_df = classification.add_columns(self.sy_df)
+        base = classification.drop_columns(self.sy_df)
+        remote_load.save_snapshot(base, version=manifest["version"])
+        snapshot_store.record(base, version=manifest["version"], stats=self.stats)
+        self.dataset_version = manifest["version"]
+        if self.shared:
+            datasets.publish(df=self.sy_df, version=self.dataset_version, use_json=self.use_json)
+        return summary
+
+    def refresh_scraped(
+            self, max_age_days: float = None, rate_limiter: int = 25, priority: str | int = "bulk",
+            ) -> dict:
+        """
+        Function:
+        - Refreshes the pages of the scrape cache, for the meteorites of the dataset : each page is requested
+        conditionally (ETag / Last-Modified kept in the cache) and only parsed again when it changed, a 304 or a page
+        hashing to the cached content costs no parsing at all. The changed meteorites are dropped from the
+        enriched bundle, if any, so that the refreshed properties are served.
+
+        Args:
+        - max_age_days (float): only refresh the pages fetched more than `max_age_days` ago, all of them if None
+        - rate_limiter (int): maximum concurrent requests (hard ceilling set to 25)
+        - priority (str | int): scheduling of the requests, bulk by default (see request_metbull)
+
+        Returns:
+        - dict: refreshed, changed (urls), unchanged & failed, see user_requests.refresh_cached
+
+        Raises:
+        - AttributeError: if the Boulder has no scrape cache
+        """
+        if self.scrape_cache is None:
+            raise AttributeError("No scrape cache to refresh, create the Boulder with scrape_cache=...")
+        fetched_before = None if max_age_days is None else time.time() - max_age_days * 86400
+        urls = self.scrape_cache.urls(fetched_before=fetched_before)
+        rows = self.sy_df[self.sy_df["URL"].isin(urls)].drop_duplicates("URL")
+        with self.stats.timer("scrape_refresh", meteorites=len(rows)):
+            meteorites = u_requests.make_meteorites(selected_meteorites=rows, stats=self.stats)
+            summary = u_requests.refresh_cached(
+                meteorites=meteorites, cache=self.scrape_cache, rate_limiter=rate_limiter, stats=self.stats,
+                priority=priority, job_name="refresh_scraped",
+                )
+        if self.enriched_bundle is not None:
+            self.enriched_bundle.discard(summary["changed"])
+        self._spatial_index = None  # New coordinates
+        return summary
+
+    def get_spatial_index(self) -> spatial.SpatialIndex:
+        """
+        Returns the spatial index over the coordinates scraped so far : the enriched bundle and the scrape cache, if
+        any, and the current selection once requested. Built on first use and after each request_metbull.
+        """
+        if self._spatial_index is None:
+            with self.stats.timer("spatial_index"):
+                records = self.enriched_bundle.records() if self.enriched_bundle is not None else {}
+                if self.scrape_cache is not None:
+                    records |= self.scrape_cache.items()
+                for meteorite in getattr(self, "met_list", []):
+                    if meteorite.extracted:
+                        records[meteorite.url] = meteorite.to_record()
+                self._spatial_index = spatial.SpatialIndex.from_records(records)
+        index = self._spatial_index
+        self.memory.touch("_spatial_index")
+        self.memory.enforce()
+        return index
+
+    def spatial_search(
+            self, latitude: float = None, longitude: float = None, radius_km: float = None, k: int = None,
+            bbox: tuple = None, name: str = None, numeric_range: list = None, country: str = None, mtype: str = None,
+            classification: dict = None,
+            ) -> pd.DataFrame:
+        """
+        Function:
+        - Finds the scraped meteorites within `radius_km` of a location, the `k` closest to it, or the ones inside
+        `bbox`, optionally combined with the usual search filters. Only meteorites whose coordinates were scraped
+        (scrape cache or current selection) can be found.
+
+        Args:
+        - latitude, longitude (float): decimal degrees, for radius and k nearest queries
+        - radius_km (float): distance from the location
+        - k (int): number of closest meteorites
+        - bbox (tuple): (min_lat, min_lon, max_lat, max_lon)
+        - name, numeric_range, country, mtype, classification: same filters as `search`
+
+        Returns:
+        - pd.DataFrame: the matching sy_df rows with their latitude & longitude (and distance_km), closest first
+        """
+        if sum(query is not None for query in [radius_km, k, bbox]) != 1:
+            raise ValueError("Give exactly one of radius_km, k or bbox")
+        if bbox is None and (latitude is None or longitude is None):
+            raise ValueError("radius_km and k queries need a latitude and a longitude")
+
+        parameters = search.build_parameters(
+            name=name, numeric_range=numeric_range, country=country, mtype=mtype,
+            classification_criteria=classification,
+            )
+        index = self.get_spatial_index()
+
+        def matching(hits: pd.DataFrame) -> pd.DataFrame:
+            rows = self.sy_df[self.sy_df["URL"].isin(hits.index)]
+            if parameters:
+                rows = search.apply_filters(df=rows, parameters=parameters)
+            rows = rows.merge(hits, left_on="URL", right_index=True)
+            return rows.sort_values("distance_km", kind="stable") if "distance_km" in rows.columns else rows
+
+        with self.stats.timer("spatial_search"):
+            if radius_km is not None:
+                return matching(index.radius(latitude, longitude, radius_km))
+            if bbox is not None:
+                return matching(index.bbox(*bbox))
+
+            candidates = k
+            while True:  # filters may reject some of the closest, widen until k match
+                hits = index.nearest(latitude, longitude, candidates)
+                result = matching(hits)
+                if len(result) >= k or len(hits) < candidates:
+                    return result.head(k)
+                candidates *= 4
+
+    def get_summaries(self) -> summaries.Summaries:
+        """
+        Returns the precomputed aggregates of the loaded dataset version (counts, mass quantiles, year histograms,
+        type by country cross-tab), built once per version and persisted next to the dataset snapshot.
+        """
+        if self._summaries is None:
+            self._summaries = summaries.get(df=self.sy_df, version=self.dataset_version, stats=self.stats)
+        tables = self._summaries
+        self.memory.touch("_summaries")
+        self.memory.enforce()
+        return tables
+
+    def summarize(self, by: str | list = "type", filters: dict = None, quantiles: bool = False) -> pd.DataFrame:
+        """
+        Function:
+        - Count and mass statistics of the dataset grouped by `by`, e.g. summarize("decade", {"country": "Oman"}).
+        Answered from the precomputed summaries whenever possible, see summaries.Summaries.query.
+
+        Args:
+        - by (str | list): one or several of type, country, year, decade
+        - filters (dict): column -> value or list of values
+        - quantiles (bool): include the mass quantiles (always available for unfiltered single dimensions)
+
+        Returns:
+        - pd.DataFrame: one row per group
+        """
+        with self.stats.timer("summarize"):
+            return self.get_summaries().query(by=by, filters=filters, quantiles=quantiles)
+
+    def to_arrow(self, results: bool = False):
+        """
+        Function:
+        - Returns the dataset (or the search results) as a pyarrow Table, to hand over to other processes or
+        libraries without pickling. Write it with arrow_io.write_ipc to get a file other processes can memory map.
+        Requires pyarrow.
+
+        Args:
+        - results (bool): export `df_searched` instead of `sy_df`
+
+        Returns:
+        - pa.Table
+        """
+        from sysyphus.scripts import arrow_io
+
+        return arrow_io.to_arrow(self._export_frame(results))
+
+    def share(self, results: bool = False, name: str = None):
+        """
+        Function:
+        - Places the dataset (or the search results) in a shared memory block : worker processes attach to it with
+        `arrow_io.attach(shared.name)` and read the same buffers, no copy nor parsing. Requires pyarrow.
+
+        Args:
+        - results (bool): share `df_searched` instead of `sy_df`
+        - name (str): name of the block, random by default
+
+        Returns:
+        - arrow_io.SharedTable: close it (or use it as a context manager) to free the block
+        """
+        from sysyphus.scripts import arrow_io
+
+        return arrow_io.share(self._export_frame(results), name=name)
+
+    def _export_frame(self, results: bool) -> pd.DataFrame:
+        if not results:
+            return self.sy_df
+        if not hasattr(self, "df_searched"):
+            raise AttributeError("No search results to export. Please perform a search and display the results first.")
+        return self.df_searched
+
+    def start_trace(self) -> tracing.Tracer:
+        """
+        Starts recording every stage of the following operations (searches, object creation, each page's
+        queue wait, download, parse and extraction) as spans. A running trace is kept, not restarted.
+
+        Returns:
+        - the tracing.Tracer collecting the spans
+        """
+        if self.tracer is None:
+            self.tracer = tracing.Tracer().attach(self.stats)
+        return self.tracer
+
+    def stop_trace(self, filepath: str = None) -> tracing.Tracer:
+        """
+        Stops the trace started with `start_trace` and writes it to `filepath` (Chrome trace JSON) if given.
+
+        Returns:
+        - the tracing.Tracer holding the collected spans
+        """
+        if self.tracer is None:
+            raise AttributeError("No trace running, use start_trace first")
+        tracer = self.tracer
+        tracer.detach(self.stats)
+        self.tracer = None
+        if filepath is not None:
+            tracer.export(filepath)
+            print(f"trace saved at {filepath}")
+        return tracer
+
+    def track_memory(self) -> None:
+        """Registers what the Boulder holds with its memory budget, see `memory_usage`."""
+        self.memory.track_attribute(self, "sy_df", "pinned")
+        self.memory.track("meteorites", "pinned", self.meteorites_size)
+        self.memory.track(
+            "enriched_bundle", "pinned",
+            lambda seen: memory.object_size(getattr(self.enriched_bundle, "frame", None), seen),
+            )
+        self.memory.track("soups", "soups", self.soups_size, evict=self.purge_soups)
+        for attr in ["_spatial_index", "_summaries", "query_report"]:
+            self.memory.track_attribute(self, attr, "cache")
+        for attr in ["selected_meteorites", "df_searched"]:
+            self.memory.track_attribute(self, attr, "spill")
+
+    def meteorites_size(self, seen: set) -> int:
+        """Meteorite objects of the selection, their parsed html and shared stats left out."""
+        return sum(
+            memory.object_size({key: value for key, value in vars(meteorite).items()
+                                if key not in ["table_soup", "stats"]}, seen)
+            for meteorite in self.__dict__.get("met_list", [])
+        )
+
+    def soups_size(self, seen: set) -> int:
+        return sum(memory.soup_size(meteorite) for meteorite in self.__dict__.get("met_list", []))
+
+    def purge_soups(self) -> None:
+        """Frees the parsed html kept by the meteorites (extract_properties(purge_after=False))."""
+        for meteorite in self.__dict__.get("met_list", []):
+            meteorite.table_soup = None
+            meteorite.soup_bytes = 0
+
+    def memory_usage(self) -> dict:
+        """
+        Returns:
+        - dict: limit, total & usage (bytes by entry : sy_df, meteorites, soups, selected_meteorites, df_searched,
+        indexes...), policy, the entries spilled to disk and the evictions so far. sy_df is counted whole, although
+        its data is shared with the other Boulders of the process.
+        """
+        return self.memory.summary()
+
+    def __getattr__(self, name: str):
+        """Reads back the attributes spilled to disk by the memory budget (selection, results) on first access."""
+        memory_budget = self.__dict__.get("memory")
+        if memory_budget is not None and memory_budget.is_spilled(name):
+            return memory_budget.restore(name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 
     def __repr__(self) -> str:
         return f"Boulder(sy_df={self.sy_df.shape})"
@@ -0,0 +1,126 @@
+import json
+import urllib.error
+import urllib.request
+import warnings
+
+from sysyphus.scripts import search
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8642
+
+
+class BoulderClient:
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 600) -> None:
+        """
+        Thin client of a running `sysyphus serve` daemon, mirroring the Boulder methods. The dataset stays loaded
+        in the daemon, so creating a client costs nothing and each query takes milliseconds.
+        Only the standard library is needed to talk to the daemon, pandas is imported to build the DataFrames.
+
+        Attributes:
+        - selected_meteorites (pd.DataFrame): the last search results, refine it like Boulder's
+        - df_searched (pd.DataFrame): the properties returned by request_metbull / display_search
+
+        Methods:
+        - make_search / search / request_metbull / display_search / dump_search: same as Boulder
+        - health: the daemon status (dataset rows, cached pages)
+
+        Args:
+        - url (str): base url of the daemon
+        - timeout (float): seconds before a query is abandoned (scraping large selections takes a while)
+        """
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.made_requests = False
+
+    def _call(self, method: str, endpoint: str, payload: dict = None) -> dict:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(
+            f"{self.url}{endpoint}", data=data, method=method, headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            message = json.loads(e.read() or b"{}").get("error", e.reason)
+            if e.code == 400:
+                raise ValueError(message) from None
+            raise RuntimeError(f"sysyphus daemon error ({e.code}): {message}") from None
+        except urllib.error.URLError as e:
+            raise ConnectionError(f"sysyphus daemon not reachable at {self.url}: {e.reason}") from None
+
+    @staticmethod
+    def _frame(rows: list, index: str = None):
+        import pandas as pd
+
+        df = pd.DataFrame(rows)
+        if "coordinates" in df.columns:
+            df["coordinates"] = df["coordinates"].apply(lambda value: tuple(value) if value is not None else None)
+        if index is not None and index in df.columns:
+            df = df.set_index(index)
+        return df
+
+    def health(self) -> dict:
+        return self._call("GET", "/health")
+
+    def make_search(self, verbose_results: bool = True):
+        """Prompts for the search parameters locally, the search itself runs in the daemon."""
+        parameters = search.search_prompts()
+        return self.search(
+            name=parameters.get("namespace"), numeric_range=parameters.get("numeric_range"),
+            country=parameters.get("country"), mtype=parameters.get("type"), verbose_results=verbose_results,
+        )
+
+    def search(
+            self, name: str = None, numeric_range: int | list = None, country: str = None, mtype: str = None,
+            classification: dict = None, verbose_results: bool = True,
+            ):
+        """See Boulder.search."""
+        payload = {
+            "name": name, "numeric_range": numeric_range, "country": country, "mtype": mtype,
+            "classification": classification,
+        }
+        result = self._frame(self._call("POST", "/search", payload)["rows"])
+
+        if len(result) == 0:
+            warnings.warn(message=f"No meteorite found for the requested search parameters:\n{payload}")
+        else:
+            self.selected_meteorites = result
+            self.made_requests = False
+
+        if verbose_results:
+            return result
+
+    def request_metbull(self, rate_limiter: int = 25) -> None:
+        """Has the daemon scrape the current selection (cached pages are not requested again)."""
+        if not hasattr(self, "selected_meteorites"):
+            raise AttributeError("No search & selection were made - use this method once a selection is made")
+        payload = {"urls": self.selected_meteorites["URL"].tolist(), "rate_limiter": int(rate_limiter)}
+        self.df_searched = self._frame(self._call("POST", "/scrape", payload)["rows"], index="name")
+        self.made_requests = True
+
+    def display_search(self, ommit: list = [], as_pandas: bool = True):
+        """
+        Returns the properties of the selection from the daemon's scrape cache (no request is made), see
+        Boulder.display_search. Meteorites missing from the cache are reported with a warning.
+        """
+        if not hasattr(self, "selected_meteorites"):
+            raise AttributeError("No search & selection were made - use this method once a selection is made")
+        payload = {"urls": self.selected_meteorites["URL"].tolist(), "ommit": ommit}
+        response = self._call("POST", "/render", payload)
+        if response["missing"]:
+            warnings.warn(f"{len(response['missing'])} meteorites are not scraped yet, use request_metbull")
+
+        self.df_searched = self._frame(response["rows"], index="name")
+        if as_pandas:
+            return self.df_searched
+        return self.df_searched.reset_index().to_dict(orient="list")
+
+    def dump_search(self) -> None:
+        for attribute in ["selected_meteorites", "df_searched"]:
+            if hasattr(self, attribute):
+                delattr(self, attribute)
+        self.made_requests = False
+
+    def __repr__(self) -> str:
+        return f"BoulderClient(url={self.url})"
@@ -1,18 +1,114 @@
 import re
 import requests
 import gc
+import hashlib
 
 import numpy as np
 import pandas as pd
 
-from bs4 import BeautifulSoup
+from sysyphus.scripts import html_stream, metrics, transport
+from sysyphus.scripts.metrics import Stats
 from sysyphus.scripts.preprocessing import handle_coordinates, remove_uncertainty
+from sysyphus.scripts.singleflight import SingleFlight
+
+
+# Attributes filled by `extract_properties`, i.e. what a scrape cache has to keep to rebuild a meteorite
+SCRAPED_ATTRIBUTES = [
+    "latitude", "longitude", "mass", "weathering_g", "mag_sus", "fs_content", "wo_content", "fa_content",
+    "tsm", "pieces", "type_spec_loc", "shock_stage", "coordinates",
+]
+
+pages_in_flight = SingleFlight()  # Coalesces the concurrent requests of a same page
+
+
+VALIDATORS = ["etag", "last_modified", "content_hash"]  # What a scrape cache keeps to revalidate a page
+
+
+def conditional_headers(validators: dict = None) -> dict:
+    """If-None-Match / If-Modified-Since headers from the validators of a cached page, the server answers a 304."""
+    headers = {}
+    if validators and validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators and validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    return headers
+
+
+def fetch_page(url: str, stats: Stats = None, validators: dict = None) -> dict:
+    """
+    Function:
+    - Requests a meteorite page and finds the td holding its properties (next to the "Data from:" cell). The page
+    is streamed and only read up to the end of its maintable.
+    - With the `validators` of a cached copy, the request is conditional and nothing is parsed when the page did not
+    change : the server answered 304 ("not_modified" counter) or the bytes read hash to the cached content_hash
+    ("unchanged_pages" counter).
+
+    Args:
+    - url (str): the meteorite page
+    - stats (Stats): records the page_read & html_parse stages and the counters
+    - validators (dict): etag, last_modified & content_hash of the cached copy, if any
+
+    Returns:
+    - dict: table (the td, None if the page could not be fetched, has no such table, or is unchanged), unchanged
+    (bool), bytes (of the page read) and the validators of the page (the cached ones on a 304)
+    """
+    from bs4 import BeautifulSoup  # Deferred, creating and reading meteorites does not need it
+
+    page = {"table": None, "unchanged": False, "bytes": 0} | {key: None for key in VALIDATORS}
+    try:
+        r = transport.fetch(url=url, headers=conditional_headers(validators), stream=True, stats=stats)
+        if r.status_code == 304:
+            r.close()
+            if stats is not None:
+                stats.incr("not_modified")
+            return page | {key: (validators or {}).get(key) for key in VALIDATORS} | {"unchanged": True}
+        if not r.ok:
+            r.close()  # Releases the connection, the body is not needed
+        r.raise_for_status()  # Raises an HTTPError for bad responses
+        page |= {"etag": r.headers.get("ETag"), "last_modified": r.headers.get("Last-Modified")}
+
+        with metrics.timed(stats, "page_read", url=url) as fields:
+            content, complete = html_stream.read_until_table(r, table_id="maintable")
+            fields["bytes"] = page["bytes"] = len(content)
+        if complete and stats is not None:
+            stats.incr("early_closes")
+
+        page["content_hash"] = hashlib.sha256(content).hexdigest()
+        if validators and validators.get("content_hash") == page["content_hash"]:
+            if stats is not None:
+                stats.incr("unchanged_pages")
+            return page | {"unchanged": True}
+
+        with metrics.timed(stats, "html_parse", url=url):
+            soup = BeautifulSoup(content, "html.parser")
+            main_table = soup.find("table", id="maintable")
+            data_from_element = main_table.find(lambda tag: tag.name == "big" and "Data from:" in tag.text)
+
+            if data_from_element:
+                data_from_td = data_from_element.find_parent("td")
+                page["table"] = data_from_td.find_next_sibling("td")
+            return page
+
+    except requests.exceptions.RequestException as e:
+        print(f"Request error: {e}")
+        return page
+    except Exception as e:
+        print(f"Unexpected error: {e}")
+        return page
+
+
+def fetch_table(url: str, stats: Stats = None):
+    """
+    Requests a meteorite page and returns the td holding its properties (next to the "Data from:" cell),
+    None if the page could not be fetched or has no such table. See `fetch_page`.
+    """
+    return fetch_page(url, stats=stats)["table"]
 
 
 class Meteorite:
     def __init__(
             self, name: str, year: str, country: str,
-            type: str, mass: str, url: str,
+            type: str, mass: str, url: str, stats: Stats = None,
             ) -> None:
 
         self.name = name
@@ -50,6 +146,10 @@ class Meteorite:
         self.coordinates = None
 
         self.table_soup = None
+        self.soup_bytes = 0  # bytes of the page `table_soup` was parsed from, which its tree keeps alive
+        self.validators = {}  # etag, last_modified & content_hash of the page, once fetched (see fetch_page)
+        self.extracted = False  # True once the properties were read from the page (or loaded from a cache)
+        self.stats = stats  # Optional, shared with the Boulder that created the object
 
         # This dictionary maps the textual references to the class attributes
         self.property_map = {
@@ -68,50 +168,71 @@ class Meteorite:
         }
 
     def get_soup(self):
+        """
+        Fetches the page and keeps its "Data from:" table. Meteorites of the process asking for the same url at the
+        same time (overlapping selections, several Boulders) share a single request and parsed table.
+        """
+        page, shared = pages_in_flight.do(self.url, fetch_page, self.url, self.stats)
+        self.keep_page(page)
+        if shared and self.stats is not None:
+            self.stats.incr("coalesced")
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0",
-        }
+    async def get_soup_async(self):
+        """Same as `get_soup` from a coroutine, the request runs in a worker thread."""
+        page, shared = await pages_in_flight.do_async(self.url, fetch_page, self.url, self.stats)
+        self.keep_page(page)
+        if shared and self.stats is not None:
+            self.stats.incr("coalesced")
 
-        try:
-            r = requests.get(url=self.url, headers=headers)
-            r.raise_for_status()  # Raises an HTTPError for bad responses
+    def keep_page(self, page: dict) -> None:
+        self.table_soup = page["table"]
+        self.soup_bytes = page["bytes"] if page["table"] is not None else 0
+        self.validators = {key: page[key] for key in VALIDATORS if page[key] is not None}
 
-            soup = BeautifulSoup(r.content, "html.parser")
-            main_table = soup.find("table", id="maintable")
-            data_from_element = main_table.find(lambda tag: tag.name == "big" and "Data from:" in tag.text)
+    def revalidate(self, record: dict, validators: dict) -> str:
+        """
+        Refreshes a meteorite scraped before : its page is requested conditionally (see `fetch_page`) and only parsed
+        and extracted again if it changed. An unchanged page, or one that could not be fetched, loads `record`.
 
-            if data_from_element:
-                data_from_td = data_from_element.find_parent("td")
-                self.table_soup = data_from_td.find_next_sibling("td")
-            else:
-                self.table_soup = None
+        Args:
+        - record (dict): the cached properties, see `to_record`
+        - validators (dict): the cached etag, last_modified & content_hash
 
-        except requests.exceptions.RequestException as e:
-            print(f"Request error: {e}")
-            self.table_soup = None
-        except Exception as e:
-            print(f"Unexpected error: {e}")
-            self.table_soup = None
+        Returns:
+        - str: "unchanged", "changed" (the properties were extracted again) or "failed" (the cached ones are kept)
+        """
+        page = fetch_page(self.url, stats=self.stats, validators=validators)
+        if page["unchanged"] or page["table"] is None:
+            self.load_record(record)
+            if page["unchanged"]:  # new validators (e.g. an etag on a hash match), the cached ones otherwise
+                validators = {key: page[key] or validators.get(key) for key in VALIDATORS}
+            self.validators = {key: value for key, value in validators.items() if value is not None}
+            return "unchanged" if page["unchanged"] else "failed"
+        self.keep_page(page)
+        self.extract_properties()
+        return "changed"
 
     def purge_html(self):
         """
         Frees memory by purging the html cace of the object
         """
         self.table_soup = None
+        self.soup_bytes = 0
         gc.collect()
 
     def extract_properties(self, purge_after: bool = True):
         if self.table_soup is None:
             self.get_soup()
         if self.table_soup is not None:
-            for reference, attr_name in self.property_map.items():
-                prop_td = self.table_soup.find("td", text=lambda text: text and reference in text)
+            with metrics.timed(self.stats, "extract", url=self.url):
+                for reference, attr_name in self.property_map.items():
+                    prop_td = self.table_soup.find("td", text=lambda text: text and reference in text)
 
-                if prop_td:
-                    value_td = prop_td.find_next_sibling("td")
-                    if value_td:
-                        setattr(self, attr_name, value_td.text.strip())
+                    if prop_td:
+                        value_td = prop_td.find_next_sibling("td")
+                        if value_td:
+                            setattr(self, attr_name, value_td.text.strip())
+            self.extracted = True
         else:
             self.get_soup()
             if self.table_soup is None:
@@ -131,6 +252,28 @@ class Meteorite:
         if purge_after:
             self.purge_html()
 
+    async def extract_properties_async(self, purge_after: bool = True):
+        """Same as `extract_properties`, for asyncio code : the page is fetched without blocking the event loop."""
+        if self.table_soup is None:
+            await self.get_soup_async()
+        self.extract_properties(purge_after=purge_after)
+
+    def to_record(self) -> dict:
+        """Returns the scraped attributes as a JSON serializable dict, the inverse of `load_record`."""
+        record = {attr: getattr(self, attr) for attr in SCRAPED_ATTRIBUTES}
+        if record["coordinates"] is not None:
+            record["coordinates"] = list(record["coordinates"])
+        return record
+
+    def load_record(self, record: dict) -> None:
+        """Sets the scraped attributes from a record (e.g. a scrape cache entry), no request is made."""
+        for attr in SCRAPED_ATTRIBUTES:
+            if attr in record:
+                setattr(self, attr, record[attr])
+        if self.coordinates is not None:
+            self.coordinates = tuple(np.nan if value is None else value for value in self.coordinates)
+        self.extracted = True
+
     def get_properties(self, as_pd: bool = False):
 
         property_dict = {
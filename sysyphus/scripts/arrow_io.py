@@ -0,0 +1,194 @@
+import os
+import sys
+import uuid
+
+from multiprocessing import shared_memory
+
+from sysyphus.scripts.writers import atomic_path
+
+
+_created = set()  # Blocks created by this process, already tracked
+
+
+def require_pyarrow():
+    """Imports pyarrow, which stays an optional dependency : only the Arrow exports need it."""
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as e:
+        raise ImportError("The Arrow exports require pyarrow, install it with `pip install pyarrow`") from e
+    return pa
+
+
+def to_arrow(df):
+    """
+    Converts a DataFrame (sy_df, df_searched...) to a pyarrow Table, a named index (e.g. the meteorite name)
+    is kept as a column. Numeric columns are converted without copy when possible.
+    """
+    pa = require_pyarrow()
+    return pa.Table.from_pandas(df, preserve_index=df.index.name is not None)
+
+
+def as_table(data):
+    pa = require_pyarrow()
+    return data if isinstance(data, pa.Table) else to_arrow(data)
+
+
+def to_pandas(table, arrow_backed: bool = False):
+    """
+    Converts a Table back to pandas. With `arrow_backed`, the columns stay Arrow arrays (pd.ArrowDtype), so a
+    table read from a memory map or shared memory is not copied into numpy/python objects.
+    """
+    import pandas as pd
+
+    if arrow_backed:
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return table.to_pandas()
+
+
+def write_ipc(data, filepath: str, stream: bool = False) -> str:
+    """
+    Function:
+    - Writes a DataFrame or Table in the Arrow IPC format, atomically.
+
+    Args:
+    - data (pd.DataFrame | pa.Table): what to write
+    - filepath (str): destination (.arrow is the usual extension)
+    - stream (bool): IPC stream format (sequential reads, e.g. piped to another process) instead of the
+    file format (random access, can be memory mapped by read_ipc)
+
+    Returns:
+    - str: filepath
+    """
+    pa = require_pyarrow()
+    table = as_table(data)
+    with atomic_path(filepath) as tmp_path:
+        with pa.OSFile(tmp_path, mode="wb") as sink:
+            new_writer = pa.ipc.new_stream if stream else pa.ipc.new_file
+            with new_writer(sink, table.schema) as writer:
+                writer.write_table(table)
+    return filepath
+
+
+def read_ipc(filepath: str, memory_map: bool = True):
+    """
+    Reads an Arrow IPC file or stream. With `memory_map` (default) the columns point into the mapped file : nothing
+    is read until used, and every process mapping the same file shares the same pages of the OS cache.
+
+    Returns:
+    - pa.Table
+    """
+    pa = require_pyarrow()
+    source = pa.memory_map(filepath, "r") if memory_map else pa.OSFile(filepath, "rb")
+    try:
+        return pa.ipc.open_file(source).read_all()
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source).read_all()
+
+
+def open_shared_memory(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Opens a shared memory block. Blocks attached (not created) are not tracked, so a worker exiting does not
+    unlink a block that its parent still uses.
+    """
+    if create:
+        block = shared_memory.SharedMemory(name=name, create=True, size=size)
+        _created.add(block.name)
+        return block
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+
+    from multiprocessing import resource_tracker
+
+    block = shared_memory.SharedMemory(name=name)
+    if block.name not in _created:  # registered with the tracker under its POSIX name, leading slash included
+        tracked_name = f"/{block.name}" if os.name == "posix" else block.name
+        resource_tracker.unregister(tracked_name, "shared_memory")
+    return block
+
+
+class SharedTable:
+    def __init__(self, block: shared_memory.SharedMemory, owner: bool) -> None:
+        """
+        An Arrow table living in a shared memory block, see `share` (creates it) and `attach` (opens it).
+        The columns of `table` point into the block, they must not be used after `close`.
+
+        Attributes:
+        - name (str): name of the block, pass it to the other processes
+        - size (int): bytes used
+        - table (pa.Table): the shared data, read only
+        """
+        pa = require_pyarrow()
+        self.block = block
+        self.owner = owner
+        self.name = block.name
+        self._buffer = pa.py_buffer(block.buf)
+        self.table = pa.ipc.open_stream(self._buffer).read_all()
+        self.size = self._buffer.size
+
+    def to_pandas(self, arrow_backed: bool = True):
+        """Arrow backed by default : the DataFrame reads the shared buffers instead of copying them."""
+        return to_pandas(self.table, arrow_backed=arrow_backed)
+
+    def close(self) -> None:
+        """
+        Releases this process' mapping, and removes the block if this process created it. Every Table and
+        DataFrame built from it must have been dropped first.
+        """
+        self.table = None
+        self._buffer = None
+        self.block.close()
+        if self.owner:
+            self.block.unlink()
+            _created.discard(self.name)
+
+    def __enter__(self) -> "SharedTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        rows = self.table.num_rows if self.table is not None else None
+        return f"SharedTable(name={self.name}, rows={rows}, size={self.size})"
+
+
+def share(data, name: str = None) -> SharedTable:
+    """
+    Function:
+    - Copies a DataFrame or Table once into a shared memory block, in the Arrow IPC stream format. Sibling
+    processes call `attach(name)` to read it without copy nor parsing. The block lives until the returned
+    SharedTable is closed.
+
+    Args:
+    - data (pd.DataFrame | pa.Table): what to share
+    - name (str): block name, a random one by default
+
+    Returns:
+    - SharedTable: owner of the block
+    """
+    pa = require_pyarrow()
+    table = as_table(data)
+
+    sizer = pa.MockOutputStream()
+    with pa.ipc.new_stream(sizer, table.schema) as writer:
+        writer.write_table(table)
+
+    block = open_shared_memory(name=name or f"sysyphus_{uuid.uuid4().hex[:16]}", create=True, size=sizer.size())
+    try:
+        sink = pa.FixedSizeBufferWriter(pa.py_buffer(block.buf))
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        sink.close()
+        return SharedTable(block=block, owner=True)
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+
+
+def attach(name: str) -> SharedTable:
+    """Attaches to a table shared by another process (see `share`), without copying it."""
+    return SharedTable(block=open_shared_memory(name=name), owner=False)
+
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import os
+import re
+import time
+
+from urllib.parse import urljoin
+
+import numpy as np
+import pandas as pd
+
+from sysyphus.models.meteorite import conditional_headers
+from sysyphus.scripts import delta, metrics, remote_load, scheduler, snapshot_store, summaries, transport, writers
+from sysyphus.scripts.metrics import Stats
+from sysyphus.scripts.preprocessing import handle_mass
+from sysyphus.scripts.vocabulary import Vocabulary
+
+
+LISTING_URL = (
+    "https://www.lpi.usra.edu/meteor/metbull.php?sfor=names&stype=contains&lrec={page_size}"
+    "&srt=name&pnt=Normal%20table&page={page}"
+)
+PAGE_SIZE = 5000  # meteorites per listing page
+LISTING_COLUMNS = {"Name": "name", "Year": "year", "Place": "country", "Type": "type", "Mass": "mass"}
+COLUMNS = ["name", "year", "country", "type", "mass", "URL", "numeric_id"]  # the columns of the monthly clone
+VOCABULARIES = {"country": "country_validation.json", "type": "type_validation.json"}
+FORMAT_VERSION = 1
+
+
+def listing_url(page: int, page_size: int = PAGE_SIZE) -> str:
+    return LISTING_URL.format(page=page, page_size=page_size)
+
+
+def state_dir(directory: str = None) -> str:
+    """Where the builder keeps the validators and rows of each listing page, between builds."""
+    directory = directory or os.path.join(remote_load.cache_dir(), "builder")
+    os.makedirs(os.path.join(directory, "pages"), exist_ok=True)
+    return directory
+
+
+def read_state(directory: str, page_size: int) -> dict:
+    """The state of the last build, an empty one if there is none or it was made with another page size."""
+    path = os.path.join(directory, "state.json")
+    empty = {"format": FORMAT_VERSION, "page_size": page_size, "pages": {}}
+    if not os.path.exists(path):
+        return empty
+    with open(path, mode="r") as file:
+        state = json.load(file)
+    if state.get("format") != FORMAT_VERSION or state.get("page_size") != page_size:
+        return empty
+    return state
+
+
+def write_state(state: dict, directory: str) -> None:
+    with writers.atomic_path(os.path.join(directory, "state.json")) as tmp_path:
+        with open(tmp_path, mode="w") as file:
+            json.dump(state, file, indent=1)
+
+
+def numeric_id(name: str) -> int | None:
+    """The number ending a meteorite name (Dhofar 1001 : 1001), None for names without one (Aachen)."""
+    match = re.search(r"(\d+)\s*$", name)
+    return int(match.group(1)) if match else None
+
+
+def country_of(place: str) -> str | None:
+    """The country of a MetBull place ("Antofagasta, Chile" : Chile)."""
+    place = place.split(",")[-1].strip()
+    return place or None
+
+
+def parse_listing(content: bytes, url: str) -> list:
+    """
+    Function:
+    - Reads the meteorites of a MetBull listing page : the table whose header holds the LISTING_COLUMNS, columns
+    found by their header (extra columns are ignored), the page url of each meteorite from the link of its name.
+
+    Args:
+    - content (bytes): the listing page
+    - url (str): its (original) url, to resolve the links
+
+    Returns:
+    - list: one dict per meteorite, with the COLUMNS of the dataset
+    """
+    from bs4 import BeautifulSoup  # Deferred, like in meteorite.fetch_page
+
+    soup = BeautifulSoup(content, "html.parser")
+    for table in soup.find_all("table"):
+        lines = table.find_all("tr")
+        if not lines:
+            continue
+        header = [cell.get_text(strip=True) for cell in lines[0].find_all(["th", "td"])]
+        if not set(LISTING_COLUMNS) <= set(header):
+            continue
+        positions = {column: header.index(label) for label, column in LISTING_COLUMNS.items()}
+
+        rows = []
+        for line in lines[1:]:
+            cells = line.find_all("td")
+            if len(cells) < len(header):
+                continue
+            text = {column: cells[position].get_text(strip=True) for column, position in positions.items()}
+            link = cells[positions["name"]].find("a")
+            rows.append({
+                "name": text["name"],
+                "year": int(text["year"]) if text["year"].isdigit() else None,
+                "country": country_of(text["country"]),
+                "type": text["type"] or None,
+                "mass": handle_mass(text["mass"]) if text["mass"] else np.nan,
+                "URL": urljoin(url, link["href"]) if link is not None and link.get("href") else None,
+                "numeric_id": numeric_id(text["name"]),
+            })
+        return rows
+    return []
+
+
+def crawl(page_size: int = PAGE_SIZE, directory: str = None, stats: Stats = None) -> tuple:
+    """
+    Function:
+    - Requests the listing pages in order, until one holds less than `page_size` meteorites. Every request goes
+    through transport.fetch (pooled session, retries, request budget) and is conditional on the validators of the
+    last build : a page answered with a 304, or whose content hashes the same, is not parsed again, its rows are
+    read from the state directory.
+
+    Args:
+    - page_size (int): meteorites per listing page, changing it re-crawls everything
+    - directory (str): state directory, see `state_dir`
+    - stats (Stats): records the "listing_parse" stage and the http requests
+
+    Returns:
+    - tuple: (rows of every page, {pages, changed_pages, not_modified, unchanged_pages})
+
+    Raises:
+    - ConnectionError: if a listing page cannot be fetched, a partial dataset is never built
+    """
+    directory = state_dir(directory)
+    state = read_state(directory, page_size=page_size)
+    counts = {"pages": 0, "changed_pages": 0, "not_modified": 0, "unchanged_pages": 0}
+    rows = []
+    page = 0
+    while True:
+        url = listing_url(page, page_size=page_size)
+        cached = state["pages"].get(str(page))
+        rows_path = os.path.join(directory, "pages", f"{page}.json")
+        response = transport.fetch(url=url, headers=conditional_headers(cached), stats=stats)
+
+        if cached is not None and response.status_code == 304:
+            counts["not_modified"] += 1
+            with open(rows_path, mode="r") as file:
+                page_rows = json.load(file)
+        elif response.status_code != 200:
+            raise ConnectionError(f"Listing page {page} could not be fetched (status {response.status_code})")
+        else:
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if cached is not None and cached["content_hash"] == content_hash:
+                counts["unchanged_pages"] += 1
+                with open(rows_path, mode="r") as file:
+                    page_rows = json.load(file)
+            else:
+                counts["changed_pages"] += 1
+                with metrics.timed(stats, "listing_parse", url=url) as fields:
+                    page_rows = parse_listing(response.content, url=url)
+                    fields["rows"] = len(page_rows)
+                with writers.atomic_path(rows_path) as tmp_path:
+                    with open(tmp_path, mode="w") as file:
+                        json.dump(page_rows, file)
+            cached = {
+                "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": content_hash,
+            }
+
+        state["pages"][str(page)] = cached | {"rows": len(page_rows)}
+        counts["pages"] += 1
+        rows.extend(page_rows)
+        if len(page_rows) < page_size:
+            break
+        page += 1
+
+    state["pages"] = {key: entry for key, entry in state["pages"].items() if int(key) <= page}  # the list shrank
+    write_state(state, directory)
+    return rows, counts
+
+
+def to_frame(rows: list) -> pd.DataFrame:
+    """The crawled rows as a dataset, cast like datasets.load does."""
+    df = pd.DataFrame(rows, columns=COLUMNS)
+    df["mass"] = df["mass"].astype("float64")
+    return df.astype({"numeric_id": "Int64", "year": "Int64"})
+
+
+def write_vocabularies(df: pd.DataFrame, directory: str) -> list:
+    """Writes the validation lists of the prompts (unique countries and types, see vocabulary.RESOURCES)."""
+    paths = []
+    for column, file_name in VOCABULARIES.items():
+        path = os.path.join(directory, file_name)
+        with writers.atomic_path(path) as tmp_path:
+            with open(tmp_path, mode="w") as file:
+                json.dump(list(Vocabulary.from_series(df[column])), file)
+        paths.append(path)
+    return paths
+
+
+def read_manifest(directory: str) -> dict:
+    path = os.path.join(directory, delta.MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {"version": None, "deltas": []}
+    with open(path, mode="r") as file:
+        return json.load(file)
+
+
+def build(
+        directory: str, version: str = None, page_size: int = PAGE_SIZE, state_directory: str = None,
+        stats: Stats = None, priority: str | int = "bulk",
+        ) -> dict:
+    """
+    Function:
+    - Builds the dataset from the MetBull listing pages (see `crawl`, only the pages changed since the last build
+    are parsed) and publishes it to `directory` in one pipeline, laid out like the remote datasets folder :
+        - metbull_data.json (json lines) & metbull_data.pkl, the files remote_load downloads
+        - the delta from the previous build and the manifest (see delta.publish), for incremental updates
+        - country_validation.json & type_validation.json, the vocabularies of the prompts
+    - The manifest holds the sha256 of the dataset files, downloads are checked against it.
+    - The version is also recorded locally : snapshot (remote_load.save_snapshot), columnar history
+    (snapshot_store, with pyarrow) and summaries, so a Boulder opens it without a download.
+
+    Args:
+    - directory (str): output directory, the previous build found there is the base of the delta
+    - version (str): version of the build, the current month ("2026-10") by default
+    - page_size (int): meteorites per listing page
+    - state_directory (str): where the listing pages of the last build are kept, see `state_dir`
+    - stats (Stats): records the stages of the build
+    - priority (str | int): scheduling of the requests, bulk by default (see scheduler)
+
+    Returns:
+    - dict: version, rows, the crawl counts (pages, changed_pages, not_modified, unchanged_pages), delta
+    (added, changed & removed rows, None for a first build) and the files written
+    """
+    version = version or time.strftime("%Y-%m")
+    os.makedirs(directory, exist_ok=True)
+    with scheduler.get_scheduler().job(name="build_dataset", priority=priority) as job:
+        with metrics.timed(stats, "crawl") as fields:
+            rows, counts = scheduler.run_as(job, crawl, page_size=page_size, directory=state_directory, stats=stats)
+            fields.update(counts)
+    df = to_frame(rows)
+
+    manifest = read_manifest(directory)
+    json_path = os.path.join(directory, "metbull_data.json")
+    report = {"version": version, "rows": len(df), **counts, "delta": None}
+    manifest_path = os.path.join(directory, delta.MANIFEST_NAME)
+    with metrics.timed(stats, "publish", rows=len(df)):
+        previous = None
+        if manifest["version"] not in [None, version] and os.path.exists(json_path):
+            previous = to_frame(remote_load.read_dataset(json_path).to_dict(orient="records"))
+
+        with writers.atomic_path(json_path) as tmp_path:
+            df.to_json(tmp_path, orient="records", lines=True)
+        pickle_path = os.path.join(directory, "metbull_data.pkl")
+        with writers.atomic_path(pickle_path) as tmp_path:
+            df.to_pickle(tmp_path)
+
+        if previous is not None:
+            row_delta = delta.compute_delta(previous, df)
+            report["delta"] = {part: len(row_delta[part]) for part in ["added", "changed", "removed"]}
+            manifest = delta.publish(old=previous, new=df, from_version=manifest["version"], to_version=version,
+                                     directory=directory)
+        checksums = {os.path.basename(path): remote_load.file_sha256(path) for path in [json_path, pickle_path]}
+        with writers.atomic_path(manifest_path) as tmp_path:  # checked by remote_load.download_dataset
+            with open(tmp_path, mode="w") as file:
+                json.dump(manifest | {"version": version, "checksums": checksums}, file, indent=1)
+        files = [json_path, pickle_path, manifest_path]
+        files += write_vocabularies(df, directory)
+
+    remote_load.save_snapshot(df, version=version)
+    snapshot_store.record(df, version=version, stats=stats)
+    summaries.get(df, version=version, stats=stats)
+    report["files"] = files
+    return report
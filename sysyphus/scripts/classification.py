@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import re
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Parsed fields -> columns added to sy_df (see add_columns)
+COLUMNS = {
+    "class": "type_class",
+    "subclass": "type_subclass",
+    "group": "type_group",
+    "subgroup": "type_subgroup",
+    "petrologic_min": "type_petrologic_min",
+    "petrologic_max": "type_petrologic_max",
+    "modifiers": "type_modifiers",
+}
+CRITERIA = ["class", "subclass", "group", "subgroup", "petrologic_type", "modifier"]
+
+CHONDRITE_SUBCLASSES = {
+    "h": "ordinary", "l": "ordinary", "ll": "ordinary", "h/l": "ordinary", "l/ll": "ordinary", "oc": "ordinary",
+    "e": "enstatite", "eh": "enstatite", "el": "enstatite", "r": "rumuruti", "k": "kakangari",
+}
+
+# Named families : name -> (class, subclass)
+FAMILIES = {
+    "eucrite": ("achondrite", "HED"),
+    "diogenite": ("achondrite", "HED"),
+    "howardite": ("achondrite", "HED"),
+    "angrite": ("achondrite", None),
+    "aubrite": ("achondrite", "enstatite"),
+    "ureilite": ("achondrite", None),
+    "lunar": ("achondrite", "lunar"),
+    "martian": ("achondrite", "martian"),
+    "acapulcoite": ("primitive achondrite", None),
+    "lodranite": ("primitive achondrite", None),
+    "winonaite": ("primitive achondrite", None),
+    "brachinite": ("primitive achondrite", None),
+    "pallasite": ("stony-iron", None),
+    "mesosiderite": ("stony-iron", None),
+}
+
+# Words of the type string -> modifier, multi words first
+MODIFIERS = [
+    ("melt breccia", "melt breccia"), ("melt rock", "melt rock"), ("imp melt", "impact melt"),
+    ("impact melt", "impact melt"), ("fusion crust", "fusion crust"),
+    ("breccia", "breccia"), ("br", "breccia"), ("unbr", "unbrecciated"), ("an", "anomalous"),
+    ("ung", "ungrouped"), ("ungrouped", "ungrouped"), ("uncl", "unclassified"), ("metal", "metal"),
+    ("pm", "polymict"), ("pmict", "polymict"), ("polymict", "polymict"), ("mmict", "monomict"),
+    ("relict", "relict"), ("doubtful", "doubtful"), ("prim", "primitive"),
+]
+
+CHONDRITE_PATTERN = re.compile(
+    r"^(?P<group>oc|h/l|l/ll|ll|h|l|eh|el|e|cvox|cvred|cba|cbb|c[imvokrhbly]|c|r|k)"
+    r"(?=$|[\d(\-\s/<])"
+    r"(?:\((?P<affinity>[a-z/]+)\))?"
+    r"-?(?P<petro><?\d(?:\.\d+)?(?:\s*[-/]\s*\d(?:\.\d+)?)*)?"
+    r"(?P<rest>.*)$"
+)
+NUMBER_PATTERN = re.compile(r"\d(?:\.\d+)?")
+
+
+def empty_fields() -> dict:
+    return {field: None for field in COLUMNS} | {"modifiers": []}
+
+
+def parse_modifiers(text: str) -> list:
+    found = []
+    for phrase, modifier in MODIFIERS:
+        if " " in phrase and phrase in text:
+            text = text.replace(phrase, " ")
+            found.append(modifier)
+    for token in re.split(r"[-,\s/()]+", text):
+        for phrase, modifier in MODIFIERS:
+            if token == phrase and modifier not in found:
+                found.append(modifier)
+    return found
+
+
+def parse_petrologic(text: str) -> tuple:
+    """'3.2-3.7' -> (3.2, 3.7), '4/5' -> (4.0, 5.0), '<3.5' -> (None, 3.5)"""
+    numbers = [float(number) for number in NUMBER_PATTERN.findall(text)]
+    if not numbers:
+        return None, None
+    if text.startswith("<"):
+        return None, max(numbers)
+    return min(numbers), max(numbers)
+
+
+def parse_type(raw: str) -> dict:
+    """
+    Function:
+    - Splits a MetBull classification ("LL3.8-4", "Iron, IAB-sLL-an", "Martian (shergottite)", "H5-melt breccia")
+    into its hierarchy : class (chondrite, achondrite, primitive achondrite, iron, stony-iron, other), subclass
+    (ordinary, carbonaceous, enstatite, HED, lunar...), group (H, CV, IAB, eucrite...), subgroup, petrologic
+    type range and modifiers (breccia, melt rock, anomalous, ungrouped, uncertain...).
+
+    Args:
+    - raw (str): the type as found in sy_df
+
+    Returns:
+    - dict: the fields of COLUMNS, missing ones are None (modifiers : list)
+    """
+    fields = empty_fields()
+    if raw is None or raw != raw:
+        return fields
+
+    text = " ".join(str(raw).lower().split())
+    modifiers = []
+    if "?" in text:
+        modifiers.append("uncertain")
+        text = re.sub(r"\(\?\)|\?", "", text)
+    text = re.sub(r"\((\d[\d.]*)\)", r"\1", text).strip()  # h(5) -> h5, the (?) was removed above
+    for prefix in ["relict ", "doubtful "]:
+        if text.startswith(prefix):
+            modifiers.append(prefix.strip())
+            text = text[len(prefix):]
+
+    family = re.split(r"[-,\s(/]", text, maxsplit=1)[0]
+    remainder = text[len(family):]
+
+    if family == "iron":
+        fields["class"] = "iron"
+        group, _, rest = remainder.strip(" ,").partition("-")
+        group = group.replace(" complex", "")
+        if group and group not in ["ungrouped", "ung"]:
+            fields["group"] = group.upper()
+            parts = [part for part in rest.split("-") if part]
+            if parts and parts[0] not in ["an", "ung"]:
+                fields["subgroup"] = parts[0].upper()
+        modifiers += parse_modifiers(remainder)
+    elif family in FAMILIES:
+        fields["class"], fields["subclass"] = FAMILIES[family]
+        if family not in ["lunar", "martian"]:
+            fields["group"] = family
+        detail = re.search(r"\(([^)]*)\)", remainder)
+        if detail:
+            if family == "martian":
+                fields["group"] = detail.group(1)  # shergottite, nakhlite, chassignite...
+            else:
+                fields["subgroup"] = detail.group(1)
+        elif family in ["pallasite", "mesosiderite"]:
+            subgroup = remainder.strip(" ,-").split("-")[0].split(",")[-1].strip()
+            if subgroup and subgroup not in ["an", "ung", "ungrouped"]:
+                fields["subgroup"] = subgroup.upper()
+        modifiers += parse_modifiers(remainder)
+    elif family in ["achondrite", "enst"]:
+        fields["class"] = "primitive achondrite" if "prim" in remainder else "achondrite"
+        fields["subclass"] = "enstatite" if family == "enst" else None
+        modifiers += [modifier for modifier in parse_modifiers(remainder) if modifier != "primitive"]
+    elif family in ["chondrite", "stone", "stony"]:
+        fields["class"] = "chondrite" if family == "chondrite" else "stony-iron" if family == "stony" else "other"
+        modifiers += parse_modifiers(remainder)
+    else:
+        match = CHONDRITE_PATTERN.match(text)
+        if match is None:
+            fields["class"] = "other"  # pseudometeorite, impact crater, none...
+            modifiers += parse_modifiers(text)
+        else:
+            group = match.group("group")
+            fields["class"] = "chondrite"
+            fields["subclass"] = CHONDRITE_SUBCLASSES.get(group, "carbonaceous")
+            if group in ["cvox", "cvred"]:
+                group, fields["subgroup"] = "cv", group[2:]
+            elif group in ["cba", "cbb"]:
+                group, fields["subgroup"] = "cb", group[2:]
+            fields["group"] = None if group == "c" else group.upper()
+            if match.group("affinity"):
+                modifiers.append(f"{match.group('affinity').upper()} affinity")
+            if match.group("petro"):
+                fields["petrologic_min"], fields["petrologic_max"] = parse_petrologic(match.group("petro"))
+            modifiers += parse_modifiers(match.group("rest"))
+            if group == "c" and not match.group("rest"):
+                modifiers.append("ungrouped")
+
+    fields["modifiers"] = list(dict.fromkeys(modifiers))
+    return fields
+
+
+def add_columns(df: pd.DataFrame, column: str = "type") -> pd.DataFrame:
+    """
+    Function:
+    - Returns `df` with the parsed classification as columns (see COLUMNS) : categorical for the text fields,
+    float for the petrologic range, modifiers joined with commas. Each distinct type is only parsed once.
+    Existing classification columns are replaced.
+
+    Args:
+    - df (pd.DataFrame): sy_df or a part of it
+    - column (str): the column holding the raw types
+
+    Returns:
+    - pd.DataFrame: a new DataFrame
+    """
+    import pandas as pd
+
+    raw = pd.Categorical(df[column])
+    parsed = [parse_type(value) for value in raw.categories] + [empty_fields()]  # code -1 (missing) takes the last
+    columns = {}
+    for field, name in COLUMNS.items():
+        if field == "modifiers":
+            values = [",".join(fields["modifiers"]) or None for fields in parsed]
+        else:
+            values = [fields[field] for fields in parsed]
+        if field.startswith("petrologic"):
+            series = pd.Series(values, dtype="float64")
+        else:
+            series = pd.Series(values, dtype="object")
+        series = series.take(raw.codes)
+        series.index = df.index
+        columns[name] = series if field.startswith("petrologic") else series.astype("category")
+    return df.assign(**columns)
+
+
+def drop_columns(df: pd.DataFrame) -> pd.DataFrame:
+    return df.drop(columns=[name for name in COLUMNS.values() if name in df.columns])
+
+
+def category_mask(series: pd.Series, accept: callable):
+    """Evaluates `accept` once per category instead of once per row, the rows are then selected on their codes."""
+    import numpy as np
+
+    categories = series.cat.categories
+    accepted = np.flatnonzero([accept(str(category)) for category in categories])
+    return np.isin(series.cat.codes.to_numpy(), accepted)
+
+
+def petrologic_mask(df: pd.DataFrame, query):
+    """
+    Rows whose petrologic range includes `query` : an integer matches every subtype (3 matches 3.2-3.7),
+    a (low, high) tuple matches overlapping ranges.
+    """
+    import numpy as np
+
+    low_values = df[COLUMNS["petrologic_min"]].to_numpy()
+    high_values = df[COLUMNS["petrologic_max"]].to_numpy()
+    lows = low_values.copy()
+    lows[lows != lows] = np.floor(high_values[lows != lows])  # "<3.5" : 3 up to 3.5
+
+    if isinstance(query, (tuple, list)):
+        low, high = float(query[0]), float(query[1])
+        return (lows <= high) & (high_values >= low)
+    query = float(query)
+    if query.is_integer():
+        return (lows < query + 1) & (high_values >= query)
+    return (lows <= query) & (high_values >= query)
+
+
+def select(df: pd.DataFrame, criteria: dict):
+    """
+    Function:
+    - Boolean mask of the rows of `df` matching every criterion, on the classification columns (added on the fly
+    if missing). Text criteria are case insensitive and only evaluated on the distinct values.
+
+    Args:
+    - df (pd.DataFrame): sy_df or a part of it
+    - criteria (dict): any of class, subclass, group, subgroup (a value or a list of values),
+    petrologic_type (number or (low, high) range) and modifier (e.g. "breccia", "melt rock", "anomalous")
+
+    Returns:
+    - numpy array of booleans
+    """
+    import numpy as np
+
+    unknown = set(criteria) - set(CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown classification criteria {sorted(unknown)}. Options are {', '.join(CRITERIA)}.")
+    if COLUMNS["class"] not in df.columns:
+        df = add_columns(df)
+
+    mask = np.ones(len(df), dtype=bool)
+    for criterion, value in criteria.items():
+        if value is None:
+            continue
+        if criterion == "petrologic_type":
+            mask &= petrologic_mask(df, value)
+        elif criterion == "modifier":
+            wanted = str(value).lower()
+            mask &= category_mask(df[COLUMNS["modifiers"]], lambda category: wanted in category.split(","))
+        else:
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            wanted = {str(item).lower() for item in values}
+            mask &= category_mask(df[COLUMNS[criterion]], lambda category: category.lower() in wanted)
+    return mask
+
+
+def describe(raw: str) -> str:
+    """Readable form of a parsed type, e.g. 'chondrite > ordinary > H, type 5, melt breccia'."""
+    fields = parse_type(raw)
+    hierarchy = " > ".join(str(fields[field]) for field in ["class", "subclass", "group", "subgroup"] if fields[field])
+    details = []
+    if fields["petrologic_max"] is not None:
+        low, high = fields["petrologic_min"], fields["petrologic_max"]
+        details.append(f"type {high:g}" if low == high else f"type {'' if low is None else f'{low:g}'}-{high:g}")
+    details += fields["modifiers"]
+    return ", ".join([hierarchy, *details]) if details else hierarchy
@@ -0,0 +1,161 @@
+import json
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sysyphus.models.client import DEFAULT_HOST, DEFAULT_PORT
+from sysyphus.scripts import rendering, search
+from sysyphus.scripts import user_requests as u_requests
+from sysyphus.scripts.preprocessing import handle_mass
+
+
+def to_records(df) -> list:
+    """JSON friendly records of a DataFrame (NaN/NA as null), the index is kept as a column if it is named."""
+    if df.index.name is not None:
+        df = df.reset_index()
+    return json.loads(df.to_json(orient="records"))
+
+
+class QueryService:
+    def __init__(self, boulder) -> None:
+        """
+        The work behind the daemon endpoints, on a Boulder loaded once. Every call is stateless : the Boulder's own
+        selection attributes are never touched, so concurrent clients cannot see each other's searches.
+
+        Args:
+        - boulder (Boulder): provides sy_df, stats and the scrape cache
+        """
+        self.boulder = boulder
+
+    def health(self, payload: dict) -> dict:
+        return {"status": "ok", "rows": len(self.boulder.sy_df), "cached_pages": self.cached_pages()}
+
+    def cached_pages(self) -> int | None:
+        return len(self.boulder.scrape_cache) if self.boulder.scrape_cache is not None else None
+
+    def search(self, payload: dict) -> dict:
+        """Payload : name, numeric_range, country, mtype, classification, see Boulder.search. Returns the rows found."""
+        parameters = search.build_parameters(
+            name=payload.get("name"), numeric_range=payload.get("numeric_range"),
+            country=payload.get("country"), mtype=payload.get("mtype"),
+            classification_criteria=payload.get("classification"),
+        )
+        if len(parameters) < 1:
+            raise ValueError("No search parameters provided, please retry.")
+        with self.boulder.stats.timer("search"):
+            result = search.apply_filters(df=self.boulder.sy_df, parameters=parameters)
+        return {"rows": to_records(result)}
+
+    def selection(self, urls: list):
+        sy_df = self.boulder.sy_df
+        return sy_df[sy_df["URL"].isin(urls)]
+
+    def scrape(self, payload: dict) -> dict:
+        """
+        Payload : urls (list), rate_limiter (int), ommit (list). Requests the pages that are not in the scrape cache
+        and returns the properties of every meteorite, like display_search.
+        """
+        meteorites = u_requests.make_meteorites(
+            selected_meteorites=self.selection(payload.get("urls", [])), stats=self.boulder.stats
+        )
+        requested = u_requests.request_cached(
+            meteorites=meteorites, rate_limiter=int(payload.get("rate_limiter", 25)),
+            cache=self.boulder.scrape_cache, stats=self.boulder.stats,
+        )
+        return {"rows": self.render_meteorites(meteorites, payload.get("ommit", [])), "requested": len(requested)}
+
+    def render(self, payload: dict) -> dict:
+        """
+        Payload : urls (list), ommit (list). Returns the properties of the cached meteorites only (no request),
+        and the urls that are not cached.
+        """
+        meteorites = u_requests.make_meteorites(selected_meteorites=self.selection(payload.get("urls", [])))
+        missing = meteorites if self.boulder.scrape_cache is None else self.boulder.scrape_cache.hydrate(meteorites)
+        missing_urls = {meteorite.url for meteorite in missing}
+        cached = [meteorite for meteorite in meteorites if meteorite.url not in missing_urls]
+        return {
+            "rows": self.render_meteorites(cached, payload.get("ommit", [])),
+            "missing": sorted(missing_urls),
+        }
+
+    def render_meteorites(self, meteorites: list, ommit: list) -> list:
+        if not meteorites:
+            return []
+        df = rendering.show_properties(meteorite_list=meteorites, as_pd=True, ommit=ommit)
+        if "mass" in df.columns:
+            df["mass"] = df["mass"].apply(handle_mass)
+        return to_records(df)
+
+
+def make_handler(service: QueryService):
+    routes = {
+        ("GET", "/health"): service.health,
+        ("POST", "/search"): service.search,
+        ("POST", "/scrape"): service.scrape,
+        ("POST", "/render"): service.render,
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def handle_route(self, method: str):
+            route = routes.get((method, self.path.split("?")[0]))
+            if route is None:
+                return self.respond(404, {"error": f"Unknown endpoint {method} {self.path}"})
+
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                self.respond(200, route(payload))
+            except (ValueError, KeyError, TypeError) as e:
+                self.respond(400, {"error": str(e)})
+            except Exception as e:
+                self.respond(500, {"error": f"{type(e).__name__}: {e}"})
+
+        def do_GET(self):
+            self.handle_route("GET")
+
+        def do_POST(self):
+            self.handle_route("POST")
+
+        def respond(self, status: int, content: dict):
+            body = json.dumps(content).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Per request timings are in boulder.stats
+
+    return Handler
+
+
+def make_server(boulder, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Returns the (not yet serving) HTTP server answering the queries on `boulder`, bound to localhost by default."""
+    server = ThreadingHTTPServer((host, port), make_handler(QueryService(boulder)))
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, use_json: bool = True, scrape_cache: str = None):
+    """
+    Function:
+    - Loads the dataset once into a Boulder and answers search, scrape and render requests over local HTTP
+    until interrupted. Use sysyphus.models.client.BoulderClient to query it.
+
+    Args:
+    - host, port (str, int): where to listen, keep the default localhost host unless behind a trusted network
+    - use_json (bool): dataset format, see Boulder
+    - scrape_cache (str): path of the scrape cache sqlite file, the default cache location if None
+    """
+    from sysyphus.models.boulder import Boulder
+    from sysyphus.scripts.scrape_cache import ScrapeCache
+
+    boulder = Boulder(use_json=use_json, scrape_cache=ScrapeCache(path=scrape_cache))
+    server = make_server(boulder=boulder, host=host, port=port)
+    print(f"sysyphus serving {len(boulder.sy_df)} meteorites at http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("sysyphus: stopped")
+    finally:
+        server.server_close()
@@ -0,0 +1,118 @@
+import threading
+import time
+
+import pandas as pd
+
+from sysyphus.scripts import classification, metrics, remote_load, snapshot_store, vocabulary
+from sysyphus.scripts.metrics import Stats
+
+
+_datasets = {}  # "json" / "pickle" -> {"df", "version", "loaded_at"}
+_loading = {}  # per dataset lock, so concurrent sessions wait for a single download
+_lock = threading.Lock()
+
+if int(pd.__version__.split(".")[0]) < 3:  # always on from pandas 3, where the option is deprecated
+    pd.options.mode.copy_on_write = True  # the views returned by `get` share the dataset arrays, see `get`
+
+
+def dataset_key(use_json: bool = True) -> str:
+    return "json" if use_json else "pickle"
+
+
+def load(use_json: bool = True, incremental: bool = False, stats: Stats = None) -> tuple:
+    """
+    Function:
+    - Downloads the dataset (or updates the local snapshot, see remote_load.update_dataset), casts the id & year
+    columns, records the version in the snapshot store (when known and pyarrow is installed), adds the parsed
+    classification columns (see classification.add_columns) and registers the validation vocabularies.
+    Not cached, see `get`.
+
+    Returns:
+    - tuple: (sy_df, dataset version or None)
+    """
+    if incremental:
+        df, version, _ = remote_load.update_dataset(use_json=use_json, stats=stats)
+    else:
+        df = remote_load.get_remote_data(as_pd=True, use_json=use_json, stats=stats)
+        version = None
+    with metrics.timed(stats, "dtype_cast"):
+        df = df.astype({"numeric_id": "Int64", "year": "Int64"})
+    snapshot_store.record(df, version=version, stats=stats)  # history of the versions, see Boulder(as_of=...)
+    return prepare(df, stats=stats), version
+
+
+def prepare(df, stats: Stats = None, register: bool = True):
+    """
+    Adds the derived columns to a (cast) dataset and registers its validation vocabularies. The vocabularies are
+    process wide : `register=False` for any dataset but the latest one (e.g. a snapshot, see Boulder(as_of=...)).
+    """
+    with metrics.timed(stats, "classification"):
+        df = classification.add_columns(df)
+    if register:
+        with metrics.timed(stats, "vocabulary"):
+            vocabulary.register_dataset(df)  # validation & autocompletion of the prompts, built once
+    return df
+
+
+def get(use_json: bool = True, incremental: bool = False, stats: Stats = None) -> tuple:
+    """
+    Function:
+    - Returns the process wide copy of the dataset, loading it on first use only : every Boulder of the process
+    shares the same arrays. Concurrent first calls wait for a single download.
+    - The DataFrame returned is a view (shallow copy) : with pandas copy-on-write (always on from pandas 3, turned on
+    with pandas 2), modifying it copies the modified columns for that caller only, the shared dataset is never
+    altered.
+
+    Args:
+    - use_json (bool): dataset format, each format is loaded once
+    - incremental (bool): how to load it on first use, see remote_load.update_dataset
+    - stats (Stats): records the loading stages, when a load happens
+
+    Returns:
+    - tuple: (sy_df view, dataset version or None)
+    """
+    key = dataset_key(use_json)
+    with _lock:
+        entry = _datasets.get(key)
+        key_lock = _loading.setdefault(key, threading.Lock())
+
+    if entry is None:
+        with key_lock:
+            entry = _datasets.get(key)
+            if entry is None:
+                df, version = load(use_json=use_json, incremental=incremental, stats=stats)
+                entry = publish(df=df, version=version, use_json=use_json)
+    return entry["df"].copy(deep=False), entry["version"]
+
+
+def publish(df, version: str | None, use_json: bool = True) -> dict:
+    """Makes `df` the shared dataset handed to the next sessions (e.g. after a refresh), current views are kept."""
+    entry = {"df": df, "version": version, "loaded_at": time.time()}
+    with _lock:
+        _datasets[dataset_key(use_json)] = entry
+    return entry
+
+
+def is_loaded(use_json: bool = True) -> bool:
+    return dataset_key(use_json) in _datasets
+
+
+def loaded() -> dict:
+    """Returns the shared datasets : rows, version and memory used (bytes, counted once for every session)."""
+    with _lock:
+        entries = dict(_datasets)
+    return {
+        key: {
+            "rows": len(entry["df"]),
+            "version": entry["version"],
+            "bytes": int(entry["df"].memory_usage(deep=True).sum()),
+            "loaded_at": entry["loaded_at"],
+        }
+        for key, entry in entries.items()
+    }
+
+
+def clear() -> None:
+    """Forgets the shared datasets, the next Boulder downloads again. Existing Boulders keep their view."""
+    with _lock:
+        _datasets.clear()
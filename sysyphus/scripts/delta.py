@@ -0,0 +1,155 @@
+import gzip
+import json
+import os
+
+import pandas as pd
+
+
+KEY_COLUMNS = ["name", "numeric_id"]
+MANIFEST_NAME = "manifest.json"
+
+
+def row_keys(df: pd.DataFrame) -> pd.Index:
+    """Returns the identity of each row (name + numeric_id, missing ids included) as a string Index."""
+    return pd.Index([f"{name}\x1f{numeric_id}" for name, numeric_id in zip(df["name"], df["numeric_id"])])
+
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Returns a content hash (uint64) per row, indexed by the row keys."""
+    hashes = pd.util.hash_pandas_object(df, index=False)
+    hashes.index = row_keys(df)
+    return hashes
+
+
+def compute_delta(old: pd.DataFrame, new: pd.DataFrame) -> dict:
+    """
+    Function:
+    - Compares two versions of the dataset, rows being identified by their name and numeric_id.
+
+    Args:
+    - old (pd.DataFrame): the locally cached version
+    - new (pd.DataFrame): the newer version
+
+    Returns:
+    - dict: "added" and "changed" (full rows of `new`), "removed" (key columns of `old`), all DataFrames
+    """
+    old_hashes = row_hashes(old)
+    new_hashes = row_hashes(new)
+
+    added_keys = new_hashes.index.difference(old_hashes.index)
+    removed_keys = old_hashes.index.difference(new_hashes.index)
+    common_keys = new_hashes.index.intersection(old_hashes.index)
+    changed_keys = common_keys[new_hashes.loc[common_keys].values != old_hashes.loc[common_keys].values]
+
+    new_keys = new_hashes.index
+    old_keys = old_hashes.index
+    return {
+        "added": new[new_keys.isin(added_keys)].reset_index(drop=True),
+        "changed": new[new_keys.isin(changed_keys)].reset_index(drop=True),
+        "removed": old.loc[old_keys.isin(removed_keys), KEY_COLUMNS].reset_index(drop=True),
+    }
+
+
+def is_empty(delta: dict) -> bool:
+    return all(len(delta[part]) == 0 for part in ["added", "changed", "removed"])
+
+
+def apply_delta(df: pd.DataFrame, delta: dict) -> pd.DataFrame:
+    """
+    Returns a new DataFrame with `delta` applied to `df` : removed and changed rows are dropped, changed and added
+    rows are appended. The row order of the untouched rows is kept.
+    """
+    dropped = pd.concat([delta["removed"][KEY_COLUMNS], delta["changed"][KEY_COLUMNS]])
+    dropped["numeric_id"] = dropped["numeric_id"].astype(df["numeric_id"].dtype)
+
+    parts = [df[~row_keys(df).isin(row_keys(dropped))]]
+    parts += [delta[part].astype(df.dtypes.to_dict()) for part in ["changed", "added"] if len(delta[part])]
+    return pd.concat(parts, ignore_index=True)
+
+
+def touched_urls(delta: dict) -> list:
+    """Returns the urls of the changed rows, i.e. the scraped pages that may be stale."""
+    if "URL" not in delta["changed"].columns:
+        return []
+    return delta["changed"]["URL"].tolist()
+
+
+def write_delta(delta: dict, filepath: str, from_version: str, to_version: str) -> None:
+    """Writes a delta as a (small) JSON document, gzip compressed if `filepath` ends with .gz."""
+    document = {
+        "from_version": from_version,
+        "to_version": to_version,
+        **{part: json.loads(delta[part].to_json(orient="records")) for part in ["added", "changed", "removed"]},
+    }
+    with open_text(filepath, mode="w") as file:
+        json.dump(document, file)
+
+
+def read_delta(source) -> dict:
+    """
+    Reads a delta written by `write_delta`, from a path or from the raw (possibly gzipped) bytes.
+
+    Returns:
+    - dict: the delta parts (DataFrames) plus "from_version" and "to_version"
+    """
+    if isinstance(source, bytes):
+        document = json.loads(gzip.decompress(source) if source[:2] == b"\x1f\x8b" else source)
+    else:
+        with open_text(source, mode="r") as file:
+            document = json.load(file)
+
+    delta = {part: pd.DataFrame(document[part]) for part in ["added", "changed", "removed"]}
+    if delta["removed"].empty:
+        delta["removed"] = pd.DataFrame(columns=KEY_COLUMNS)
+    delta["from_version"] = document["from_version"]
+    delta["to_version"] = document["to_version"]
+    return delta
+
+
+def open_text(filepath: str, mode: str):
+    if filepath.endswith(".gz"):
+        return gzip.open(filepath, mode=f"{mode}t", encoding="utf-8")
+    return open(filepath, mode=mode, encoding="utf-8")
+
+
+def publish(old: pd.DataFrame, new: pd.DataFrame, from_version: str, to_version: str, directory: str) -> dict:
+    """
+    Function:
+    - Computes the delta between two versions, writes it to `directory`/deltas and records it in the manifest
+    of `directory` (the datasets folder published next to metbull_data.json).
+
+    Returns:
+    - dict: the updated manifest
+    """
+    os.makedirs(os.path.join(directory, "deltas"), exist_ok=True)
+    relative_path = f"deltas/{from_version}_{to_version}.json.gz"
+    write_delta(compute_delta(old, new), os.path.join(directory, relative_path), from_version, to_version)
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    manifest = {"version": None, "deltas": []}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, mode="r") as file:
+            manifest = json.load(file)
+
+    manifest["version"] = to_version
+    manifest["deltas"] = [entry for entry in manifest["deltas"] if entry["from"] != from_version]
+    manifest["deltas"].append({"from": from_version, "to": to_version, "path": relative_path})
+    with open(manifest_path, mode="w") as file:
+        json.dump(manifest, file, indent=1)
+    return manifest
+
+
+def delta_chain(manifest: dict, version: str) -> list | None:
+    """
+    Returns the delta entries leading from `version` to the manifest's version, in order ([] if already up to date),
+    or None if the chain is broken (the snapshot is too old or unknown, a full download is needed).
+    """
+    by_origin = {entry["from"]: entry for entry in manifest.get("deltas", [])}
+    chain = []
+    while version != manifest["version"]:
+        entry = by_origin.get(version)
+        if entry is None or len(chain) > len(by_origin):
+            return None
+        chain.append(entry)
+        version = entry["to"]
+    return chain
@@ -0,0 +1,165 @@
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from sysyphus.models.meteorite import SCRAPED_ATTRIBUTES
+from sysyphus.scripts import metrics, writers
+from sysyphus.scripts.metrics import Stats
+
+
+FORMAT_VERSION = 1
+DECIMAL_COLUMNS = ["fs_content", "wo_content", "fa_content"]  # floats once extracted, see Meteorite
+COORDINATE_COLUMNS = ["coordinates_latitude", "coordinates_longitude"]  # decimal coordinates
+TEXT_COLUMNS = [attr for attr in SCRAPED_ATTRIBUTES if attr not in DECIMAL_COLUMNS and attr != "coordinates"]
+
+
+def as_text(value) -> str | None:
+    """Scraped values are strings, anything else is the Meteorite default (e.g. the dataset mass) and is left out."""
+    return value if isinstance(value, str) else None
+
+
+def as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def build(records: dict, df: pd.DataFrame, version: str | None = None, stats: Stats = None) -> "EnrichedBundle":
+    """
+    Function:
+    - Compiles scraped records (e.g. ScrapeCache.items()) into a columnar table joined to the dataset : one row per
+    meteorite of `df` that was scraped, indexed by url, with its name and every scraped attribute. Records of
+    meteorites no longer in the dataset are left out.
+
+    Args:
+    - records (dict): {url: record}, see Meteorite.to_record
+    - df (pd.DataFrame): sy_df, the dataset the bundle is built for
+    - version (str): dataset version of `df`, kept in the bundle metadata
+    - stats (Stats): records the "enriched_build" stage
+
+    Returns:
+    - EnrichedBundle
+    """
+    with metrics.timed(stats, "enriched_build", records=len(records)) as fields:
+        names = df.drop_duplicates("URL").set_index("URL")["name"]
+        urls = [url for url in records if url in names.index]
+        columns = {"name": names.reindex(urls).to_numpy()}
+        for attr in TEXT_COLUMNS:
+            columns[attr] = [as_text(records[url].get(attr)) for url in urls]
+        for attr in DECIMAL_COLUMNS:
+            columns[attr] = np.array([as_float(records[url].get(attr)) for url in urls], dtype=float)
+        coordinates = [records[url].get("coordinates") or (None, None) for url in urls]
+        for position, column in enumerate(COORDINATE_COLUMNS):
+            columns[column] = np.array([as_float(pair[position]) for pair in coordinates], dtype=float)
+        frame = pd.DataFrame(columns, index=pd.Index(urls, name="URL"))
+        fields["rows"] = len(frame)
+    meta = {"format": FORMAT_VERSION, "dataset_version": version, "built_at": time.time(), "rows": len(frame)}
+    return EnrichedBundle(frame=frame, meta=meta)
+
+
+class EnrichedBundle:
+    def __init__(self, frame: pd.DataFrame, meta: dict) -> None:
+        """
+        The scraped properties of many meteorites, compiled ahead of time (see `build`) : a Boulder given a bundle
+        serves these meteorites without requesting their page.
+
+        Methods:
+        - get_many: records for several urls, like ScrapeCache.get_many
+        - hydrate: fills meteorite objects from the bundle and returns the ones still to scrape
+        - records: every record, e.g. for a spatial index
+        - discard: drops urls (meteorites changed by a dataset update)
+        - save / load: parquet file + json metadata
+
+        Attributes:
+        - frame (pd.DataFrame): one row per meteorite, indexed by url
+        - meta (dict): format, dataset_version, built_at & rows
+        """
+        self.frame = frame
+        self.meta = meta
+
+    @property
+    def version(self) -> str | None:
+        return self.meta.get("dataset_version")
+
+    def get_many(self, urls) -> dict:
+        """Returns {url: record} for the urls of `urls` in the bundle, missing values left out of the records."""
+        rows = self.frame[self.frame.index.isin(list(urls))]
+        records = {}
+        for url, row in zip(rows.index, rows.to_dict(orient="records")):
+            record = {attr: row[attr] for attr in TEXT_COLUMNS if isinstance(row[attr], str)}
+            record |= {attr: row[attr] for attr in DECIMAL_COLUMNS if not np.isnan(row[attr])}
+            record["coordinates"] = [row[column] for column in COORDINATE_COLUMNS]
+            records[url] = record
+        return records
+
+    def hydrate(self, meteorites: list) -> list:
+        """
+        Loads the bundled properties into the meteorites found in the bundle.
+
+        Returns:
+        - the meteorites that are not bundled, i.e. the ones that still have to be scraped (or found in a cache)
+        """
+        records = self.get_many(meteorite.url for meteorite in meteorites)
+        missing = []
+        for meteorite in meteorites:
+            if meteorite.url in records:
+                meteorite.load_record(records[meteorite.url])
+            else:
+                missing.append(meteorite)
+        return missing
+
+    def records(self) -> dict:
+        return self.get_many(self.frame.index)
+
+    def discard(self, urls: list) -> None:
+        self.frame = self.frame[~self.frame.index.isin(list(urls))]
+        self.meta = self.meta | {"rows": len(self.frame)}
+
+    def save(self, filepath: str, compression: str = "zstd") -> str:
+        """
+        Writes the bundle as parquet (`filepath` without extension) and its metadata next to it (.json).
+
+        Returns:
+        - str: the path of the parquet file, the one to give to `load`
+        """
+        path = writers.save(self.frame, filepath, file_format="parquet", compression=compression)
+        with writers.atomic_path(f"{path}.json") as tmp_path:
+            with open(tmp_path, mode="w") as file:
+                json.dump(self.meta, file)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "EnrichedBundle":
+        """
+        Raises:
+        - ValueError: if the bundle was built by an incompatible version of sysyphus
+        """
+        with open(f"{path}.json", mode="r") as file:
+            meta = json.load(file)
+        if meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported enriched bundle format in {path}, rebuild it")
+        frame = pd.read_parquet(path)
+        if "URL" in frame.columns:
+            frame = frame.set_index("URL")
+        return cls(frame=frame, meta=meta)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.frame.index
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __repr__(self) -> str:
+        return f"EnrichedBundle(version={self.version}, meteorites={len(self)})"
+
+
+def open_bundle(bundle: "EnrichedBundle | str | None") -> "EnrichedBundle | None":
+    if isinstance(bundle, str):
+        if not os.path.exists(bundle):
+            raise ValueError(f"No enriched bundle at {bundle}")
+        return EnrichedBundle.load(bundle)
+    return bundle
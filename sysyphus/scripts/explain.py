@@ -0,0 +1,128 @@
+import tracemalloc
+
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class QueryStep:
+    def __init__(self, name: str, argument, access: str, rows_in: int) -> None:
+        """
+        One filter of an executed search, see `QueryReport`.
+
+        Attributes:
+        - name (str): the filter (name, country, type, classification)
+        - argument: what it was given (query, criteria...)
+        - access (str): how the rows were reached : column scanned, precomputed columns or index used
+        - rows_in / rows_out (int): rows before and after the filter
+        - seconds (float): wall time
+        - allocated (int): peak bytes allocated while it ran, retained (int): bytes still held after (its result)
+        - skipped (bool): not run, an earlier filter left no row
+        """
+        self.name = name
+        self.argument = argument
+        self.access = access
+        self.rows_in = rows_in
+        self.rows_out = rows_in
+        self.seconds = 0.0
+        self.allocated = 0
+        self.retained = 0
+        self.skipped = False
+
+    @property
+    def selectivity(self) -> float | None:
+        """Share of the rows kept, None if the filter got no row."""
+        return self.rows_out / self.rows_in if self.rows_in else None
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name, "argument": self.argument, "access": self.access, "rows_in": self.rows_in,
+            "rows_out": self.rows_out, "seconds": self.seconds, "allocated": self.allocated,
+            "retained": self.retained, "skipped": self.skipped,
+        }
+
+    def __repr__(self) -> str:
+        return f"QueryStep(name={self.name}, rows={self.rows_in}->{self.rows_out}, seconds={self.seconds:.6f})"
+
+
+class QueryReport:
+    def __init__(self, parameters: dict, dataset: dict = None, memory: bool = True) -> None:
+        """
+        Explain / profile report of a search (see Boulder.explain and search(profile=True)) : the filters executed,
+        in order, with the way each one reached the rows, the rows surviving it, its wall time and the memory it
+        allocated (traced with tracemalloc, which slows the filters down, pass memory=False to time them alone).
+
+        Methods:
+        - step: measures one filter (context manager, used by search.apply_filters)
+        - slowest: the filter that took the longest
+        - to_dict / as_frame: the report as a dict (JSON serializable) or as one DataFrame row per filter
+
+        Attributes:
+        - parameters (dict): the search parameters
+        - dataset (dict): what was searched (rows, source : shared dataset, private copy, snapshot...)
+        - steps (list): QueryStep objects, in execution order
+        - seconds (float): wall time of the whole search, rows_out (int): rows selected
+        """
+        self.parameters = parameters
+        self.dataset = dataset if dataset is not None else {}
+        self.memory = memory
+        self.steps = []
+        self.seconds = 0.0
+        self.rows_out = None
+
+    @contextmanager
+    def step(self, name: str, argument, access: str, rows_in: int):
+        """Measures the filter run in the block, which sets `rows_out` on the yielded QueryStep."""
+        step = QueryStep(name=name, argument=argument, access=access, rows_in=rows_in)
+        started = self.memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        start = perf_counter()
+        try:
+            yield step
+        finally:
+            step.seconds = perf_counter() - start
+            if self.memory:
+                current, peak = tracemalloc.get_traced_memory()
+                step.allocated, step.retained = max(peak - before, 0), max(current - before, 0)
+            if started:
+                tracemalloc.stop()
+            self.steps.append(step)
+            self.seconds += step.seconds
+
+    def skip(self, name: str, argument, access: str) -> None:
+        step = QueryStep(name=name, argument=argument, access=access, rows_in=0)
+        step.skipped = True
+        self.steps.append(step)
+
+    def slowest(self) -> QueryStep | None:
+        return max(self.steps, key=lambda step: step.seconds, default=None)
+
+    def to_dict(self) -> dict:
+        return {
+            "parameters": self.parameters, "dataset": self.dataset, "seconds": self.seconds,
+            "rows_out": self.rows_out, "steps": [step.to_dict() for step in self.steps],
+        }
+
+    def as_frame(self):
+        import pandas as pd  # Deferred, like the rest of the search layer
+
+        return pd.DataFrame([step.to_dict() for step in self.steps])
+
+    def __str__(self) -> str:
+        lines = [f"Search over {self.dataset.get('rows', '?')} rows ({self.dataset.get('source', 'dataset')}), "
+                 f"{self.rows_out} selected in {self.seconds * 1000:.2f} ms"]
+        for position, step in enumerate(self.steps, start=1):
+            if step.skipped:
+                lines.append(f"{position}. {step.name}={step.argument!r}: skipped, no row left")
+                continue
+            lines.append(
+                f"{position}. {step.name}={step.argument!r} via {step.access}: {step.rows_in} -> {step.rows_out} "
+                f"rows, {step.seconds * 1000:.2f} ms, {step.allocated / 1024:.0f} KiB allocated"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self) -> str:
+        return f"QueryReport(steps={[step.name for step in self.steps]}, rows_out={self.rows_out})"
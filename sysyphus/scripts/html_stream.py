@@ -0,0 +1,102 @@
+from html.parser import HTMLParser
+
+import requests
+
+
+CHUNK_SIZE = 8192
+DRAIN_MAX = 64 * 1024  # rest of a page read to keep its connection, past it a new connection is cheaper
+
+
+class TableScanner(HTMLParser):
+    def __init__(self, table_id: str = "maintable") -> None:
+        """
+        Incremental scan of an html page, fed chunk by chunk : `complete` turns True once the table `table_id`
+        (nested tables included) has been closed. Only the tags are looked at, nothing is kept.
+        """
+        super().__init__(convert_charrefs=False)
+        self.table_id = table_id
+        self.depth = 0  # tables open inside the target one, itself included
+        self.complete = False
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if tag != "table" or self.complete:
+            return
+        if self.depth > 0:
+            self.depth += 1
+        elif dict(attrs).get("id") == self.table_id:
+            self.depth = 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "table" and self.depth > 0:
+            self.depth -= 1
+            self.complete = self.depth == 0
+
+
+def release(response: requests.Response, drain_max: int = DRAIN_MAX) -> bool:
+    """
+    Function:
+    - Ends a streamed response read early. A remainder of at most `drain_max` bytes (from its Content-Length, or
+    read until then when unknown) is drained undecoded, so the keep-alive connection goes back to the session pool
+    for the next page. A larger remainder is not downloaded, the connection is closed instead.
+
+    Returns:
+    - bool: True if the connection was returned to the pool
+    """
+    raw = response.raw
+    if raw is None or getattr(raw, "closed", True):  # replayed or already consumed
+        response.close()
+        return False
+    try:
+        length = int(response.headers.get("Content-Length"))
+    except (TypeError, ValueError):
+        length = None
+    if length is not None and length - raw.tell() > drain_max:
+        response.close()
+        return False
+
+    drained = 0
+    try:
+        for chunk in raw.stream(CHUNK_SIZE, decode_content=False):
+            drained += len(chunk)
+            if drained > drain_max:
+                response.close()
+                return False
+    except Exception:
+        response.close()
+        return False
+    raw.release_conn()
+    response.close()
+    return True
+
+
+def read_until_table(
+        response: requests.Response, table_id: str = "maintable", chunk_size: int = CHUNK_SIZE,
+        ) -> tuple:
+    """
+    Function:
+    - Reads a streamed response until the table `table_id` is complete, then stops : the rest of the page
+    (references, pictures...) is not parsed. A small rest is drained so the keep-alive connection goes back to
+    the session pool, a large one is never downloaded and its connection is closed (see `release`).
+    - The whole body is read when the table is not found.
+
+    Args:
+    - response (requests.Response): a response fetched with stream=True (a fully read one works too)
+    - table_id (str): id of the table to read
+    - chunk_size (int): bytes read at a time
+
+    Returns:
+    - tuple: (bytes read, whether the table was complete before the end of the body)
+    """
+    scanner = TableScanner(table_id=table_id)
+    chunks = []
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            chunks.append(chunk)
+            scanner.feed(chunk.decode("latin-1"))  # tags are ascii, any byte decodes
+            if scanner.complete:
+                break
+    except BaseException:
+        response.close()
+        raise
+    release(response)
+    return b"".join(chunks), scanner.complete
@@ -0,0 +1,237 @@
+import os
+import pickle
+import re
+import shutil
+import sys
+import tempfile
+import weakref
+
+from time import perf_counter
+
+from sysyphus.scripts.remote_load import cache_dir
+
+
+POLICIES = ["soups_first", "lru"]
+KINDS = ["pinned", "soups", "cache", "spill"]  # eviction : none, purge the html trees, drop, write to disk
+TIERS = {"soups": 0, "cache": 1, "spill": 2}  # eviction order of the soups_first policy
+SOUP_FACTOR = 8  # a parsed html tree takes several times the size of its markup
+UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2, "g": 1024 ** 3, "gb": 1024 ** 3}
+
+
+def parse_size(size: int | str | None) -> int | None:
+    """Bytes from an int or a string like "512MB", "2 GB" or "800k", None stays None (no limit)."""
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([a-zA-Z]*)\s*", str(size))
+    if match is None or match.group(2).lower() not in UNITS:
+        raise ValueError(f"Invalid memory size '{size}', expected e.g. 512MB, 2GB or a number of bytes")
+    return int(float(match.group(1)) * UNITS[match.group(2).lower()])
+
+
+def object_size(obj, seen: set = None) -> int:
+    """
+    Function:
+    - Approximate memory held by `obj` : deep usage of DataFrames and Series, nbytes of numpy arrays, recursion
+    through containers and object attributes, and sys.getsizeof for the rest.
+    - Objects whose id is in `seen` are not counted again (e.g. sy_df referenced by the summaries), `seen` is
+    updated so the caller can share it between measures.
+    """
+    seen = set() if seen is None else seen
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if hasattr(obj, "memory_usage") and hasattr(obj, "dtypes"):  # DataFrame & Series, without importing pandas
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if hasattr(obj, "nbytes") and hasattr(obj, "dtype"):  # numpy array, the items of object arrays on top
+        size = int(obj.nbytes)
+        if obj.dtype == object:
+            size += sum(object_size(item, seen) for item in obj.ravel())
+        return size
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(object_size(key, seen) + object_size(value, seen) for key, value in obj.items())
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(object_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__") and not isinstance(obj, type):
+        return sys.getsizeof(obj) + object_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+def soup_size(meteorite) -> int:
+    """
+    Estimate of the memory of the parsed html tree kept by a meteorite, from the bytes of the page it was parsed
+    from (Meteorite.soup_bytes, recorded once when the tree is kept) : the tree is never serialized to measure it.
+    """
+    return 0 if meteorite.table_soup is None else meteorite.soup_bytes * SOUP_FACTOR
+
+
+class Entry:
+    def __init__(self, name: str, kind: str, measure: callable, evict: callable = None) -> None:
+        self.name = name
+        self.kind = kind
+        self.measure = measure
+        self.evict = evict
+        self.last_used = perf_counter()
+        self.evictions = 0
+
+
+class MemoryBudget:
+    def __init__(self, limit: int | str = None, policy: str = "soups_first", spill_dir: str = None) -> None:
+        """
+        Accounts for the memory held by an object (a Boulder : dataset, selection, meteorites and their parsed html,
+        results, indexes...) and, over `limit`, evicts what can be evicted until it fits again.
+
+        Entries are tracked by kind :
+        - pinned: accounted for, never evicted (the dataset, scraped meteorites)
+        - soups: parsed html trees, purged (cheap to lose, the properties are already extracted)
+        - cache: dropped, rebuilt on next use (spatial index, summaries...)
+        - spill: written to `spill_dir` and removed from memory, read back on next access (see `restore`)
+
+        Methods:
+        - track / track_attribute: registers an entry
+        - touch: marks an entry as used, for the lru order
+        - usage / total: current bytes by entry / all together
+        - enforce: evicts by policy while over the limit
+        - restore / discard: reads back / forgets a spilled entry
+        - close: forgets every spilled entry and removes the temporary spill directory
+
+        Args:
+        - limit (int | str): bytes or a size like "2GB", None only accounts and never evicts
+        - policy (str): soups_first (default) evicts the soups, then the caches, then spills, least recently used
+        first within each kind. lru evicts the least recently used entry whatever its kind
+        - spill_dir (str): where spilled entries go. By default, a temporary directory in the sysyphus cache, created
+        on the first spill and removed once nothing is spilled anymore (or when the budget is closed or collected)
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid memory policy '{policy}'. Options are {', '.join(POLICIES)}.")
+        self.limit = parse_size(limit)
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.entries = {}
+        self.spilled = {}  # {name: (owner, path)}
+        self._cleanup = None  # removes the temporary spill directory, see `spill`
+
+    def track(self, name: str, kind: str, measure: callable, evict: callable = None) -> None:
+        """Registers an entry measured by `measure(seen)` (bytes, see object_size) and evicted by `evict()`."""
+        if kind not in KINDS:
+            raise ValueError(f"Invalid entry kind '{kind}'. Options are {', '.join(KINDS)}.")
+        self.entries[name] = Entry(name=name, kind=kind, measure=measure, evict=evict)
+
+    def track_attribute(self, owner, attr: str, kind: str) -> None:
+        """
+        Registers the attribute `attr` of `owner` : a cache entry is set to None on eviction, a spill entry is
+        written to disk and deleted from `owner` (whose __getattr__ should call `restore`).
+        """
+        def measure(seen: set) -> int:
+            return object_size(owner.__dict__.get(attr), seen)
+
+        evict = None
+        if kind == "cache":
+            def evict():
+                setattr(owner, attr, None)
+        elif kind == "spill":
+            def evict():
+                self.spill(owner, attr)
+        self.track(name=attr, kind=kind, measure=measure, evict=evict)
+
+    def touch(self, name: str) -> None:
+        if name in self.entries:
+            self.entries[name].last_used = perf_counter()
+
+    def usage(self) -> dict:
+        """Returns {entry: bytes}, objects shared by several entries are counted once (pinned entries first)."""
+        seen = set()
+        ordered = sorted(self.entries.values(), key=lambda entry: entry.kind != "pinned")
+        return {entry.name: entry.measure(seen) for entry in ordered}
+
+    def total(self) -> int:
+        return sum(self.usage().values())
+
+    def candidates(self) -> list:
+        """Evictable entries, in eviction order for the policy."""
+        evictable = [entry for entry in self.entries.values() if entry.kind != "pinned"]
+        if self.policy == "lru":
+            return sorted(evictable, key=lambda entry: entry.last_used)
+        return sorted(evictable, key=lambda entry: (TIERS[entry.kind], entry.last_used))
+
+    def enforce(self) -> list:
+        """
+        Evicts entries, in policy order, until the total fits in the limit.
+
+        Returns:
+        - list: the names of the entries evicted
+        """
+        if self.limit is None:
+            return []
+        usage = self.usage()
+        total = sum(usage.values())
+        evicted = []
+        for entry in self.candidates():
+            if total <= self.limit:
+                break
+            if usage.get(entry.name, 0) == 0:
+                continue
+            entry.evict()
+            entry.evictions += 1
+            evicted.append(entry.name)
+            total -= usage[entry.name]
+        return evicted
+
+    def spill(self, owner, attr: str) -> str:
+        """Writes the attribute `attr` of `owner` to disk and deletes it from `owner`, returns the file path."""
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="spill-", dir=cache_dir())
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self.spill_dir, ignore_errors=True)
+        directory = self.spill_dir
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{attr}-{id(owner)}.pkl")
+        with open(path, mode="wb") as file:
+            pickle.dump(owner.__dict__.pop(attr), file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.spilled[attr] = (owner, path)
+        return path
+
+    def is_spilled(self, attr: str) -> bool:
+        return attr in self.spilled
+
+    def restore(self, attr: str):
+        """Reads a spilled attribute back into its owner and returns it."""
+        owner, path = self.spilled.pop(attr)
+        with open(path, mode="rb") as file:
+            value = pickle.load(file)
+        os.remove(path)
+        self._remove_spill_dir()
+        setattr(owner, attr, value)
+        self.touch(attr)
+        return value
+
+    def discard(self, attr: str) -> None:
+        """Forgets a spilled attribute (e.g. a selection dumped), its file is removed."""
+        if attr in self.spilled:
+            _, path = self.spilled.pop(attr)
+            if os.path.exists(path):
+                os.remove(path)
+        self._remove_spill_dir()
+
+    def close(self) -> None:
+        """Forgets every spilled entry, their files and the temporary spill directory are removed."""
+        for attr in list(self.spilled):
+            self.discard(attr)
+
+    def _remove_spill_dir(self) -> None:
+        """Removes the temporary spill directory once empty, a later spill creates a new one."""
+        if self._cleanup is not None and not self.spilled:
+            self._cleanup()
+            self._cleanup = None
+            self.spill_dir = None
+
+    def summary(self) -> dict:
+        usage = self.usage()
+        return {
+            "limit": self.limit, "total": sum(usage.values()), "policy": self.policy, "usage": usage,
+            "spilled": sorted(self.spilled),
+            "evictions": {name: entry.evictions for name, entry in self.entries.items()},
+        }
+
+    def __repr__(self) -> str:
+        return f"MemoryBudget(limit={self.limit}, policy={self.policy}, entries={list(self.entries)})"
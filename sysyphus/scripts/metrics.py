@@ -0,0 +1,167 @@
+import bisect
+import threading
+
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+
+
+# Upper bounds (seconds) of the latency buckets, the last one catches everything slower
+BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf")]
+
+
+class Histogram:
+    def __init__(self) -> None:
+        """
+        Fixed buckets latency histogram: observing is a bisect and a few additions, so it is cheap enough
+        to stay on for every request. Quantiles are approximated by the upper bound of their bucket.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[bisect.bisect_left(BUCKETS, value)] += 1
+
+    def quantile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-th quantile (capped by the max observed)."""
+        if self.count == 0:
+            return float("nan")
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "mean_s": self.total / self.count if self.count else float("nan"),
+            "min_s": self.min if self.count else float("nan"),
+            "p50_s": self.quantile(0.5),
+            "p95_s": self.quantile(0.95),
+            "max_s": self.max if self.count else float("nan"),
+        }
+
+
+class Stats:
+    def __init__(self, track_urls: bool = False) -> None:
+        """
+        Counters and latency histograms of a job, by stage (download, parse, search, http, html_parse...)
+        and by url. Every recorded timing is also handed to the registered hooks.
+
+        Attributes:
+        - counters (dict): named counters (bytes, retries, cache_hits, replayed...)
+        - stages (dict): stage name -> Histogram
+        - urls (dict): url -> {"requests", "seconds", "bytes", "retries", "status"}, with `track_urls` only
+
+        Methods:
+        - timer: context manager timing a stage, yields a dict the caller can enrich (bytes, status...)
+        - observe: records a timing measured elsewhere
+        - incr: increments a counter
+        - add_hook / remove_hook: callbacks called with every timing event
+        - summary / as_frame: current state as a dict / a pandas DataFrame
+
+        Args:
+        - track_urls (bool): keep per url entries, off by default : one entry per page ever requested, they grow
+        without bound in long lived objects (a Boulder, the daemon)
+        """
+        self.track_urls = track_urls
+        self.counters = {}
+        self.stages = {}
+        self.urls = {}
+        self.hooks = []
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float, start: float = None, **fields) -> None:
+        """
+        Records a timing for `stage`. Known fields : url (per url entry), bytes and retries (counters),
+        status (last HTTP status of the url). Other fields are only passed to the hooks.
+        """
+        url = fields.get("url")
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+            for counter in ["bytes", "retries"]:
+                if fields.get(counter):
+                    self.counters[counter] = self.counters.get(counter, 0) + fields[counter]
+
+            if url is not None and self.track_urls and stage == "http":
+                entry = self.urls.setdefault(url, {"requests": 0, "seconds": 0.0, "bytes": 0, "retries": 0})
+                entry["requests"] += 1
+                entry["seconds"] += seconds
+                entry["bytes"] += fields.get("bytes") or 0
+                entry["retries"] += fields.get("retries") or 0
+                entry["status"] = fields.get("status")
+
+        if self.hooks:
+            event = {
+                "stage": stage, "start": perf_counter() - seconds if start is None else start,
+                "duration": seconds, "thread": threading.get_ident(), **fields,
+            }
+            for hook in list(self.hooks):
+                hook(event)
+
+    @contextmanager
+    def timer(self, stage: str, **fields):
+        fields = dict(fields)
+        start = perf_counter()
+        try:
+            yield fields
+        finally:
+            self.observe(stage, perf_counter() - start, start=start, **fields)
+
+    def add_hook(self, callback: callable) -> None:
+        """
+        Registers `callback`, called with a dict (stage, start, duration, thread + the stage fields) after each
+        timing. Hooks run in the thread that recorded the timing, keep them short.
+        """
+        self.hooks.append(callback)
+
+    def remove_hook(self, callback: callable) -> None:
+        self.hooks.remove(callback)
+
+    def reset(self) -> None:
+        """Clears counters, histograms and urls, hooks are kept."""
+        with self._lock:
+            self.counters = {}
+            self.stages = {}
+            self.urls = {}
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {stage: histogram.to_dict() for stage, histogram in self.stages.items()},
+                "urls": len(self.urls),
+            }
+
+    def as_frame(self):
+        """Returns the stages summary as a pandas DataFrame, one row per stage."""
+        import pandas as pd
+
+        return pd.DataFrame.from_dict(self.summary()["stages"], orient="index")
+
+    def __repr__(self) -> str:
+        return f"Stats(stages={list(self.stages)}, counters={self.counters})"
+
+
+def timed(stats: Stats | None, stage: str, **fields):
+    """Times `stage` on `stats`, or does nothing if stats is None. Yields the fields dict either way."""
+    if stats is None:
+        return nullcontext(dict(fields))
+    return stats.timer(stage, **fields)
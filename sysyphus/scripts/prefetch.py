@@ -0,0 +1,145 @@
+import queue
+import threading
+
+from sysyphus.scripts import scheduler
+from sysyphus.scripts.metrics import Stats
+
+
+DEFAULT_LIMIT = 200  # meteorites prefetched at most, past this size a selection is a sweep (see validate_selection)
+DEFAULT_WORKERS = 4  # concurrent prefetch requests, the budget is shared with every other job anyway
+
+
+class Prefetcher:
+    def __init__(
+            self, meteorites: list, cache=None, rate_limiter: int = DEFAULT_WORKERS,
+            priority: str | int = "background", stats: Stats = None,
+            ) -> None:
+        """
+        Speculative fetch of the pages of a selection, in background threads, while the user is still looking at it.
+        The requests run as a low priority job of the process wide scheduler : they share the request budget and
+        any other job (e.g. the request_metbull that follows) is served first.
+
+        Hand off (see user_requests.request_cached): `hydrate` loads the meteorites already prefetched, the pages
+        still being fetched are joined by the requests of the same urls (see meteorite.pages_in_flight), `cancel`
+        drops the ones not started yet.
+
+        Methods:
+        - hydrate: fills meteorite objects from the prefetched records and returns the ones still to scrape
+        - cancel: stops prefetching, the requests running complete (at the priority of the hand off, if given)
+        - wait: blocks until every page was prefetched or the prefetch was cancelled
+
+        Attributes:
+        - records (dict): {url: record} of the meteorites prefetched so far (see Meteorite.to_record)
+        - job (scheduler.Job): the job of the prefetch requests
+
+        Args:
+        - meteorites (list): Meteorite objects to prefetch, their own (not the ones requested later)
+        - cache (ScrapeCache): if given, the prefetched meteorites are stored in it as well
+        - rate_limiter (int): background threads, i.e. concurrent prefetch requests at most
+        - priority (str | int): scheduling of the requests, background (after bulk jobs) by default
+        - stats (Stats): counts the "prefetched" meteorites
+        """
+        self.records = {}
+        self.cache = cache
+        self.stats = stats
+        self.total = len(meteorites)
+        self.job = scheduler.get_scheduler().register(name="prefetch", priority=priority)
+
+        self._queue = queue.SimpleQueue()
+        for meteorite in meteorites:
+            self._queue.put(meteorite)
+        self._cancelled = threading.Event()
+        self._finished = threading.Event()
+        self._lock = threading.Lock()
+        self._running = min(max(rate_limiter, 1), len(meteorites))
+        self._workers = [
+            threading.Thread(target=self._work, name=f"prefetch-{position}", daemon=True)  # never holds exit back
+            for position in range(self._running)
+        ]
+        if not self._workers:
+            self._finish()
+        for worker in self._workers:
+            worker.start()
+
+    def _work(self) -> None:
+        try:
+            while not self._cancelled.is_set():
+                try:
+                    meteorite = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                scheduler.run_as(self.job, self._fetch, meteorite)
+        finally:
+            with self._lock:
+                self._running -= 1
+                last = self._running == 0
+            if last:
+                self._finish()
+
+    def _fetch(self, meteorite) -> None:
+        try:
+            meteorite.extract_properties()
+        except Exception as e:
+            print(f"Prefetch error: {e}")
+            return
+        if not meteorite.extracted:
+            return
+        with self._lock:
+            self.records[meteorite.url] = meteorite.to_record()
+        if self.cache is not None:
+            self.cache.put(meteorite)
+        if self.stats is not None:
+            self.stats.incr("prefetched")
+
+    def _finish(self) -> None:
+        scheduler.get_scheduler().unregister(self.job)
+        self._finished.set()
+
+    def hydrate(self, meteorites: list) -> list:
+        """
+        Loads the prefetched properties into the meteorites already prefetched.
+
+        Returns:
+        - the meteorites that are not prefetched (yet), i.e. the ones that still have to be scraped
+        """
+        with self._lock:
+            records = dict(self.records)
+        missing = []
+        for meteorite in meteorites:
+            if meteorite.url in records:
+                meteorite.load_record(records[meteorite.url])
+            else:
+                missing.append(meteorite)
+        return missing
+
+    def cancel(self, priority: str | int = None) -> None:
+        """
+        Stops the prefetch : the pages not requested yet are dropped, the ones being requested complete.
+
+        Args:
+        - priority (str | int): if given and higher, the requests still running or waiting for a slot continue at
+        this priority : a request joining one of their pages (see meteorite.pages_in_flight) is not left waiting
+        behind every bulk job for a background slot
+        """
+        self._cancelled.set()
+        if priority is not None and scheduler.as_priority(priority) < self.job.priority:
+            scheduler.get_scheduler().set_priority(self.job, priority)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def done(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Returns True once the prefetch is over (complete or cancelled), False if `timeout` expired first."""
+        return self._finished.wait(timeout)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __repr__(self) -> str:
+        state = "cancelled" if self.cancelled else "done" if self.done else "running"
+        return f"Prefetcher(prefetched={len(self)}/{self.total}, {state})"
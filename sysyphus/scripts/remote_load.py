@@ -1,43 +1,286 @@
 import requests
-import io
+import hashlib
+import json
+import os
+import tempfile
+import time
 
 import pandas as pd
 
+from sysyphus.scripts import delta, metrics, transport
+from sysyphus.scripts.metrics import Stats
 
-def get_remote_data(as_pd: bool = True, use_json: bool = True) -> pd.DataFrame | None:
+
+DATASETS_URL = "https://github.com/Psemp/sysyphus_notebooks/raw/main/datasets/"
+CHUNK_SIZE = 1 << 16  # bytes written to disk per read of the streamed download
+PARSE_CHUNK_ROWS = 20_000  # json lines parsed at once
+
+
+def get_remote_data(
+        as_pd: bool = True, use_json: bool = True, stats: Stats = None, manifest: dict = None,
+        ) -> pd.DataFrame | None:
     """
     Fetches a remote dataset from a the remote metbull monthly clone data
-    and loads it into a pandas DataFrame.
+    and loads it into a pandas DataFrame. The download is streamed to the cache directory (see download_dataset)
+    and parsed from there, so peak memory stays close to the size of the DataFrame itself.
+    The file is checked against the checksum published in `manifest`, when given, and a previous download with that
+    checksum is reused.
 
     Parameters:
         - as_pd: bool : default = True: whether to return the data as a pandas dataframe or a dict (not implemented yet)
+        - stats: Stats : default = None: records the "download" and "dataset_parse" stages if given
+        - manifest: dict : default = None: the manifest already fetched (see update_dataset), never fetched here :
+        without one, the file is downloaded again and not verified
 
     Returns:
         - pandas.DataFrame: The loaded dataset.
     """
 
     if not use_json:
-        url = "https://github.com/Psemp/sysyphus_notebooks/raw/main/datasets/metbull_data.pkl"
+        url = f"{DATASETS_URL}metbull_data.pkl"
     elif use_json:
-        url = "https://github.com/Psemp/sysyphus_notebooks/raw/main/datasets/metbull_data.json"
+        url = f"{DATASETS_URL}metbull_data.json"
+
+    filepath = os.path.join(download_dir(), os.path.basename(url))
+    sha256 = None if manifest is None else expected_checksum(os.path.basename(url), manifest=manifest)
+    download_dataset(url=url, filepath=filepath, stats=stats, sha256=sha256)
+
+    with metrics.timed(stats, "dataset_parse"):
+        return read_dataset(filepath=filepath, use_json=use_json)
+
+
+def download_dir() -> str:
+    directory = os.path.join(cache_dir(), "downloads")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def expected_checksum(name: str, manifest: dict) -> str | None:
+    """The sha256 of the dataset file `name` published in the manifest (see builder.build), None if there is none."""
+    return manifest.get("checksums", {}).get(name)
+
+
+def file_sha256(filepath: str) -> str:
+    digest = hashlib.sha256()
+    with open(filepath, mode="rb") as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download_dataset(url: str, filepath: str, stats: Stats = None, sha256: str = None) -> str:
+    """
+    Function:
+    - Streams the dataset at `url` to `filepath`, chunk by chunk : the body is never held in memory as a whole.
+    Compressed transfer is requested and decoded on the fly. The file is written to a temporary file of its own
+    next to its destination and only renamed once complete, so an interrupted download never leaves a truncated
+    dataset behind and concurrent downloads do not collide.
+    The sha256 of the content is written alongside (`filepath`.sha256).
+    - With `sha256`, a file already at `filepath` whose stored and actual checksums both match it is reused
+    without any request ("download_reused" counter).
+
+    Args:
+    - url (str): the dataset url
+    - filepath (str): destination file
+    - stats (Stats): records the "download" stage (bytes written) if given
+    - sha256 (str): expected checksum, the download is discarded if it does not match
+
+    Returns:
+    - str: the sha256 hex digest of the downloaded content
+
+    Raises:
+    - ValueError: the content does not match `sha256`
+    """
+    checksum_path = f"{filepath}.sha256"
+    if sha256 is not None and os.path.exists(filepath) and os.path.exists(checksum_path):
+        with open(checksum_path, mode="r") as file:
+            stored = file.read().strip()
+        if stored == sha256 and file_sha256(filepath) == sha256:
+            if stats is not None:
+                stats.incr("download_reused")
+            return sha256
+
+    with metrics.timed(stats, "download", url=url) as fields:
+        response = transport.fetch(url=url, headers={"Accept-Encoding": "gzip, deflate"}, stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise Exception(f"Failed to fetch dataset: {response.status_code}")
+
+        digest = hashlib.sha256()
+        size = 0
+        directory, name = os.path.split(os.path.abspath(filepath))
+        descriptor, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".part", dir=directory)
+        try:
+            with os.fdopen(descriptor, mode="wb") as file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        finally:
+            response.close()
+        fields["bytes"] = size
+
+    if sha256 is not None and digest.hexdigest() != sha256:
+        os.remove(tmp_path)
+        raise ValueError(f"Checksum mismatch for {url}: expected {sha256}, got {digest.hexdigest()}")
+
+    os.replace(tmp_path, filepath)
+    descriptor, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".sha256", dir=directory)
+    with os.fdopen(descriptor, mode="w") as file:
+        file.write(digest.hexdigest())
+    os.replace(tmp_path, checksum_path)
+    return digest.hexdigest()
 
-    response = requests.get(url=url)
 
-    if response.status_code == 200:
-        data = io.BytesIO(response.content)
-        if not use_json:
-            df = pd.read_pickle(data)
-        else:
-            df = pd.read_json(data, orient="records", lines=True)
-        return df
-    else:
-        raise Exception(f"Failed to fetch dataset: {response.status_code}")
+def read_dataset(filepath: str, use_json: bool = True) -> pd.DataFrame:
+    """
+    Loads a downloaded dataset, json lines are parsed by chunks of PARSE_CHUNK_ROWS rows. Each chunk is split in
+    columns as soon as it is parsed, and the chunks are joined one column at a time, each column's parts released
+    once joined : peak memory stays close to the size of the DataFrame, where a single concat of the chunks holds
+    them all next to the result.
+    """
+    if not use_json:
+        return pd.read_pickle(filepath)
+    parts, lengths = {}, []  # {column: {chunk position: Series}}, rows of each chunk
+    with pd.read_json(filepath, orient="records", lines=True, chunksize=PARSE_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            for column in chunk.columns:  # copies : the chunk's 2D blocks are freed with the chunk
+                parts.setdefault(column, {})[len(lengths)] = chunk[column].copy()
+            lengths.append(len(chunk))
+    joined = {}
+    for column in list(parts):
+        column_parts = parts.pop(column)
+        empty = next(iter(column_parts.values())).iloc[:0]
+        joined[column] = pd.concat(
+            [  # a key missing from every line of a chunk is all NaN there, of the column's dtype like concat
+                column_parts[position] if position in column_parts else empty.reindex(pd.RangeIndex(length))
+                for position, length in enumerate(lengths)
+            ],
+            ignore_index=True,
+        )
+        del column_parts
+    return pd.DataFrame(joined, copy=False)
+
+
+def cache_dir() -> str:
+    """
+    Returns the local directory where sysyphus keeps its caches (created if missing) :
+    $SYSYPHUS_CACHE_DIR if set, ~/.cache/sysyphus otherwise.
+    """
+    directory = os.environ.get("SYSYPHUS_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sysyphus"))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def snapshot_paths() -> tuple:
+    """Returns the paths of the locally cached dataset snapshot and of its metadata."""
+    directory = os.path.join(cache_dir(), "snapshot")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, "metbull_data.pkl"), os.path.join(directory, "snapshot.json")
+
+
+def save_snapshot(df: pd.DataFrame, version: str) -> None:
+    """Caches `df` locally as dataset version `version`, files are replaced atomically."""
+    data_path, meta_path = snapshot_paths()
+    df.to_pickle(f"{data_path}.tmp")
+    os.replace(f"{data_path}.tmp", data_path)
+    with open(f"{meta_path}.tmp", mode="w") as file:
+        json.dump({"version": version, "rows": len(df), "saved_at": time.time()}, file)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+
+def load_snapshot() -> tuple:
+    """Returns the locally cached dataset and its metadata, (None, None) if there is none."""
+    data_path, meta_path = snapshot_paths()
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+    with open(meta_path, mode="r") as file:
+        meta = json.load(file)
+    return pd.read_pickle(data_path), meta
+
+
+def fetch_manifest() -> dict | None:
+    """
+    Returns the manifest published next to the remote dataset : {"version": ..., "deltas": [{from, to, path}]},
+    or None if it is not available (the incremental update then falls back to a full download).
+    """
+    try:
+        response = transport.fetch(url=f"{DATASETS_URL}{delta.MANIFEST_NAME}")
+    except requests.exceptions.RequestException:
+        return None
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def fetch_deltas(manifest: dict, version: str, stats: Stats = None) -> list | None:
+    """
+    Downloads the deltas leading from `version` to the manifest version.
+
+    Returns:
+    - the list of deltas (see delta.read_delta), [] if up to date, None if no chain of deltas is published
+    """
+    chain = delta.delta_chain(manifest=manifest, version=version)
+    if chain is None:
+        return None
+
+    deltas = []
+    for entry in chain:
+        url = f"{DATASETS_URL}{entry['path']}"
+        with metrics.timed(stats, "delta_download", url=url) as fields:
+            response = transport.fetch(url=url)
+            fields["bytes"] = len(response.content)
+        if response.status_code != 200:
+            return None
+        deltas.append(delta.read_delta(response.content))
+    return deltas
+
+
+def update_dataset(use_json: bool = True, stats: Stats = None) -> tuple:
+    """
+    Function:
+    - Brings the locally cached snapshot up to date by applying the published row level deltas
+    (kilobytes a month), and only downloads the whole dataset when there is no usable snapshot or delta chain.
+
+    Args:
+    - use_json (bool): format of the full download, when one is needed
+    - stats (Stats): records the download, delta_download, dataset_parse & delta_apply stages
+
+    Returns:
+    - tuple: (dataset DataFrame, dataset version or None if unknown, list of the deltas applied)
+    """
+    snapshot, meta = load_snapshot()
+    manifest = fetch_manifest()
+
+    if snapshot is not None and manifest is not None:
+        if meta["version"] == manifest["version"]:
+            return snapshot, meta["version"], []
+
+        deltas = fetch_deltas(manifest=manifest, version=meta["version"], stats=stats)
+        if deltas is not None:
+            with metrics.timed(stats, "delta_apply", deltas=len(deltas)):
+                for row_delta in deltas:
+                    snapshot = delta.apply_delta(snapshot, row_delta)
+            save_snapshot(snapshot, version=manifest["version"])
+            return snapshot, manifest["version"], deltas
+
+    df = get_remote_data(as_pd=True, use_json=use_json, stats=stats, manifest=manifest)
+    version = manifest["version"] if manifest is not None else None
+    if version is not None:
+        save_snapshot(df, version=version)
+    return df, version, []
 
 
 def check_internet_connection(url="https://www.qwant.com", timeout=5):
     """
-    Pings qwant to check if internet cnx is available
+    Pings qwant to check if internet cnx is available, always True when the transport is
+    replaying a cassette or redirected to a local stand-in server
     """
+    if transport.is_local():
+        return True
     try:
         requests.get(url, timeout=timeout)
         return True
@@ -34,7 +34,7 @@ def show_properties(
 
     # Define the columns to be displayed
     columns = [
-            "name", "type", "mass", "pieces", "coordinates", "latitude", "longitude", "fall_country",
+            "name", "type", "mass", "pieces", "coordinates", "latitude", "longitude", "fall_country", "fall_year",
             "weathering_g", "shock_stage", "mag_sus", "fa_content", "fs_content", "wo_content",  "tsm", "type_spec_loc"
             ]
 
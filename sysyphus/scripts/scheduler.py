@@ -0,0 +1,172 @@
+import itertools
+import threading
+
+from contextlib import contextmanager
+from time import perf_counter
+
+
+DEFAULT_BUDGET = 25  # concurrent requests to MetBull for the whole process
+PRIORITIES = {"interactive": 0, "normal": 5, "bulk": 10, "background": 20}  # lower goes first
+INTERACTIVE_MAX = 50  # selections up to this size are interactive by default
+
+_local = threading.local()
+
+
+def as_priority(priority: str | int) -> int:
+    if isinstance(priority, int):
+        return priority
+    if priority not in PRIORITIES:
+        raise ValueError(f"Invalid priority '{priority}'. Options are {', '.join(PRIORITIES)} or an int.")
+    return PRIORITIES[priority]
+
+
+def default_priority(size: int) -> str:
+    """Small selections are someone waiting for an answer, large ones are sweeps."""
+    return "interactive" if size <= INTERACTIVE_MAX else "bulk"
+
+
+class Job:
+    def __init__(self, name: str, priority: int) -> None:
+        """A scrape job holding a share of the scheduler budget, see `Scheduler.job`."""
+        self.name = name
+        self.priority = priority
+        self.in_flight = 0  # requests running
+        self.waiting = 0  # requests waiting for a slot
+        self.granted = 0  # requests made
+        self.wait_time = 0.0  # seconds spent waiting for slots, all requests together
+        self.last_grant = 0  # order of its last grant, the job served longest ago goes first among equals
+
+    def __repr__(self) -> str:
+        return (f"Job(name={self.name}, priority={self.priority}, in_flight={self.in_flight}, "
+                f"waiting={self.waiting}, granted={self.granted})")
+
+
+class Scheduler:
+    def __init__(self, budget: int = DEFAULT_BUDGET) -> None:
+        """
+        Shares a single budget of concurrent requests between every scrape job of the process. A free slot goes to
+        the waiting request of the job with the best (lowest) priority, then, between jobs of the same priority,
+        to the one with the fewest requests running and served longest ago : concurrent jobs get even shares and
+        a small interactive lookup is served before the next request of a bulk sweep.
+
+        Methods:
+        - job: registers a job (context manager), or register / unregister for jobs outliving a block
+        - slot: waits for a slot on behalf of a job (context manager), see transport.fetch
+        - jobs: the jobs registered
+        - set_priority: changes the priority of a job, its requests already waiting included
+
+        Args:
+        - budget (int): concurrent requests allowed, whatever the number of jobs and threads
+        """
+        self.budget = budget
+        self.active = 0
+        self._jobs = []
+        self._waiting = []  # (job, sequence), one per request waiting
+        self._sequence = itertools.count()
+        self._grants = itertools.count(1)
+        self._condition = threading.Condition()
+
+    def register(self, name: str, priority: str | int = "normal") -> Job:
+        job = Job(name=name, priority=as_priority(priority))
+        with self._condition:
+            self._jobs.append(job)
+        return job
+
+    def unregister(self, job: Job) -> None:
+        with self._condition:
+            if job in self._jobs:
+                self._jobs.remove(job)
+
+    @contextmanager
+    def job(self, name: str, priority: str | int = "normal"):
+        """Registers a job for the duration of the block and yields it."""
+        job = self.register(name=name, priority=priority)
+        try:
+            yield job
+        finally:
+            self.unregister(job)
+
+    def _next(self) -> tuple:
+        return min(self._waiting, key=lambda entry: (
+            entry[0].priority, entry[0].in_flight, entry[0].last_grant, entry[1],
+        ))
+
+    def acquire(self, job: Job) -> None:
+        entry = (job, next(self._sequence))
+        start = perf_counter()
+        with self._condition:
+            self._waiting.append(entry)
+            job.waiting += 1
+            while not (self.active < self.budget and self._next() is entry):
+                self._condition.wait()
+            self._waiting.remove(entry)
+            job.waiting -= 1
+            self.active += 1
+            job.in_flight += 1
+            job.granted += 1
+            job.last_grant = next(self._grants)
+            job.wait_time += perf_counter() - start
+            self._condition.notify_all()  # the next request in line may fit as well
+
+    def release(self, job: Job) -> None:
+        with self._condition:
+            self.active -= 1
+            job.in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, job: Job):
+        self.acquire(job)
+        try:
+            yield
+        finally:
+            self.release(job)
+
+    def set_priority(self, job: Job, priority: str | int) -> None:
+        """E.g. someone now waits for the pages of a background job : its requests still queued move up the line."""
+        with self._condition:
+            job.priority = as_priority(priority)
+            self._condition.notify_all()
+
+    def set_budget(self, budget: int) -> None:
+        if budget < 1:
+            raise ValueError("The request budget must be at least 1")
+        with self._condition:
+            self.budget = budget
+            self._condition.notify_all()
+
+    def jobs(self) -> list:
+        with self._condition:
+            return list(self._jobs)
+
+    def __repr__(self) -> str:
+        return f"Scheduler(budget={self.budget}, active={self.active}, jobs={len(self._jobs)})"
+
+
+_scheduler = Scheduler()
+_default_job = Job(name="default", priority=PRIORITIES["normal"])  # requests made outside of any job
+
+
+def get_scheduler() -> Scheduler:
+    """Returns the process wide scheduler, every request to MetBull goes through it (see transport.fetch)."""
+    return _scheduler
+
+
+def configure(budget: int = DEFAULT_BUDGET) -> None:
+    """Sets the process wide budget of concurrent requests (25 by default, out of fairness to MetBull)."""
+    _scheduler.set_budget(budget)
+
+
+def current_job() -> Job:
+    """The job of the calling thread, see `run_as`."""
+    return getattr(_local, "job", None) or _default_job
+
+
+def run_as(job: Job, function: callable, *args, **kwargs):
+    """Runs `function` with `job` as the job of the calling thread, e.g. in an executor worker."""
+    previous = getattr(_local, "job", None)
+    _local.job = job
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _local.job = previous
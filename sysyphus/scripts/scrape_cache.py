@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from sysyphus.models.meteorite import VALIDATORS, Meteorite
+from sysyphus.scripts.remote_load import cache_dir
+
+
+def default_path() -> str:
+    return os.path.join(cache_dir(), "scrape_cache.sqlite")
+
+
+class ScrapeCache:
+    def __init__(self, path: str = None) -> None:
+        """
+        Persistent cache of the properties scraped from MetBull, one entry per meteorite page (keyed on the url).
+        Backed by sqlite, safe to share between the threads of `request_selected` and between processes.
+
+        Methods:
+        - get / get_many: cached records for one / several urls
+        - put: stores the scraped properties of a meteorite, with the validators of its page
+        - items: every cached record
+        - validators: etag, last_modified & content_hash of cached pages, to revalidate them
+        - urls: the cached urls, optionally only the ones fetched before a date
+        - hydrate: fills meteorite objects from the cache and returns the ones still to scrape
+
+        Args:
+        - path (str): sqlite file, default is scrape_cache.sqlite in the sysyphus cache directory
+        """
+        self.path = path if path is not None else default_path()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, name TEXT, properties TEXT, fetched_at REAL, "
+                "etag TEXT, last_modified TEXT, content_hash TEXT)"
+            )
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(pages)")}
+            for column in VALIDATORS:  # caches created before the validators were kept
+                if column not in columns:
+                    self._connection.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+
+    def get(self, url: str) -> dict | None:
+        return self.get_many([url]).get(url)
+
+    def get_many(self, urls: list) -> dict:
+        """Returns {url: record} for the cached urls among `urls`."""
+        records = {}
+        urls = list(urls)
+        with self._lock:
+            for start in range(0, len(urls), 500):  # sqlite caps the number of bound parameters
+                batch = urls[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT url, properties FROM pages WHERE url IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                records.update({url: json.loads(properties) for url, properties in rows})
+        return records
+
+    def items(self) -> dict:
+        """Returns {url: record} for every cached page."""
+        with self._lock:
+            rows = self._connection.execute("SELECT url, properties FROM pages").fetchall()
+        return {url: json.loads(properties) for url, properties in rows}
+
+    def validators(self, urls: list) -> dict:
+        """Returns {url: {etag, last_modified, content_hash}} for the cached urls among `urls`."""
+        validators = {}
+        urls = list(urls)
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT url, {', '.join(VALIDATORS)} FROM pages "
+                    f"WHERE url IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                validators.update({row[0]: dict(zip(VALIDATORS, row[1:])) for row in rows})
+        return validators
+
+    def urls(self, fetched_before: float = None) -> list:
+        """Returns the cached urls, only the ones fetched before the timestamp `fetched_before` if given."""
+        with self._lock:
+            if fetched_before is None:
+                rows = self._connection.execute("SELECT url FROM pages").fetchall()
+            else:
+                rows = self._connection.execute(
+                    "SELECT url FROM pages WHERE fetched_at < ?", (fetched_before,)
+                ).fetchall()
+        return [url for url, in rows]
+
+    def put(self, meteorite: Meteorite) -> None:
+        self.put_many([meteorite])
+
+    def put_many(self, meteorites: list) -> None:
+        """Stores the meteorites whose properties were extracted, the others are ignored."""
+        rows = [
+            (meteorite.url, meteorite.name, json.dumps(meteorite.to_record()), time.time())
+            + tuple(meteorite.validators.get(key) for key in VALIDATORS)
+            for meteorite in meteorites if meteorite.extracted
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT OR REPLACE INTO pages (url, name, properties, fetched_at, {', '.join(VALIDATORS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def discard(self, urls: list) -> None:
+        """Removes the entries of `urls` (e.g. meteorites changed in a dataset update), unknown urls are ignored."""
+        with self._lock, self._connection:
+            self._connection.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in urls])
+
+    def hydrate(self, meteorites: list) -> list:
+        """
+        Loads the cached properties into the meteorites found in the cache.
+
+        Returns:
+        - the meteorites that are not cached, i.e. the ones that still have to be scraped
+        """
+        records = self.get_many(meteorite.url for meteorite in meteorites)
+        missing = []
+        for meteorite in meteorites:
+            if meteorite.url in records:
+                meteorite.load_record(records[meteorite.url])
+            else:
+                missing.append(meteorite)
+        return missing
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __repr__(self) -> str:
+        return f"ScrapeCache(path={self.path}, pages={len(self)})"
@@ -1,6 +1,10 @@
-import pandas as pd
-import json
-import requests
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from sysyphus.scripts import classification, explain, vocabulary
+
+if TYPE_CHECKING:
+    import pandas as pd  # Annotations only, the module must stay importable without loading pandas
 
 
 def search_by_name(df, name_query, numeric_range: int | list = None):
@@ -38,34 +42,105 @@ def search_by_name(df, name_query, numeric_range: int | list = None):
 
 def search_by_type(df: pd.DataFrame, query: str) -> pd.DataFrame | str:
     """
-    Returns the dataframe
+    Returns the rows of the dataframe whose type matches the query (case insensitive, anchored), `df` is not modified
     """
     query_lower = query.lower()
-    df["type_lower"] = df["type"].str.lower()
-
-    matched_df = df[df["type_lower"].str.match(f"^{query_lower}$", case=False, na=False)]
+    type_lower = df["type"].str.lower()
 
-    result_df = matched_df.drop(columns=["type_lower"])
-    df.drop(columns=["country_lower", "type_lower"], errors="ignore", inplace=True)
+    result_df = df[type_lower.str.match(f"^{query_lower}$", case=False, na=False)]
 
     if result_df.empty:
         return f"ERROR: No meteorite type exactly matching '{query}' found."
-    return result_df.drop(columns=["type_lower"], errors="ignore")
+    return result_df
 
 
 def search_by_country(df: pd.DataFrame, query: str) -> pd.DataFrame | str:
+    """
+    Returns the rows of the dataframe whose country matches the query (case insensitive, anchored), `df` is not modified
+    """
     query_lower = query.lower()
-    df["country_lower"] = df["country"].str.lower()
+    country_lower = df["country"].str.lower()
 
-    matched_df = df[df["country_lower"].str.match(f"^{query_lower}$", case=False, na=False)]
+    result_df = df[country_lower.str.match(f"^{query_lower}$", case=False, na=False)]
 
-    result_df = matched_df.drop(columns=["country_lower", "type_lower"], errors="ignore")
-    df.drop(columns=["country_lower", "type_lower"], errors="ignore", inplace=True)
     if result_df.empty:
         return f"ERROR: No meteorite found with country exactly matching '{query}' found."
     return result_df
 
 
+def search_by_classification(df: pd.DataFrame, criteria: dict) -> pd.DataFrame | str:
+    """
+    Returns the rows of the dataframe matching the classification criteria (see classification.select), e.g.
+    {"group": "H"} for every H chondrite whatever its petrologic type, `df` is not modified
+    """
+    result_df = df[classification.select(df, criteria)]
+
+    if result_df.empty:
+        return f"ERROR: No meteorite classified as {criteria} found."
+    return result_df
+
+
+def filter_plan(df: pd.DataFrame, parameters: dict) -> list:
+    """
+    The filters `apply_filters` runs for `parameters`, in order : (name, function, kwargs, access), access
+    describing how the filter reaches the rows of `df` (see explain.QueryReport).
+    """
+    plan = []
+    if "namespace" in parameters.keys():
+        access = "scan of name (digits stripped, contains)"
+        if parameters.get("numeric_range") is not None:
+            access += " then numeric_id comparison"
+        kwargs = {"name_query": parameters["namespace"], "numeric_range": parameters.get("numeric_range")}
+        plan.append(("name", search_by_name, kwargs, access))
+    if "country" in parameters.keys():
+        plan.append(("country", search_by_country, {"query": parameters["country"]}, "scan of country (exact match)"))
+    if "type" in parameters.keys():
+        plan.append(("type", search_by_type, {"query": parameters["type"]}, "scan of type (exact match)"))
+    if "classification" in parameters.keys():
+        if classification.COLUMNS["class"] in df.columns:
+            access = "precomputed classification columns, distinct values only"
+        else:
+            access = "types parsed on the fly (no classification columns)"
+        plan.append(("classification", search_by_classification, {"criteria": parameters["classification"]}, access))
+    return plan
+
+
+def apply_filters(df: pd.DataFrame, parameters: dict, report: explain.QueryReport = None) -> pd.DataFrame:
+    """
+    Applies the search parameters, as returned by `search_prompts`, to the dataframe.
+
+    Args:
+    - df (pd.DataFrame): the dataset to search (sy_df), it is never modified
+    - parameters (dict): any of "namespace", "numeric_range" (used with namespace only), "country", "type" &
+    "classification" (criteria dict)
+    - report (explain.QueryReport): if given, each filter is measured and added to it
+
+    Returns:
+    - pd.DataFrame: the matching rows, a new (possibly empty) DataFrame
+    """
+    result = df
+    for name, function, kwargs, access in filter_plan(df, parameters):
+        argument = kwargs if len(kwargs) > 1 else next(iter(kwargs.values()))
+        if isinstance(result, str):  # The search_by_* functions describe an empty result with an error message
+            if report is not None:
+                report.skip(name, argument=argument, access=access)
+            continue
+        if report is None:
+            result = function(df=result, **kwargs)
+            continue
+        with report.step(name, argument=argument, access=access, rows_in=len(result)) as step:
+            result = function(df=result, **kwargs)
+            step.rows_out = 0 if isinstance(result, str) else len(result)
+
+    if isinstance(result, str):
+        result = df.iloc[0:0].copy()
+    elif result is df:
+        result = df.copy()
+    if report is not None:
+        report.rows_out = len(result)
+    return result
+
+
 def validate_name(name: str) -> tuple:
     """Checks if name is valid, returning the name or None and an error message."""
     if len(name) >= 2 and any(char.isalpha() for char in name):
@@ -87,48 +162,95 @@ def validate_numeric_range(num_range: str) -> tuple:
     return None, "Numeric ID range must be one or two integers (e.g., 100 or 100,200)."
 
 
-def validate_country(country: str, validation_file: str) -> tuple:
-    """Checks if country is valid, returning the country and an error message, if relevant."""
-    try:
-        with open(file=validation_file, mode="r") as file:
-            countries = json.load(file)
-    except FileNotFoundError:
-        print("File not found, fetching from GH.")
-        country_url = "https://raw.githubusercontent.com/Psemp/sysyphus/main/sysyphus/utils/country_validation.json"
-        countries = requests.get(country_url).json()
+def validate_country(country: str, validation_file: str = None) -> tuple:
+    """
+    Checks if country is valid, returning the country and an error message, if relevant.
+    Uses the registered country vocabulary, or the one in `validation_file` (loaded once) if given.
+    """
+    countries = vocabulary.from_file(validation_file) if validation_file else vocabulary.get_vocabulary("country")
 
     country = country.lower().strip()
     if len(country) > 0:
-        if country.lower() in countries:
-            return country, None
+        canonical = countries.canonicalize(country)
+        if canonical is not None:
+            return canonical, None
         else:
-            return None, "Country not found in the list of countries. Check entire list in utils"
+            return None, "Country not found in the list of countries. Check entire list in utils" + suggest(
+                countries, country)
 
     elif len(country) == 0:
         return None, "blank selected"
 
 
-def validate_mtype(mtype: str, validation_file: str) -> tuple:
-    """Checks if meteorite type is valid, returning the mtype and an error message, if relevant."""
-    try:
-        with open(file=validation_file, mode="r") as file:
-            types = json.load(file)
-    except FileNotFoundError:
-        print("File not found, fetching from GH.")
-        type_url = "https://raw.githubusercontent.com/Psemp/sysyphus/main/sysyphus/utils/type_validation.json"
-        types = requests.get(type_url).json()
+def validate_mtype(mtype: str, validation_file: str = None) -> tuple:
+    """
+    Checks if meteorite type is valid, returning the mtype and an error message, if relevant.
+    Uses the registered type vocabulary, or the one in `validation_file` (loaded once) if given.
+    """
+    types = vocabulary.from_file(validation_file) if validation_file else vocabulary.get_vocabulary("type")
 
     mtype = mtype.lower().strip()
     if len(mtype) > 0:
-        if mtype.lower() in types:
-            return mtype.lower(), None
+        canonical = types.canonicalize(mtype)
+        if canonical is not None:
+            return canonical, None
         else:
-            return None, "mtype not found in the list of types. Check entire lists utils"
+            return None, "mtype not found in the list of types. Check entire lists utils" + suggest(types, mtype)
 
     elif len(mtype) == 0:
         return None, "blank selected"
 
 
+def suggest(terms: vocabulary.Vocabulary, prefix: str) -> str:
+    """Formats the autocompletions of `prefix` to append to an error message, empty if there are none."""
+    completions = terms.complete(prefix, limit=5)
+    if not completions:
+        return ""
+    return f" (did you mean: {', '.join(completions)}?)"
+
+
+def build_parameters(
+        name: str = None, numeric_range: int | list = None, country: str = None, mtype: str = None,
+        classification_criteria: dict = None) -> dict:
+    """
+    Validates search arguments like the prompts do and returns them as search parameters (see `apply_filters`).
+    Arguments left to None are ignored. `classification_criteria` keys must be in classification.CRITERIA.
+
+    Raises:
+    - ValueError: if an argument does not pass its validation function
+    """
+    search_parameters = {}
+    checks = [
+        ("namespace", name, validate_name),
+        ("country", country, validate_country),
+        ("type", mtype, validate_mtype),
+    ]
+    for key, value, validation_function in checks:
+        if value is None:
+            continue
+        validated, error_message = validation_function(value)
+        if validated is None:
+            raise ValueError(f"Invalid {key} '{value}': {error_message}")
+        search_parameters[key] = validated
+
+    if numeric_range is not None:
+        if isinstance(numeric_range, (list, tuple)):
+            numeric_range = sorted(int(num) for num in numeric_range)
+        else:
+            numeric_range = int(numeric_range)
+        search_parameters["numeric_range"] = numeric_range
+
+    if classification_criteria:
+        unknown = set(classification_criteria) - set(classification.CRITERIA)
+        if unknown:
+            raise ValueError(
+                f"Invalid classification criteria {sorted(unknown)}: options are {', '.join(classification.CRITERIA)}"
+            )
+        search_parameters["classification"] = dict(classification_criteria)
+
+    return search_parameters
+
+
 def get_prompt(prompt_message: str, validation_function: callable = None) -> str | tuple | None:
     """
     Asks for user input and validates it. Re-prompts if the validation fails
@@ -145,14 +267,7 @@ def get_prompt(prompt_message: str, validation_function: callable = None) -> str
         if not user_input:  # Skips
             return None
         if validation_function:
-            if validation_function == validate_country:
-                validation_file = "../utils/country_validation.json"
-                validation_result, error_message = validation_function(user_input, validation_file)
-            elif validation_function == validate_mtype:
-                validation_file = "../utils/type_validation.json"
-                validation_result, error_message = validation_function(user_input, validation_file)
-            else:
-                validation_result, error_message = validation_function(user_input)
+            validation_result, error_message = validation_function(user_input)
 
             if validation_result is not None:
                 return validation_result
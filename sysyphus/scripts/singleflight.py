@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        """
+        Coalesces concurrent calls with the same key : the first caller runs the function, the callers arriving
+        while it runs wait for its result (or exception) instead of running it again. Nothing is cached, a call
+        made once the flight landed runs the function again.
+
+        Methods:
+        - do: from threads
+        - do_async: from coroutines, the function runs in a worker thread and waiters do not block the loop
+        - in_flight: keys currently running
+
+        Attributes:
+        - coalesced (int): calls answered by another caller's flight
+        """
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key) -> tuple:
+        """Returns (future of the flight for `key`, whether the caller leads it)."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            return future, True
+
+    def _run(self, key, future: Future, function: callable, args: tuple, kwargs: dict):
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+    def do(self, key, function: callable, *args, **kwargs) -> tuple:
+        """
+        Calls `function(*args, **kwargs)`, unless a call for `key` is already running, then waits for its result.
+
+        Returns:
+        - tuple: (result, shared), shared being True when the result comes from another caller's flight
+        """
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+        return self._run(key, future, function, args, kwargs), False
+
+    async def do_async(self, key, function: callable, *args, **kwargs) -> tuple:
+        """Same as `do` for coroutines, threads and coroutines asking for the same key share the same flight."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future), True
+        return await asyncio.to_thread(self._run, key, future, function, args, kwargs), False
+
+    def in_flight(self) -> list:
+        with self._lock:
+            return list(self._flights)
+
+    def __repr__(self) -> str:
+        return f"SingleFlight(in_flight={len(self._flights)}, coalesced={self.coalesced})"
@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from sysyphus.scripts import arrow_io, metrics, remote_load
+from sysyphus.scripts.metrics import Stats
+from sysyphus.scripts.writers import atomic_path
+
+
+FORMAT_VERSION = 1
+HASH_COLUMN = "_row_hash"
+
+_lock = threading.Lock()
+
+
+def store_dir(directory: str = None) -> str:
+    """The history is kept in the cache directory (see remote_load.cache_dir) unless another one is given."""
+    directory = directory or os.path.join(remote_load.cache_dir(), "history")
+    os.makedirs(os.path.join(directory, "segments"), exist_ok=True)
+    return directory
+
+
+def read_index(directory: str = None) -> dict:
+    path = os.path.join(store_dir(directory), "index.json")
+    if not os.path.exists(path):
+        return {"format": FORMAT_VERSION, "dtypes": None, "segments": [], "versions": {}}
+    with open(path, mode="r") as file:
+        index = json.load(file)
+    if index.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot store format in {path}, expected {FORMAT_VERSION}")
+    return index
+
+
+def write_index(index: dict, directory: str = None) -> None:
+    with atomic_path(os.path.join(store_dir(directory), "index.json")) as tmp_path:
+        with open(tmp_path, mode="w") as file:
+            json.dump(index, file)
+
+
+def segment_name(index: dict, label: str) -> str:
+    """
+    A segment file name never used in the store : numbered after every segment listed (and the counter kept in
+    the index), so a compaction never writes over a segment it is about to delete.
+    """
+    numbers = [int(segment["file"].split("_")[0]) + 1 for segment in index["segments"]]
+    number = max([index.get("next_segment", 0)] + numbers)
+    index["next_segment"] = number + 1
+    return f"{number:05d}_{label}.arrow"
+
+
+def to_runs(positions: np.ndarray) -> list:
+    """[5, 6, 7, 20, 21] -> [[5, 3], [20, 2]] : consecutive versions share long runs of unchanged rows."""
+    if len(positions) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(positions) != 1) + 1
+    starts = np.concatenate([[0], breaks])
+    lengths = np.diff(np.concatenate([starts, [len(positions)]]))
+    return [[int(positions[start]), int(length)] for start, length in zip(starts, lengths)]
+
+
+def from_runs(runs: list) -> np.ndarray:
+    if not runs:
+        return np.array([], dtype=np.int64)
+    return np.concatenate([np.arange(start, start + length, dtype=np.int64) for start, length in runs])
+
+
+def pool(index: dict, directory: str = None, memory_map: bool = True):
+    """Every row stored so far, as one (chunked, memory mapped) Table : segments in the order they were added."""
+    pa = arrow_io.require_pyarrow()
+    directory = store_dir(directory)
+    tables = [
+        arrow_io.read_ipc(os.path.join(directory, "segments", segment["file"]), memory_map=memory_map)
+        for segment in index["segments"]
+    ]
+    return pa.concat_tables(tables) if tables else None
+
+
+def add(df: pd.DataFrame, version: str, directory: str = None, stats: Stats = None) -> dict:
+    """
+    Function:
+    - Records `df` as dataset `version` (e.g. "2026-03"). Rows are deduplicated by content across every version
+    stored : only the rows never seen before are written (in a new Arrow segment), the version itself is the list
+    of the positions of its rows, stored as runs. A month of changes costs its changed rows, not a full copy.
+    Recording a version already stored does nothing.
+
+    Args:
+    - df (pd.DataFrame): the dataset (sy_df base columns, after the dtype cast)
+    - version (str): its version, versions are ordered as strings (YYYY-MM)
+    - directory (str): store location, see `store_dir`
+    - stats (Stats): records the "snapshot_store" stage
+
+    Returns:
+    - dict: the version entry (rows, new_rows, added_at)
+
+    Raises:
+    - ValueError: if the columns differ from the versions already stored
+    """
+    pa = arrow_io.require_pyarrow()
+    with _lock, metrics.timed(stats, "snapshot_store", version=version, rows=len(df)) as fields:
+        index = read_index(directory)
+        if version in index["versions"]:
+            fields["new_rows"] = 0
+            return {key: value for key, value in index["versions"][version].items() if key != "runs"}
+
+        if index["dtypes"] is None:
+            index["dtypes"] = {column: str(dtype) for column, dtype in df.dtypes.items()}
+        elif list(df.columns) != list(index["dtypes"]):
+            raise ValueError(
+                f"Columns {list(df.columns)} differ from the stored versions' {list(index['dtypes'])}"
+            )
+        df = df.astype(index["dtypes"]).reset_index(drop=True)
+        hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+        stored = pool(index, directory)
+        known = pd.Index(stored.column(HASH_COLUMN).to_numpy() if stored is not None else [], dtype="uint64")
+        positions = known.get_indexer(hashes)
+
+        new = positions == -1
+        new_hashes, first = np.unique(hashes[new], return_index=True)
+        if len(new_hashes):
+            order = np.sort(first)
+            rows = df[new].iloc[order].assign(**{HASH_COLUMN: hashes[new][order]})
+            segment = {"file": segment_name(index, version), "rows": len(rows)}
+            schema = stored.schema if stored is not None else None
+            table = pa.Table.from_pandas(rows, schema=schema, preserve_index=False)
+            arrow_io.write_ipc(table, os.path.join(store_dir(directory), "segments", segment["file"]))
+            index["segments"].append(segment)
+
+            offset = len(known)
+            new_positions = pd.Index(table.column(HASH_COLUMN).to_numpy(), dtype="uint64")
+            positions[new] = offset + new_positions.get_indexer(hashes[new])
+
+        entry = {"rows": len(df), "new_rows": int(len(new_hashes)), "added_at": time.time()}
+        index["versions"][version] = entry | {"runs": to_runs(positions)}
+        write_index(index, directory)
+        fields["new_rows"] = entry["new_rows"]
+    return entry
+
+
+def record(df: pd.DataFrame, version: str | None, stats: Stats = None) -> dict | None:
+    """`add` for the dataset loading : skipped when the version is unknown or pyarrow is not installed."""
+    if version is None:
+        return None
+    try:
+        arrow_io.require_pyarrow()
+    except ImportError:
+        return None
+    return add(df=df, version=version, stats=stats)
+
+
+def versions(directory: str = None) -> list:
+    """The versions stored, oldest first."""
+    return sorted(read_index(directory)["versions"])
+
+
+def resolve(as_of: str, directory: str = None) -> str:
+    """
+    Returns the version in effect at `as_of` : the version itself, or the latest one before it
+    ("2026-03-15" -> "2026-03").
+
+    Raises:
+    - ValueError: if no version that old is stored
+    """
+    candidates = [version for version in versions(directory) if version <= as_of]
+    if not candidates:
+        raise ValueError(f"No dataset version stored as of '{as_of}'. Versions stored: {versions(directory)}")
+    return candidates[-1]
+
+
+def open_version(as_of: str, directory: str = None, arrow_backed: bool = False, stats: Stats = None):
+    """
+    Function:
+    - Rebuilds the dataset as it was at `as_of` from the memory mapped segments : only the pages of the rows it
+    uses are read.
+
+    Args:
+    - as_of (str): a version (YYYY-MM) or a later date, see `resolve`
+    - arrow_backed (bool): keep the columns as Arrow arrays (pd.ArrowDtype) instead of converting them
+    - stats (Stats): records the "snapshot_open" stage
+
+    Returns:
+    - tuple: (DataFrame, version)
+    """
+    version = resolve(as_of, directory)
+    with metrics.timed(stats, "snapshot_open", version=version):
+        index = read_index(directory)
+        table = pool(index, directory).take(from_runs(index["versions"][version]["runs"]))
+        df = arrow_io.to_pandas(table.drop_columns([HASH_COLUMN]), arrow_backed=arrow_backed)
+    return df, version
+
+
+def remove(version: str, directory: str = None) -> None:
+    """Forgets a version, its rows stay in the segments until `compact`."""
+    with _lock:
+        index = read_index(directory)
+        if version not in index["versions"]:
+            raise ValueError(f"Version '{version}' is not stored. Versions stored: {sorted(index['versions'])}")
+        del index["versions"][version]
+        write_index(index, directory)
+
+
+def compact(directory: str = None) -> int:
+    """
+    Rewrites the segments without the rows no stored version uses anymore (after `remove`).
+
+    Returns:
+    - int: number of rows dropped
+    """
+    pa = arrow_io.require_pyarrow()
+    with _lock:
+        index = read_index(directory)
+        stored = pool(index, directory, memory_map=False)
+        if stored is None:
+            return 0
+        used = np.unique(np.concatenate(
+            [from_runs(entry["runs"]) for entry in index["versions"].values()] or [np.array([], dtype=np.int64)]
+        ))
+        dropped = stored.num_rows - len(used)
+        if dropped == 0:
+            return 0
+
+        remap = np.full(stored.num_rows, -1, dtype=np.int64)
+        remap[used] = np.arange(len(used))
+        old_files = [segment["file"] for segment in index["segments"]]
+        segment = {"file": segment_name(index, "compacted"), "rows": len(used)}
+        arrow_io.write_ipc(stored.take(pa.array(used)), os.path.join(store_dir(directory), "segments", segment["file"]))
+
+        index["segments"] = [segment]
+        for entry in index["versions"].values():
+            entry["runs"] = to_runs(remap[from_runs(entry["runs"])])
+        write_index(index, directory)
+        for name in set(old_files) - {segment["file"]}:
+            os.remove(os.path.join(store_dir(directory), "segments", name))
+    return int(dropped)
+
+
+def disk_usage(directory: str = None) -> dict:
+    """Bytes on disk against the rows the stored versions represent."""
+    index = read_index(directory)
+    segments = os.path.join(store_dir(directory), "segments")
+    return {
+        "versions": len(index["versions"]),
+        "stored_rows": sum(segment["rows"] for segment in index["segments"]),
+        "version_rows": sum(entry["rows"] for entry in index["versions"].values()),
+        "bytes": sum(os.path.getsize(os.path.join(segments, segment["file"])) for segment in index["segments"]),
+    }
@@ -0,0 +1,150 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180  # along a meridian
+HALF_CIRCUMFERENCE_KM = math.pi * EARTH_RADIUS_KM
+
+
+def haversine(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great circle distances (km) between a point and arrays of points, all in decimal degrees."""
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class SpatialIndex:
+    def __init__(self, keys: list, latitudes, longitudes, cell_deg: float = 0.5) -> None:
+        """
+        Grid index over decimal coordinates : points are bucketed in cells of `cell_deg` degrees, a query only
+        computes the (haversine) distances of the points in the cells it overlaps.
+
+        Methods:
+        - radius: points within a distance of a location
+        - bbox: points within a latitude / longitude box
+        - nearest: the k points closest to a location
+
+        Every query returns a DataFrame indexed by key with the latitude, longitude (and distance_km) columns.
+
+        Args:
+        - keys (list): identifies each point (e.g. the meteorite urls)
+        - latitudes, longitudes (array like): decimal degrees, points with a missing coordinate are left out
+        - cell_deg (float): grid resolution, ~ the typical query radius works best (0.5° ~ 55 km)
+        """
+        latitudes = np.asarray(latitudes, dtype=float)
+        longitudes = np.asarray(longitudes, dtype=float)
+        valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+
+        self.keys = np.asarray(keys, dtype=object)[valid]
+        self.latitudes = latitudes[valid]
+        self.longitudes = ((longitudes[valid] + 180) % 360) - 180
+        self.cell_deg = cell_deg
+
+        self.cells = {}
+        cell_rows = np.floor(self.latitudes / cell_deg).astype(int)
+        cell_cols = np.floor(self.longitudes / cell_deg).astype(int)
+        order = np.lexsort((cell_cols, cell_rows))
+        if len(order):
+            pairs = np.stack([cell_rows[order], cell_cols[order]], axis=1)
+            starts = np.flatnonzero(np.any(np.diff(pairs, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, starts):
+                self.cells[(int(cell_rows[group[0]]), int(cell_cols[group[0]]))] = group
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, column: str = "coordinates", cell_deg: float = 0.5) -> "SpatialIndex":
+        """Index over a DataFrame with a (latitude, longitude) column, like df_searched, keyed by its index."""
+        coordinates = [value if isinstance(value, (tuple, list)) else (np.nan, np.nan) for value in df[column]]
+        latitudes, longitudes = zip(*coordinates) if coordinates else ((), ())
+        return cls(keys=list(df.index), latitudes=latitudes, longitudes=longitudes, cell_deg=cell_deg)
+
+    @classmethod
+    def from_records(cls, records: dict, cell_deg: float = 0.5) -> "SpatialIndex":
+        """Index over scraped records ({url: record}, e.g. ScrapeCache.items()), keyed by url."""
+        keys, latitudes, longitudes = [], [], []
+        for url, record in records.items():
+            coordinates = record.get("coordinates")
+            if coordinates is None:
+                continue
+            keys.append(url)
+            latitudes.append(np.nan if coordinates[0] is None else coordinates[0])
+            longitudes.append(np.nan if coordinates[1] is None else coordinates[1])
+        return cls(keys=keys, latitudes=latitudes, longitudes=longitudes, cell_deg=cell_deg)
+
+    def _candidates(self, rows: range, cols: range | None) -> np.ndarray:
+        """Positions of the points in the given cells (cols None : every longitude)."""
+        if cols is None or len(rows) * len(cols) > len(self.cells):
+            found = [
+                positions for (row, col), positions in self.cells.items()
+                if row in rows and (cols is None or col in cols)
+            ]
+        else:
+            found = [self.cells[(row, col)] for row in rows for col in cols if (row, col) in self.cells]
+        return np.concatenate(found) if found else np.array([], dtype=int)
+
+    def _result(self, positions: np.ndarray, distances: np.ndarray = None) -> pd.DataFrame:
+        result = pd.DataFrame(
+            {"latitude": self.latitudes[positions], "longitude": self.longitudes[positions]},
+            index=pd.Index(self.keys[positions], name="key"),
+        )
+        if distances is not None:
+            result["distance_km"] = distances
+            result = result.sort_values("distance_km", kind="stable")
+        return result
+
+    def radius(self, latitude: float, longitude: float, radius_km: float) -> pd.DataFrame:
+        """Points within `radius_km` of (latitude, longitude), closest first."""
+        delta_lat = radius_km / KM_PER_DEGREE
+        min_lat, max_lat = max(latitude - delta_lat, -90), min(latitude + delta_lat, 90)
+        rows = range(math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg) + 1)
+
+        widest = max(abs(min_lat), abs(max_lat))
+        cols = None
+        if widest < 90 and radius_km < HALF_CIRCUMFERENCE_KM / 2:
+            delta_lon = delta_lat / math.cos(math.radians(widest))
+            if delta_lon < 180:
+                first = math.floor((longitude - delta_lon) / self.cell_deg)
+                last = math.floor((longitude + delta_lon) / self.cell_deg)
+                wrap = round(360 / self.cell_deg)
+                cols = range(first, last + 1)
+                if first < -wrap // 2 or last >= wrap // 2:  # crosses the antimeridian
+                    cols = None
+
+        positions = self._candidates(rows, cols)
+        distances = haversine(latitude, longitude, self.latitudes[positions], self.longitudes[positions])
+        keep = distances <= radius_km
+        return self._result(positions[keep], distances[keep])
+
+    def bbox(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> pd.DataFrame:
+        """Points inside the box, min_lon > max_lon for a box crossing the antimeridian."""
+        rows = range(math.floor(min_lat / self.cell_deg), math.floor(max_lat / self.cell_deg) + 1)
+        cols = None
+        if min_lon <= max_lon:
+            cols = range(math.floor(min_lon / self.cell_deg), math.floor(max_lon / self.cell_deg) + 1)
+
+        positions = self._candidates(rows, cols)
+        latitudes, longitudes = self.latitudes[positions], self.longitudes[positions]
+        keep = (latitudes >= min_lat) & (latitudes <= max_lat)
+        if min_lon <= max_lon:
+            keep &= (longitudes >= min_lon) & (longitudes <= max_lon)
+        else:
+            keep &= (longitudes >= min_lon) | (longitudes <= max_lon)
+        return self._result(positions[keep])
+
+    def nearest(self, latitude: float, longitude: float, k: int = 10) -> pd.DataFrame:
+        """The `k` points closest to (latitude, longitude), closest first."""
+        radius_km = self.cell_deg * KM_PER_DEGREE
+        while True:
+            result = self.radius(latitude, longitude, radius_km)
+            if len(result) >= k or radius_km >= HALF_CIRCUMFERENCE_KM:
+                return result.head(k)
+            radius_km = min(radius_km * 4, HALF_CIRCUMFERENCE_KM)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __repr__(self) -> str:
+        return f"SpatialIndex(points={len(self)}, cells={len(self.cells)}, cell_deg={self.cell_deg})"
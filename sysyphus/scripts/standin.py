@@ -0,0 +1,239 @@
+import argparse
+import gzip
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sysyphus.scripts.transport import Cassette
+
+
+PAGE_TEMPLATE = """<html><head><title>Meteoritical Bulletin: Entry for {name}</title></head>
+<body>
+<table id="maintable"><tr>
+<td><big>Data from:</big></td>
+<td><table>
+{rows}
+</table></td>
+</tr></table>
+<p>References and pictures are not reproduced by the stand-in server.</p>
+</body></html>
+"""
+
+
+def render_page(name: str, properties: dict) -> str:
+    """
+    Renders a minimal MetBull-like meteorite page, with the `maintable` "Data from:" cell that
+    Meteorite.get_soup looks for. Useful to build synthetic cassettes for tests and benchmarks.
+
+    Args:
+    - name (str): the meteorite name
+    - properties (dict): MetBull labels mapped to values, e.g. {"Latitude:": "25°4'51.93\"S"}
+    """
+    rows = "\n".join(f"<tr><td>{label}</td><td>{value}</td></tr>" for label, value in properties.items())
+    return PAGE_TEMPLATE.format(name=name, rows=rows)
+
+
+LISTING_TEMPLATE = """<html><head><title>Meteoritical Bulletin: Search the Database</title></head>
+<body>
+<table id="maintable">
+<tr><th>Name</th><th>Status</th><th>Year</th><th>Place</th><th>Type</th><th>Mass</th></tr>
+{rows}
+</table>
+</body></html>
+"""
+
+
+def render_listing(meteorites: list) -> str:
+    """
+    Renders a minimal MetBull-like listing page (search results), as read by builder.parse_listing.
+
+    Args:
+    - meteorites (list): dicts with name, code (of the meteorite page), year, place, type and mass (text, e.g. "21 g")
+    """
+    rows = "\n".join(
+        f'<tr><td><a href="metbull.php?code={meteorite["code"]}">{meteorite["name"]}</a></td><td>Official</td>'
+        f'<td>{meteorite["year"]}</td><td>{meteorite["place"]}</td><td>{meteorite["type"]}</td>'
+        f'<td>{meteorite["mass"]}</td></tr>'
+        for meteorite in meteorites
+    )
+    return LISTING_TEMPLATE.format(rows=rows)
+
+
+class QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address) -> None:
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return  # the client closed its connection (page read early, pool cleared), not a server error
+        super().handle_error(request, client_address)
+
+
+class StandInServer:
+    def __init__(
+            self, cassette_dir: str, dataset_path: str = None, latency: float | tuple = 0.0,
+            error_rate: float = 0.0, throttle_rate: float = 0.0, retry_after: float = 1,
+            seed: int = None, host: str = "127.0.0.1", port: int = 0,
+            ) -> None:
+        """
+        Local stand-in for MetBull (and for the GitHub hosted dataset), serving the pages of a cassette.
+        Point the package at it with `transport.configure(base_url=server.url)`. Pages carry an ETag (the recorded
+        one, or a hash of the body) and conditional requests get a 304 when the page did not change.
+
+        Attributes:
+        - url (str): base url of the running server
+        - hits (dict): number of responses served, by status code
+        - connections (int): connections accepted, keep-alive (HTTP/1.1) lets a client reuse one for several pages
+
+        Args:
+        - cassette_dir (str): cassette recorded with the transport "record" mode (or built by hand)
+        - dataset_path (str): local dataset file, served for any path ending with /datasets/<its file name>
+        (name it metbull_data.json or metbull_data.pkl to stand in for the remote dataset), gzip encoded
+        when the client accepts it
+        - latency (float | tuple): seconds added to every response, or a (min, max) range drawn uniformly
+        - error_rate (float): share of requests answered with a 503
+        - throttle_rate (float): share of requests answered with a 429 (with a Retry-After header)
+        - retry_after (float): value of the Retry-After header sent with the 429s
+        - seed (int): seeds the injection draws, for reproducible runs
+        - host, port (str, int): where to listen, port 0 picks a free one
+        """
+        self.cassette = Cassette(cassette_dir)
+        self.dataset_path = dataset_path
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.hits = {}
+        self.connections = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = QuietServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> tuple:
+        with self._lock:
+            if isinstance(self.latency, tuple):
+                delay = self._random.uniform(*self.latency)
+            else:
+                delay = self.latency
+            return delay, self._random.random()
+
+    def _count(self, status: int) -> None:
+        with self._lock:
+            self.hits[status] = self.hits.get(status, 0) + 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like MetBull, every response has a Content-Length
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                delay, draw = server._draw()
+                if delay > 0:
+                    time.sleep(delay)
+
+                if draw < server.throttle_rate:
+                    self.respond(429, b"Too Many Requests", headers={"Retry-After": str(server.retry_after)})
+                elif draw < server.throttle_rate + server.error_rate:
+                    self.respond(503, b"Service Unavailable")
+                elif server.dataset_path and self.path.endswith(f"/datasets/{os.path.basename(server.dataset_path)}"):
+                    with open(server.dataset_path, mode="rb") as file:
+                        body = file.read()
+                    if "gzip" in self.headers.get("Accept-Encoding", ""):
+                        self.respond(200, gzip.compress(body), content_type="application/octet-stream",
+                                     headers={"Content-Encoding": "gzip"})
+                    else:
+                        self.respond(200, body, content_type="application/octet-stream")
+                else:
+                    entry = server.cassette.find_path(self.path)
+                    if entry is None:
+                        self.respond(404, b"Not Found")
+                    else:
+                        content_type = entry["headers"].get("Content-Type", "text/html")
+                        validators = {
+                            "ETag": entry["headers"].get("ETag") or f'"{hashlib.sha1(entry["body"]).hexdigest()}"',
+                        }
+                        if "Last-Modified" in entry["headers"]:
+                            validators["Last-Modified"] = entry["headers"]["Last-Modified"]
+                        if self.not_modified(validators):
+                            self.respond(304, b"", content_type=content_type, headers=validators)
+                        else:
+                            self.respond(entry["status"], entry["body"], content_type=content_type, headers=validators)
+
+            def not_modified(self, validators: dict) -> bool:
+                if "If-None-Match" in self.headers:  # takes precedence over the date, as per RFC 9110
+                    return self.headers["If-None-Match"] == validators["ETag"]
+                return self.headers.get("If-Modified-Since", object()) == validators.get("Last-Modified")
+
+            def respond(self, status: int, body: bytes, content_type: str = "text/plain", headers: dict = {}):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(status)
+
+            def log_message(self, format, *args):
+                pass  # Silenced, the hits counter is enough
+
+        return Handler
+
+    def start(self) -> "StandInServer":
+        """Serves in a background thread, returns the server for chaining."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return f"StandInServer(url={self.url}, pages={len(self.cassette)})"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves a recorded cassette as a local MetBull stand-in.")
+    parser.add_argument("--cassette", required=True, help="cassette directory")
+    parser.add_argument("--dataset", default=None, help="local dataset file (json or pkl)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    server = StandInServer(
+        cassette_dir=args.cassette, dataset_path=args.dataset, latency=args.latency,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed, port=args.port,
+    )
+    print(f"Serving {len(server.cassette)} pages at {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server._server.server_close()
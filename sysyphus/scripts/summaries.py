@@ -0,0 +1,208 @@
+import os
+import pickle
+import threading
+
+from collections import OrderedDict
+
+import pandas as pd
+
+from sysyphus.scripts import metrics, remote_load
+from sysyphus.scripts.metrics import Stats
+
+
+DIMENSIONS = ["type", "country", "year", "decade"]
+CUBE_DIMENSIONS = ["type", "country", "year"]  # decade is rolled up from year
+QUANTILES = [0.25, 0.5, 0.75, 0.95]
+FORMAT_VERSION = 1  # bump when the summaries layout changes, older files are rebuilt
+
+MEMORY_VERSIONS = 2  # versions kept in memory : the current one, and the previous one during a refresh
+
+_memory = OrderedDict()  # dataset version (or fingerprint) -> Summaries, least recently used first
+_lock = threading.Lock()
+
+
+def with_decade(df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(decade=(df["year"] // 10) * 10)
+
+
+def aggregate(df: pd.DataFrame, by: list, quantiles: bool = True) -> pd.DataFrame:
+    """Count and mass statistics (grams) of `df` grouped by `by`, missing keys kept as a group."""
+    grouped = df.groupby(by, dropna=False, observed=True)["mass"]
+    result = grouped.agg(
+        count="size", mass_count="count", mass_sum="sum", mass_mean="mean", mass_min="min", mass_max="max",
+    )
+    if quantiles:
+        quantile_values = grouped.quantile(QUANTILES).unstack()
+        quantile_values.columns = [f"mass_p{int(q * 100)}" for q in quantile_values.columns]
+        result = result.join(quantile_values)
+        result = result[[column for column in result.columns if column != "mass_max"] + ["mass_max"]]
+    return result.sort_index()
+
+
+def roll_up(cube: pd.DataFrame, by: list) -> pd.DataFrame:
+    """Aggregates cube rows (additive statistics only) to the `by` dimensions."""
+    result = cube.groupby(by, dropna=False, observed=True).agg(
+        count=("count", "sum"), mass_count=("mass_count", "sum"), mass_sum=("mass_sum", "sum"),
+        mass_min=("mass_min", "min"), mass_max=("mass_max", "max"),
+    )
+    result.insert(3, "mass_mean", result["mass_sum"] / result["mass_count"].where(result["mass_count"] > 0))
+    return result.sort_index()
+
+
+def matches(series: pd.Series, value) -> pd.Series:
+    """Rows of `series` equal to `value` (or to one of them if a list), strings compared case insensitively."""
+    values = value if isinstance(value, (list, tuple, set)) else [value]
+    if pd.api.types.is_numeric_dtype(series):
+        return series.isin(values)
+    return series.str.lower().isin([str(item).lower() for item in values])
+
+
+def apply_filters(df: pd.DataFrame, filters: dict) -> pd.DataFrame:
+    mask = pd.Series(True, index=df.index)
+    for column, value in filters.items():
+        if column not in df.columns:
+            raise ValueError(f"Unknown filter '{column}'. Options are {', '.join(df.columns)}.")
+        mask &= matches(df[column], value)
+    return df[mask]
+
+
+class Summaries:
+    def __init__(self, tables: dict, version: str | None, df: pd.DataFrame = None) -> None:
+        """
+        Precomputed aggregates of a dataset version (see `build`), answered without scanning sy_df.
+
+        Attributes:
+        - tables (dict): "by_<dimension>" (counts & mass quantiles per type, country, year, decade),
+        "cube" (additive statistics per type x country x year), "type_by_country" (counts cross-tab)
+        - version (str): dataset version (or content fingerprint) they were computed from
+
+        Methods:
+        - query: statistics by dimension(s), filtered or not
+        - crosstab: counts of one dimension against another
+        - year_histogram: number of meteorites per year (or decade)
+
+        Args:
+        - df (pd.DataFrame): the dataset, only scanned for the queries the aggregates cannot answer
+        """
+        self.tables = tables
+        self.version = version
+        self.df = df
+
+    def query(self, by: str | list = "type", filters: dict = None, quantiles: bool = False) -> pd.DataFrame:
+        """
+        Function:
+        - Returns count and mass statistics grouped by `by`. Unfiltered single dimension queries come straight
+        from the precomputed tables (mass quantiles included), filtered ones are rolled up from the cube when
+        they only involve type, country, year & decade. Anything else scans the dataset.
+
+        Args:
+        - by (str | list): one or several of type, country, year, decade
+        - filters (dict): column -> value or list of values, e.g. {"country": "Oman", "decade": [1990, 2000]}
+        - quantiles (bool): add the mass quantiles to filtered or multi-dimension queries (needs a scan)
+
+        Returns:
+        - pd.DataFrame: one row per group
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        filters = filters or {}
+        for dimension in by:
+            if dimension not in DIMENSIONS:
+                raise ValueError(f"Invalid dimension '{dimension}'. Options are {', '.join(DIMENSIONS)}.")
+
+        if not filters and len(by) == 1:
+            table = self.tables[f"by_{by[0]}"]
+            return table if quantiles else table.drop(columns=[f"mass_p{int(q * 100)}" for q in QUANTILES])
+
+        if not quantiles and all(column in DIMENSIONS for column in [*by, *filters]):
+            cube = with_decade(self.tables["cube"].reset_index())
+            return roll_up(apply_filters(cube, filters), by)
+
+        if self.df is None:
+            raise ValueError("This query needs the dataset, which was not given to the summaries")
+        return aggregate(apply_filters(with_decade(self.df), filters), by, quantiles=quantiles)
+
+    def crosstab(self, rows: str = "type", columns: str = "country") -> pd.DataFrame:
+        """Counts of `rows` x `columns` (type, country, year or decade), from the precomputed tables."""
+        if (rows, columns) == ("type", "country"):
+            return self.tables["type_by_country"]
+        if (rows, columns) == ("country", "type"):
+            return self.tables["type_by_country"].T
+        return self.query(by=[rows, columns])["count"].unstack(fill_value=0)
+
+    def year_histogram(self, decade: bool = False) -> pd.Series:
+        return self.tables["by_decade" if decade else "by_year"]["count"]
+
+    def __repr__(self) -> str:
+        return f"Summaries(version={self.version}, tables={list(self.tables)})"
+
+
+def build(df: pd.DataFrame, version: str | None = None, stats: Stats = None) -> Summaries:
+    """Computes every summary table of `df` in one pass per table."""
+    with metrics.timed(stats, "summaries_build", rows=len(df)):
+        df = with_decade(df[["type", "country", "year", "mass"]])
+        tables = {f"by_{dimension}": aggregate(df, [dimension]) for dimension in DIMENSIONS}
+        tables["cube"] = aggregate(df, CUBE_DIMENSIONS, quantiles=False)
+        tables["type_by_country"] = pd.crosstab(df["type"], df["country"])
+    return Summaries(tables=tables, version=version)
+
+
+def fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a dataset, identifies it when no version is published."""
+    return f"sha-{int(pd.util.hash_pandas_object(df, index=False).sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+
+def summaries_path(version: str) -> str:
+    """Summaries are kept next to the dataset snapshot, one file per dataset version."""
+    directory = os.path.dirname(remote_load.snapshot_paths()[0])
+    return os.path.join(directory, f"summaries_{version}.pkl")
+
+
+def save(summaries: Summaries) -> str:
+    path = summaries_path(summaries.version)
+    with open(f"{path}.tmp", mode="wb") as file:
+        pickle.dump({"format": FORMAT_VERSION, "version": summaries.version, "tables": summaries.tables}, file)
+    os.replace(f"{path}.tmp", path)
+    return path
+
+
+def load(version: str) -> Summaries | None:
+    path = summaries_path(version)
+    if not os.path.exists(path):
+        return None
+    with open(path, mode="rb") as file:
+        content = pickle.load(file)
+    if content.get("format") != FORMAT_VERSION:
+        return None
+    return Summaries(tables=content["tables"], version=content["version"])
+
+
+def get(df: pd.DataFrame, version: str | None = None, stats: Stats = None) -> Summaries:
+    """
+    Function:
+    - Returns the summaries of `df`, computed once per dataset version : from memory, else from the file persisted
+    next to the snapshot, else built and persisted. Only the MEMORY_VERSIONS versions used last stay in memory,
+    the others are read back from their file when needed again.
+
+    Args:
+    - df (pd.DataFrame): sy_df
+    - version (str): dataset version, a content fingerprint is used when unknown
+    - stats (Stats): records the "summaries_build" stage when they are computed
+
+    Returns:
+    - Summaries
+    """
+    version = version or fingerprint(df)
+    with _lock:
+        summaries = _memory.get(version)
+        if summaries is not None:
+            _memory.move_to_end(version)
+    if summaries is None:
+        summaries = load(version)
+        if summaries is None:
+            summaries = build(df, version=version, stats=stats)
+            save(summaries)
+        with _lock:
+            _memory[version] = summaries
+            while len(_memory) > MEMORY_VERSIONS:
+                _memory.popitem(last=False)
+    return Summaries(tables=summaries.tables, version=version, df=df)
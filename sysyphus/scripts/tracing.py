@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+
+from time import perf_counter
+
+from sysyphus.scripts.metrics import Stats
+
+
+# Stages that overlap on their thread (waiting in the executor queue while the worker runs another page),
+# exported as async spans so each one gets its own row instead of breaking the thread's stack
+ASYNC_STAGES = ["queue_wait"]
+
+
+class Tracer:
+    def __init__(self) -> None:
+        """
+        Collects the timings recorded on a Stats object as spans, and exports them in the Chrome trace event
+        format (open the file in chrome://tracing or https://ui.perfetto.dev). Each thread gets its own track,
+        so the busy/idle workers of `request_selected` and where each page spends its time are visible.
+
+        Use:
+        - tracer.attach(stats) ... tracer.detach(stats)
+        - tracer.export("trace.json")
+        """
+        self.events = []
+        self.thread_names = {}
+        self.origin = perf_counter()
+        self.pid = os.getpid()
+        self._async_id = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict) -> None:
+        """Stats hook, converts one timing event to trace events."""
+        args = {key: value for key, value in event.items() if key not in ["stage", "start", "duration", "thread"]}
+        ts = (event["start"] - self.origin) * 1e6
+        dur = event["duration"] * 1e6
+
+        with self._lock:
+            self.thread_names.setdefault(event["thread"], threading.current_thread().name)
+            if event["stage"] in ASYNC_STAGES:
+                self._async_id += 1
+                common = {"name": event["stage"], "cat": event["stage"], "id": self._async_id,
+                          "pid": self.pid, "tid": event["thread"]}
+                self.events.append({**common, "ph": "b", "ts": ts, "args": args})
+                self.events.append({**common, "ph": "e", "ts": ts + dur})
+            else:
+                self.events.append({
+                    "name": event["stage"], "cat": "sysyphus", "ph": "X", "ts": ts, "dur": dur,
+                    "pid": self.pid, "tid": event["thread"], "args": args,
+                })
+
+    def attach(self, stats: Stats) -> "Tracer":
+        stats.add_hook(self)
+        return self
+
+    def detach(self, stats: Stats) -> None:
+        if self in stats.hooks:
+            stats.remove_hook(self)
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                for tid, name in self.thread_names.items()
+            ]
+            return {"traceEvents": metadata + list(self.events), "displayTimeUnit": "ms"}
+
+    def export(self, filepath: str) -> None:
+        """Writes the collected spans as a Chrome trace / Perfetto compatible JSON file."""
+        with open(filepath, mode="w") as file:
+            json.dump(self.to_dict(), file, default=str)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __repr__(self) -> str:
+        return f"Tracer(events={len(self.events)}, threads={len(self.thread_names)})"
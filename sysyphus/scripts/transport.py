@@ -0,0 +1,313 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import weakref
+
+import requests
+
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit, urlunsplit
+from requests.adapters import HTTPAdapter
+from sysyphus.scripts import metrics, scheduler
+from sysyphus.scripts.metrics import Stats
+
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0",
+}
+
+MODES = ["live", "record", "replay"]
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+_DEFAULTS = {
+    "mode": "live",
+    "cassette_dir": None,
+    "base_url": None,
+    "retries": 2,
+    "backoff": 0.5,
+    "max_retry_after": 60,
+    "timeout": 30,
+}
+
+_config = dict(_DEFAULTS)
+_lock = threading.Lock()
+_session = None
+_cassette = None
+
+
+def path_of(url: str) -> str:
+    """Returns the path and query of `url`, which is what a redirected request keeps of it."""
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class Cassette:
+    def __init__(self, directory: str) -> None:
+        """
+        A directory of recorded HTTP responses, used by the record/replay modes and by the stand-in server.
+
+        Layout:
+        - index.json : maps each recorded url to its status, headers and body file
+        - bodies/ : one file per response body, named after the sha1 of the url
+
+        Args:
+        - directory (str): where the cassette lives, created if missing
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, "index.json")
+        self.bodies_dir = os.path.join(directory, "bodies")
+        self._lock = threading.Lock()
+
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, mode="r") as file:
+                self.index = json.load(file)
+        else:
+            self.index = {}
+        self._paths = {path_of(url): url for url in self.index}
+
+    def get(self, url: str) -> dict | None:
+        """Returns the recorded entry for `url` (status, headers, body) or None if it was never recorded."""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        with open(os.path.join(self.bodies_dir, entry["file"]), mode="rb") as file:
+            body = file.read()
+        return {"status": entry["status"], "headers": entry["headers"], "body": body}
+
+    def find_path(self, path: str) -> dict | None:
+        """Returns the recorded entry whose url has the same path and query as `path`, whatever the host."""
+        url = self._paths.get(path)
+        return None if url is None else self.get(url)
+
+    def put(self, url: str, status: int, headers: dict, body: bytes) -> None:
+        """Records a response, the index is rewritten atomically so a crash never leaves a half written cassette."""
+        file_name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        with open(os.path.join(self.bodies_dir, file_name), mode="wb") as file:
+            file.write(body)
+
+        with self._lock:
+            self.index[url] = {"status": status, "headers": headers, "file": file_name}
+            self._paths[path_of(url)] = url
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, mode="w") as file:
+                json.dump(self.index, file, indent=1)
+            os.replace(tmp_path, self.index_path)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
+def configure(**options) -> None:
+    """
+    Function:
+    - Sets how the package talks to the network. Options not passed are left unchanged.
+
+    Args:
+    - mode (str): "live" (default), "record" (live + save every response to the cassette)
+    or "replay" (serve responses from the cassette only, no network access at all)
+    - cassette_dir (str): directory of the cassette used by record and replay
+    - base_url (str): sends every request to this host instead (e.g. a local stand-in server),
+    only the path and query of the original url are kept
+    - retries (int): how many times a 429/5xx response is retried
+    - backoff (float): base delay in seconds between retries, doubled at each attempt
+    - max_retry_after (float): longest wait honored from a Retry-After header, in seconds
+    - timeout (float): seconds before a request is abandoned
+    """
+    global _cassette
+
+    unknown = set(options) - set(_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown transport option(s): {sorted(unknown)}")
+    if "mode" in options and options["mode"] not in MODES:
+        raise ValueError(f"Invalid mode '{options['mode']}'. Options are {', '.join(MODES)}.")
+
+    with _lock:
+        _config.update(options)
+        if _config["mode"] in ["record", "replay"] and _config["cassette_dir"] is None:
+            raise ValueError(f"Mode '{_config['mode']}' requires a cassette_dir")
+        if "cassette_dir" in options or "mode" in options:
+            _cassette = Cassette(_config["cassette_dir"]) if _config["cassette_dir"] else None
+
+
+def reset() -> None:
+    """Restores the default live configuration."""
+    configure(**_DEFAULTS)
+
+
+def get_config() -> dict:
+    """Returns a copy of the current transport configuration."""
+    return dict(_config)
+
+
+def is_local() -> bool:
+    """True when no request can reach the internet (replay mode or a base_url redirection)."""
+    return _config["mode"] == "replay" or _config["base_url"] is not None
+
+
+def get_session() -> requests.Session:
+    """
+    Returns the process wide session, its connection pool is sized for the 25 concurrent requests ceiling
+    so threads reuse keep-alive connections instead of opening one per page.
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=25)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(HEADERS)
+        return _session
+
+
+def rewrite_url(url: str) -> str:
+    """Points `url` to the configured base_url, if any."""
+    if _config["base_url"] is None:
+        return url
+    base = urlsplit(_config["base_url"])
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, parts.fragment))
+
+
+def make_response(url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+    """Builds a fully consumed requests.Response, so replayed pages behave like live ones."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers.update(headers)
+    response._content = body
+    response._content_consumed = True
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    return response
+
+
+def retry_delay(response: requests.Response, attempt: int) -> float:
+    """
+    Delay before the next attempt : the server's Retry-After if given (seconds or an HTTP date), capped to the
+    max_retry_after option so a worker is never parked for an hour, exponential backoff otherwise.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), _config["max_retry_after"])
+    return _config["backoff"] * (2 ** attempt)
+
+
+def hold_slot(response: requests.Response, job: scheduler.Job) -> None:
+    """
+    Keeps the budget slot of `job` until the streamed body of `response` is read to the end or the response is
+    closed (or garbage collected), whichever comes first : the budget caps the downloads running, not only the
+    requests waiting for their headers.
+    """
+    lock = threading.Lock()
+    held = [True]
+
+    def release():
+        with lock:
+            if not held[0]:
+                return
+            held[0] = False
+        scheduler.get_scheduler().release(job)
+
+    close, iter_content = response.close, response.iter_content
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            release()
+
+    def iter_and_release(*args, **kwargs):  # .content, iter_lines and the callers all read through it
+        try:
+            yield from iter_content(*args, **kwargs)
+        finally:
+            release()
+
+    response.close = close_and_release
+    response.iter_content = iter_and_release
+    weakref.finalize(response, release)
+
+
+def fetch(url: str, headers: dict = None, stream: bool = False, stats: Stats = None) -> requests.Response:
+    """
+    Function:
+    - Single entry point for every HTTP GET made by the package (meteorite pages, dataset download).
+    - Honors the configured mode (live/record/replay), base_url redirection and retries on 429/5xx.
+    - Each attempt waits for a slot of the process wide request budget, on behalf of the job of the calling thread
+    (see sysyphus.scripts.scheduler). Replayed responses do not. A streamed response holds its slot until its body
+    is consumed or it is closed (see `hold_slot`) : close the responses that are not read to the end.
+
+    Args:
+    - url (str): the original url, recordings are always keyed on it, even when redirected
+    - headers (dict): extra headers, merged over the default User-Agent
+    - stream (bool): passed to requests, the body is not downloaded until read (ignored in replay)
+    - stats (Stats): if given, records the "http" stage (latency, status, bytes, retries) for this url, and counts
+    the responses served from the cassette as "replayed"
+
+    Returns:
+    - requests.Response, the last one received if every retry failed
+
+    Raises:
+    - requests.exceptions.ConnectionError: in replay mode, when the url was never recorded
+    """
+    with metrics.timed(stats, "http", url=url) as fields:
+        if _config["mode"] == "replay":
+            entry = _cassette.get(url)
+            if entry is None:
+                raise requests.exceptions.ConnectionError(f"No recorded response for {url}")
+            if stats is not None:
+                stats.incr("replayed")
+            fields.update(status=entry["status"], bytes=len(entry["body"]))
+            return make_response(url=url, status=entry["status"], headers=entry["headers"], body=entry["body"])
+
+        session = get_session()
+        target = rewrite_url(url)
+        retries = _config["retries"]
+
+        job = scheduler.current_job()
+        budget = scheduler.get_scheduler()
+        for attempt in range(retries + 1):
+            budget.acquire(job)  # process wide budget, shared fairly between the jobs
+            try:
+                response = session.get(target, headers=headers, timeout=_config["timeout"], stream=stream)
+            except BaseException:
+                budget.release(job)
+                raise
+            if stream:
+                hold_slot(response, job)
+            else:
+                budget.release(job)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                break
+            delay = retry_delay(response=response, attempt=attempt)
+            response.close()
+            time.sleep(delay)
+
+        if _config["mode"] == "record" and response.status_code != 304:  # a 304 has no page to record
+            _cassette.put(
+                url=url,
+                status=response.status_code,
+                headers={"Content-Type": response.headers.get("Content-Type", "text/html")} | {
+                    key: response.headers[key] for key in ["ETag", "Last-Modified"] if key in response.headers
+                },
+                body=response.content,
+            )
+
+        fields.update(status=response.status_code, retries=attempt)
+        if stream:
+            fields["bytes"] = int(response.headers.get("Content-Length", 0))
+        else:
+            fields["bytes"] = len(response.content)
+
+        return response
@@ -1,11 +1,32 @@
+from __future__ import annotations
+
 import concurrent.futures
-import pandas as pd
 
-from tqdm import tqdm
+from time import perf_counter
+from typing import TYPE_CHECKING
 from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import metrics, scheduler
+from sysyphus.scripts.metrics import Stats
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def process_meteorite(meteorite: Meteorite, submitted_at: float) -> None:
+    """
+    Worker task of `request_selected` : records how long the meteorite waited for a free thread
+    ("queue_wait") and the whole fetch ("meteorite"), then extracts its properties.
+    """
+    if meteorite.stats is not None:
+        meteorite.stats.observe("queue_wait", perf_counter() - submitted_at, start=submitted_at, url=meteorite.url)
+    with metrics.timed(meteorite.stats, "meteorite", url=meteorite.url, name=meteorite.name):
+        meteorite.extract_properties()
 
 
-def request_selected(meteorites: list, rate_limiter: int = 25, missing_verbose: bool = False) -> None:
+def request_selected(
+        meteorites: list, rate_limiter: int = 25, missing_verbose: bool = False, on_result: callable = None,
+        priority: str | int = None, job_name: str = "request_selected", task: callable = process_meteorite,
+        ) -> None:
     """
     Function:
         - Uses threading to request all the meteorites in the meteorites list in parallel.
@@ -15,6 +36,13 @@ def request_selected(meteorites: list, rate_limiter: int = 25, missing_verbose:
 
     Args:
         - meteorites : a list that must consist of meteorites instanciated via the search_meteorites() method
+        - on_result : called (in the calling thread) with each meteorite as soon as its request completed,
+        e.g. writers.ResultWriter.add to stream the results to disk
+        - priority : interactive, normal, bulk (or an int, lower first) : the requests run as a job of the process
+        wide scheduler, which caps the concurrent requests of every job together. None : interactive for small
+        selections, bulk for large ones (see scheduler.default_priority)
+        - job_name : names the job, see scheduler.get_scheduler().jobs()
+        - task : run for each meteorite in a worker thread, with the meteorite and the time it was submitted
 
     Returns:
         - None, the script executes the object method in parallel and updates the objects directly
@@ -28,12 +56,22 @@ def request_selected(meteorites: list, rate_limiter: int = 25, missing_verbose:
         if not isinstance(meteorite, Meteorite):
             raise TypeError(f"At least one of the objects ({meteorite}) is not of the class Meteorite")
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=rate_limiter) as executor:
-        futures = [executor.submit(meteorite.extract_properties) for meteorite in meteorites]
+    from tqdm import tqdm  # Deferred, only scraping jobs pay for it
+
+    if priority is None:
+        priority = scheduler.default_priority(len(meteorites))
+
+    job_context = scheduler.get_scheduler().job(name=job_name, priority=priority)
+    with job_context as job, concurrent.futures.ThreadPoolExecutor(max_workers=rate_limiter) as executor:
+        futures = {
+            executor.submit(scheduler.run_as, job, task, meteorite, perf_counter()): meteorite
+            for meteorite in meteorites
+        }
 
         # Should show a progress bar, fingers crossed
-        for _ in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing meteorites"):
-            pass
+        for future in tqdm(concurrent.futures.as_completed(futures), total=len(futures), desc="Processing meteorites"):
+            if on_result is not None and future.exception() is None:
+                on_result(futures[future])
 
         # Hopefully no error but this should be useful for debug
         for future in concurrent.futures.as_completed(futures):
@@ -43,7 +81,106 @@ def request_selected(meteorites: list, rate_limiter: int = 25, missing_verbose:
                 print(f"Error occurred: {e}")
 
 
-def make_meteorites(selected_meteorites: pd.DataFrame):
+def request_cached(
+        meteorites: list, rate_limiter: int = 25, cache=None, stats: Stats = None, on_result: callable = None,
+        bundle=None, priority: str | int = None, job_name: str = "request_cached", prefetched=None,
+        ) -> list:
+    """
+    Function:
+        - Same as `request_selected`, but the meteorites found in the enriched bundle, prefetched or in the scrape
+        cache are loaded from them and only the others are requested. The newly scraped meteorites are then added
+        to the cache.
+
+    Args:
+        - meteorites : a list of Meteorite objects
+        - rate_limiter : maximum concurrent requests (hard ceilling set to 25)
+        - cache : a scrape_cache.ScrapeCache, or None to request everything
+        - stats : counts the meteorites served by the bundle as "bundle_hits", by the prefetch as "prefetch_hits",
+        by the cache as "cache_hits"
+        - on_result : called with each meteorite once available, cached ones first (see `request_selected`)
+        - bundle : an enriched.EnrichedBundle, looked up before the cache
+        - priority, job_name : scheduling of the requests made, see `request_selected`
+        - prefetched : a prefetch.Prefetcher of the selection, looked up after the bundle. Cancel it first : the
+        pages it is still requesting are shared with the requests of the same urls
+
+    Returns:
+        - the list of meteorites that were actually requested
+    """
+    to_request = meteorites
+    for source, counter in [(bundle, "bundle_hits"), (prefetched, "prefetch_hits"), (cache, "cache_hits")]:
+        if source is None:
+            continue
+        missing = source.hydrate(to_request)
+        if stats is not None:
+            stats.incr(counter, len(to_request) - len(missing))
+        to_request = missing
+    if on_result is not None and len(to_request) < len(meteorites):
+        requested_ids = {id(meteorite) for meteorite in to_request}
+        for meteorite in meteorites:
+            if id(meteorite) not in requested_ids:
+                on_result(meteorite)
+
+    if to_request:
+        request_selected(
+            meteorites=to_request, rate_limiter=min(rate_limiter, len(to_request)), on_result=on_result,
+            priority=priority, job_name=job_name,
+        )
+        if cache is not None:
+            cache.put_many(to_request)
+    return to_request
+
+
+def refresh_cached(
+        meteorites: list, cache, rate_limiter: int = 25, stats: Stats = None, on_result: callable = None,
+        priority: str | int = "bulk", job_name: str = "refresh_cached",
+        ) -> dict:
+    """
+    Function:
+        - Refreshes the meteorites of `meteorites` found in the scrape cache : each page is requested conditionally
+        with the validators kept in the cache, and only parsed and extracted again if it changed (see
+        Meteorite.revalidate). Meteorites that are not cached are left untouched.
+        - The cache entries are then rewritten, with their new fetch date and validators. Pages that could not be
+        fetched keep their entry as it was.
+
+    Args:
+        - meteorites : a list of Meteorite objects
+        - cache : the scrape_cache.ScrapeCache to refresh
+        - rate_limiter : maximum concurrent requests (hard ceilling set to 25)
+        - stats : counts the "not_modified" (304) and "unchanged_pages" (same content hash) pages
+        - on_result : called with each meteorite once refreshed
+        - priority, job_name : scheduling of the requests made, bulk by default (see `request_selected`)
+
+    Returns:
+        - dict: refreshed (pages requested), changed (their urls), unchanged & failed (how many)
+    """
+    records = cache.get_many(meteorite.url for meteorite in meteorites)
+    validators = cache.validators(records)
+    to_refresh = [meteorite for meteorite in meteorites if meteorite.url in records]
+    outcomes = {}
+
+    def revalidate(meteorite: Meteorite, submitted_at: float) -> None:
+        if meteorite.stats is not None:
+            meteorite.stats.observe("queue_wait", perf_counter() - submitted_at, start=submitted_at, url=meteorite.url)
+        with metrics.timed(meteorite.stats, "meteorite", url=meteorite.url, name=meteorite.name):
+            outcomes[meteorite.url] = meteorite.revalidate(records[meteorite.url], validators[meteorite.url])
+
+    if to_refresh:
+        request_selected(
+            meteorites=to_refresh, rate_limiter=min(rate_limiter, len(to_refresh)), on_result=on_result,
+            priority=priority, job_name=job_name, task=revalidate,
+        )
+    results = [outcomes.get(meteorite.url, "failed") for meteorite in to_refresh]  # a task that raised failed
+    cache.put_many([meteorite for meteorite, result in zip(to_refresh, results) if result != "failed"])
+    changed = [meteorite.url for meteorite, result in zip(to_refresh, results) if result == "changed"]
+    if stats is not None:
+        stats.incr("changed_pages", len(changed))
+    return {
+        "refreshed": len(to_refresh), "changed": changed,
+        "unchanged": results.count("unchanged"), "failed": results.count("failed"),
+    }
+
+
+def make_meteorites(selected_meteorites: pd.DataFrame, stats: Stats = None):
     meteorite_objects = []
     for mtuple in selected_meteorites.itertuples(index=False):
         meteorite_object = Meteorite(
@@ -52,7 +189,8 @@ def make_meteorites(selected_meteorites: pd.DataFrame):
             country=mtuple.country,
             type=mtuple.type,
             mass=mtuple.mass,
-            url=mtuple.URL
+            url=mtuple.URL,
+            stats=stats,
         )
 
         meteorite_objects.append(meteorite_object)
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+
+from functools import lru_cache
+
+
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils")
+RESOURCES = {
+    "country": "country_validation.json",
+    "type": "type_validation.json",
+}
+
+_END = "$"  # trie key holding the term that ends on a node, not a valid character path since terms are stripped
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def normalize(term: str) -> str:
+    """Canonical form of a term : lower case, stripped, inner whitespace collapsed to single spaces."""
+    return " ".join(str(term).lower().split())
+
+
+class Vocabulary:
+    def __init__(self, values) -> None:
+        """
+        Immutable set of accepted terms (countries, types...) with a prefix trie for autocompletion.
+        Built once, every query is pure in-memory work.
+
+        Args:
+        - values (iterable): raw terms, normalized on the way in, missing values (None/NaN) are skipped
+
+        Methods:
+        - validate: whether a term is accepted
+        - canonicalize: the canonical form of a term, or None if it is not accepted
+        - complete: accepted terms starting with a prefix
+        """
+        self.terms = frozenset(normalize(value) for value in values if value is not None and value == value)
+        self._trie = {}
+        for term in self.terms:
+            node = self._trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[_END] = term
+
+    @classmethod
+    def from_json(cls, filepath: str) -> "Vocabulary":
+        """Builds a vocabulary from a json list, like the ones in sysyphus/utils."""
+        with open(file=filepath, mode="r") as file:
+            return cls(json.load(file))
+
+    @classmethod
+    def from_series(cls, series) -> "Vocabulary":
+        """Builds a vocabulary from the unique values of a pandas Series (e.g. sy_df["country"])."""
+        return cls(series.dropna().unique())
+
+    def extended(self, values) -> "Vocabulary":
+        """Returns a new vocabulary with `values` added, only the new values are normalized."""
+        new_terms = frozenset(normalize(value) for value in values if value is not None and value == value)
+        if new_terms <= self.terms:
+            return self
+        return Vocabulary(self.terms | new_terms)
+
+    def validate(self, term: str) -> bool:
+        return normalize(term) in self.terms
+
+    def canonicalize(self, term: str) -> str | None:
+        canonical = normalize(term)
+        return canonical if canonical in self.terms else None
+
+    def complete(self, prefix: str, limit: int = 10) -> list:
+        """Returns up to `limit` accepted terms starting with `prefix` (normalized), sorted alphabetically."""
+        node = self._trie
+        for char in normalize(prefix):
+            if char not in node:
+                return []
+            node = node[char]
+
+        found = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for key, child in current.items():
+                if key == _END:
+                    found.append(child)
+                else:
+                    stack.append(child)
+        return sorted(found)[:limit]
+
+    def __contains__(self, term: str) -> bool:
+        return self.validate(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self):
+        return iter(sorted(self.terms))
+
+    def __repr__(self) -> str:
+        return f"Vocabulary(terms={len(self.terms)})"
+
+
+@lru_cache(maxsize=None)
+def from_file(filepath: str) -> Vocabulary:
+    """Loads a vocabulary from a json file, once per path for the life of the process."""
+    return Vocabulary.from_json(filepath)
+
+
+def register(name: str, vocabulary: Vocabulary) -> None:
+    """Makes `vocabulary` the process wide reference for `name` ("country", "type")."""
+    with _lock:
+        _registry[name] = vocabulary
+
+
+def register_dataset(df) -> None:
+    """Registers the country and type vocabularies derived from a loaded dataset (sy_df)."""
+    register("country", Vocabulary.from_series(df["country"]))
+    register("type", Vocabulary.from_series(df["type"]))
+
+
+def update_dataset(df) -> None:
+    """
+    Adds the countries and types of new or changed rows (e.g. the added & changed parts of a dataset delta)
+    to the registered vocabularies, without going through the whole dataset again.
+    """
+    for name, column in [("country", "country"), ("type", "type")]:
+        if column in df.columns and len(df):
+            register(name, get_vocabulary(name).extended(df[column].dropna().unique()))
+
+
+def get_vocabulary(name: str) -> Vocabulary:
+    """
+    Returns the registered vocabulary for `name`. Until a dataset registers its own, the lists packaged
+    in sysyphus/utils are loaded (once) and used.
+    """
+    vocabulary = _registry.get(name)
+    if vocabulary is not None:
+        return vocabulary
+    if name not in RESOURCES:
+        raise KeyError(f"Unknown vocabulary '{name}'. Options are {', '.join(RESOURCES)}.")
+
+    vocabulary = from_file(os.path.join(RESOURCES_DIR, RESOURCES[name]))
+    with _lock:
+        return _registry.setdefault(name, vocabulary)
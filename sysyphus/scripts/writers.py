@@ -0,0 +1,380 @@
+import json
+import os
+import uuid
+
+from contextlib import contextmanager
+from urllib.parse import quote, unquote
+
+import pandas as pd
+
+from sysyphus.scripts import rendering
+from sysyphus.scripts.preprocessing import handle_mass
+
+
+FORMATS = ["csv", "pickle", "json", "parquet"]
+EXTENSIONS = {"csv": "csv", "pickle": "pkl", "json": "json", "parquet": "parquet"}
+MODES = ["overwrite", "append", "upsert"]
+
+# Codecs are applied to the whole file for csv/pickle/json (hence a suffix) and per column chunk for parquet
+COMPRESSIONS = {
+    "csv": [None, "gzip", "bz2", "zip", "xz", "zstd"],
+    "pickle": [None, "gzip", "bz2", "zip", "xz", "zstd"],
+    "json": [None, "gzip", "bz2", "zip", "xz", "zstd"],
+    "parquet": [None, "snappy", "gzip", "brotli", "lz4", "zstd"],
+}
+SUFFIXES = {"gzip": ".gz", "bz2": ".bz2", "zip": ".zip", "xz": ".xz", "zstd": ".zst"}
+
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"  # directory name of missing partition values, as in hive & pyarrow
+METADATA_NAME = "_sysyphus.json"  # partitioning of a dataset directory, ignored by other parquet readers
+
+
+def check_options(file_format: str, compression: str | None = None, mode: str = "overwrite") -> None:
+    if file_format not in FORMATS:
+        raise ValueError(f"Invalid file format '{file_format}'. Options are csv, pickle, json & parquet.")
+    if compression not in COMPRESSIONS[file_format]:
+        options = ", ".join(str(codec) for codec in COMPRESSIONS[file_format])
+        raise ValueError(f"Invalid compression '{compression}' for {file_format}. Options are {options}.")
+    if mode not in MODES:
+        raise ValueError(f"Invalid mode '{mode}'. Options are {', '.join(MODES)}.")
+
+
+def output_path(filepath: str, file_format: str, compression: str | None = None) -> str:
+    """Returns `filepath` with the extension of the format (and of the codec, parquet excepted)."""
+    suffix = SUFFIXES.get(compression, "") if file_format != "parquet" else ""
+    return f"{filepath}.{EXTENSIONS[file_format]}{suffix}"
+
+
+@contextmanager
+def atomic_path(path: str):
+    """
+    Yields a temporary path next to `path`, moved over `path` once the block succeeds, removed if it fails :
+    readers see either the previous file or the complete new one, never a partial write.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def as_table(df: pd.DataFrame) -> pd.DataFrame:
+    """Moves a named index (e.g. the meteorite name of df_searched) back to a column."""
+    return df.reset_index() if df.index.name is not None else df
+
+
+def write_file(df: pd.DataFrame, path: str, file_format: str, compression: str | None = None) -> None:
+    """Writes `df` to `path` atomically, the index is kept as in save_search."""
+    with atomic_path(path) as tmp_path:
+        if file_format == "csv":
+            df.to_csv(tmp_path, index=True, compression=compression)
+        elif file_format == "pickle":
+            df.to_pickle(tmp_path, compression=compression)
+        elif file_format == "json":
+            as_table(df).to_json(tmp_path, orient="records", lines=True, compression=compression)
+        elif file_format == "parquet":
+            df.to_parquet(tmp_path, compression=compression)
+
+
+def read_file(path: str, file_format: str, compression: str | None = None) -> pd.DataFrame:
+    if file_format == "csv":
+        return pd.read_csv(path, index_col=0, compression=compression)  # written with its index, see write_file
+    elif file_format == "pickle":
+        return pd.read_pickle(path, compression=compression)
+    elif file_format == "json":
+        return pd.read_json(path, orient="records", lines=True, compression=compression)
+    elif file_format == "parquet":
+        return pd.read_parquet(path)
+
+
+def merge(existing: pd.DataFrame, new: pd.DataFrame, mode: str, key: str) -> pd.DataFrame:
+    """Combines stored and new rows : `new` alone (overwrite), both (append), or both deduplicated on key (upsert)."""
+    if mode == "overwrite" or existing is None or existing.empty:
+        return new
+    combined = pd.concat([existing, new], ignore_index=True)
+    if mode == "upsert":
+        if key not in combined.columns:
+            raise ValueError(f"Upsert key '{key}' is not a column of the results")
+        combined = combined.drop_duplicates(subset=key, keep="last", ignore_index=True)
+    return combined
+
+
+def save(
+        df: pd.DataFrame, filepath: str, file_format: str = "csv", compression: str | None = None,
+        mode: str = "overwrite", key: str = "name",
+        ) -> str:
+    """
+    Function:
+    - Writes `df` to a single file, atomically. In append or upsert mode, the rows already stored in the file
+    are kept (upsert : the new rows replace the stored ones with the same `key`).
+
+    Args:
+    - df (pd.DataFrame): the rows to write (e.g. df_searched)
+    - filepath (str): destination, without extension (added from the format and compression)
+    - file_format (str): csv, pickle, json or parquet
+    - compression (str): codec, see COMPRESSIONS
+    - mode (str): overwrite, append or upsert
+    - key (str): column (or index name) identifying a row for upserts
+
+    Returns:
+    - str: the path of the written file
+    """
+    check_options(file_format=file_format, compression=compression, mode=mode)
+    path = output_path(filepath, file_format, compression)
+
+    existing = None
+    if mode != "overwrite" and os.path.exists(path):
+        existing = as_table(read_file(path, file_format, compression))
+
+    index_name = df.index.name
+    combined = merge(existing=existing, new=as_table(df), mode=mode, key=key)
+    if index_name is not None and index_name in combined.columns:
+        combined = combined.set_index(index_name)
+
+    write_file(combined, path, file_format, compression)
+    return path
+
+
+def encode_partition(value) -> str:
+    if value is None or pd.isna(value):
+        return NULL_PARTITION
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # years stored as floats because of missing values
+    return quote(str(value), safe="")
+
+
+def decode_partition(segment: str):
+    value = unquote(segment)
+    return None if value == NULL_PARTITION else value
+
+
+def read_metadata(directory: str) -> dict | None:
+    path = os.path.join(directory, METADATA_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, mode="r") as file:
+        return json.load(file)
+
+
+def part_files(directory: str) -> list:
+    """Data files of a partition directory, temporary and metadata files excluded."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        os.path.join(directory, name) for name in os.listdir(directory)
+        if name.endswith(".parquet") and not name.startswith((".", "_"))
+    )
+
+
+def save_partitioned(
+        df: pd.DataFrame, directory: str, partition_cols: list, compression: str | None = "snappy",
+        mode: str = "append", key: str = "name",
+        ) -> list:
+    """
+    Function:
+    - Writes `df` as a parquet dataset partitioned hive style (`country=Chile/type=H5/part-<id>.parquet`), the
+    partition columns are stored in the directory names only. Only the partitions holding rows of `df` are touched,
+    so a weekly run writes a few small files instead of rewriting the whole archive.
+    - append : new part files are added next to the existing ones
+    - upsert : each touched partition is compacted into one file, where the new rows replace the stored
+    ones with the same `key` (a row is expected to stay in its partition)
+    - overwrite : each touched partition is replaced by the new rows, untouched partitions are kept
+
+    Every file is written atomically. Requires pyarrow (or fastparquet).
+
+    Args:
+    - df (pd.DataFrame): the rows to write
+    - directory (str): root of the dataset, created if missing
+    - partition_cols (list): columns to partition on, e.g. ["fall_country", "type", "fall_year"]
+    - compression (str): parquet codec
+    - mode (str): append, upsert or overwrite
+    - key (str): column identifying a row for upserts
+
+    Returns:
+    - list: paths of the files written
+
+    Raises:
+    - ValueError: invalid options, missing partition columns or a partitioning different from the stored dataset
+    """
+    check_options(file_format="parquet", compression=compression, mode=mode)
+    table = as_table(df)
+    missing = [column for column in partition_cols if column not in table.columns]
+    if missing:
+        raise ValueError(f"Partition column(s) {missing} not in the results. Columns are {list(table.columns)}.")
+
+    os.makedirs(directory, exist_ok=True)
+    metadata = read_metadata(directory)
+    if metadata is not None and metadata["partition_cols"] != list(partition_cols):
+        raise ValueError(
+            f"The dataset at {directory} is partitioned on {metadata['partition_cols']}, not {list(partition_cols)}"
+        )
+    if metadata is None:
+        metadata = {
+            "partition_cols": list(partition_cols),
+            "dtypes": {  # Directory names are strings, numeric partition columns get their dtype back on read
+                column: str(table[column].dtype) for column in partition_cols
+                if pd.api.types.is_numeric_dtype(table[column])
+            },
+        }
+        with atomic_path(os.path.join(directory, METADATA_NAME)) as tmp_path:
+            with open(tmp_path, mode="w") as file:
+                json.dump(metadata, file, indent=1)
+
+    written = []
+    for values, group in table.groupby(list(partition_cols), dropna=False, sort=False):
+        values = values if isinstance(values, tuple) else (values,)
+        segments = [f"{column}={encode_partition(value)}" for column, value in zip(partition_cols, values)]
+        partition_dir = os.path.join(directory, *segments)
+        os.makedirs(partition_dir, exist_ok=True)
+
+        stale = part_files(partition_dir) if mode != "append" else []
+        rows = group.drop(columns=list(partition_cols)).reset_index(drop=True)
+        if mode == "upsert" and stale:
+            rows = merge(existing=pd.concat([pd.read_parquet(path) for path in stale]), new=rows, mode=mode, key=key)
+
+        path = os.path.join(partition_dir, f"part-{uuid.uuid4().hex}.parquet")
+        with atomic_path(path) as tmp_path:
+            rows.to_parquet(tmp_path, compression=compression, index=False)
+        for stale_path in stale:
+            os.remove(stale_path)
+        written.append(path)
+    return written
+
+
+def read_partitioned(directory: str, filters: dict = None) -> pd.DataFrame:
+    """
+    Function:
+    - Reads a dataset written by save_partitioned, only the partitions matching `filters` are opened.
+
+    Args:
+    - directory (str): root of the dataset
+    - filters (dict): partition column -> accepted value or list of values, e.g. {"fall_country": "Chile"}
+
+    Returns:
+    - pd.DataFrame: the stored rows, partition columns included (with their original dtypes)
+    """
+    metadata = read_metadata(directory)
+    if metadata is None:
+        raise ValueError(f"No partitioned dataset at {directory}")
+    partition_cols = metadata["partition_cols"]
+
+    accepted = {}
+    for column, value in (filters or {}).items():
+        if column not in partition_cols:
+            raise ValueError(f"'{column}' is not a partition column. Options are {', '.join(partition_cols)}.")
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        accepted[column] = {None if pd.isna(item) else str(item) for item in values}
+
+    frames = []
+    for root, _, _ in os.walk(directory):
+        segments = os.path.relpath(root, directory).split(os.sep)
+        if len(segments) != len(partition_cols):
+            continue
+        values = {}
+        for column, segment in zip(partition_cols, segments):
+            name, _, encoded = segment.partition("=")
+            if name == column:
+                values[column] = decode_partition(encoded)
+        if len(values) != len(partition_cols):
+            continue
+        if any(values[column] not in accepted[column] for column in accepted):
+            continue
+
+        for path in part_files(root):
+            frame = pd.read_parquet(path)
+            for column, value in values.items():
+                frame[column] = value
+            frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=partition_cols)
+    df = pd.concat(frames, ignore_index=True)
+    for column, dtype in metadata["dtypes"].items():
+        df[column] = pd.to_numeric(df[column]).astype(dtype)
+    return df
+
+
+class ResultWriter:
+    def __init__(
+            self, directory: str, file_format: str = "parquet", partition_cols: list = None,
+            compression: str | None = None, mode: str = "append", key: str = "name",
+            batch_size: int = 500, ommit: list = [], first_part: int = 0,
+            ) -> None:
+        """
+        Streams scraped meteorites to disk by batches, as they come : pass `writer.add` as the `on_result`
+        callback of request_metbull. Memory holds one batch at most, and an interrupted job keeps what was written.
+
+        Attributes:
+        - written (list): paths of the files written so far
+        - rows (int): number of meteorites written
+
+        Args:
+        - directory (str): where the batches go, created if missing
+        - file_format (str): format of the batch files, parquet is required with `partition_cols`
+        - partition_cols (list): if set, batches are saved with save_partitioned (e.g. ["fall_country", "type"]),
+        otherwise each batch is a numbered file (part-00000.parquet, part-00001.parquet...)
+        - compression (str): codec, see COMPRESSIONS
+        - mode (str): append or upsert, for partitioned outputs
+        - key (str): identifies a meteorite for upserts
+        - batch_size (int): meteorites per batch
+        - ommit (list): properties left out, like display_search
+        - first_part (int): number of the first batch file, to continue a directory written by an earlier run
+        """
+        check_options(file_format=file_format, compression=compression, mode=mode)
+        if partition_cols and file_format != "parquet":
+            raise ValueError("Partitioned outputs are only available with the parquet format")
+
+        self.directory = directory
+        self.file_format = file_format
+        self.partition_cols = partition_cols
+        self.compression = compression
+        self.mode = mode
+        self.key = key
+        self.batch_size = batch_size
+        self.ommit = ommit
+        self.written = []
+        self.rows = 0
+
+        self._buffer = []
+        self._batches = first_part
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, meteorite) -> None:
+        self._buffer.append(meteorite)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered meteorites, if any."""
+        if not self._buffer:
+            return
+        df = rendering.show_properties(meteorite_list=self._buffer, as_pd=True, ommit=self.ommit)
+        if "mass" in df.columns:
+            df["mass"] = df["mass"].apply(handle_mass)
+
+        if self.partition_cols:
+            self.written += save_partitioned(
+                df, directory=self.directory, partition_cols=self.partition_cols,
+                compression=self.compression or "snappy", mode=self.mode, key=self.key,
+            )
+        else:
+            filepath = os.path.join(self.directory, f"part-{self._batches:05d}")
+            self.written.append(save(df, filepath=filepath, file_format=self.file_format, compression=self.compression))
+        self._batches += 1
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ResultWriter(directory={self.directory}, rows={self.rows}, files={len(self.written)})"
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from sysyphus.models.boulder import Boulder
+from sysyphus.scripts import datasets, transport, vocabulary
+from sysyphus.scripts.standin import render_page
+
+
+DATASET_URL = "https://github.com/Psemp/sysyphus_notebooks/raw/main/datasets/metbull_data.json"
+PAGE_URL = "https://www.lpi.usra.edu/meteor/metbull.php?code={code}"
+
+SAMPLE_ROWS = [
+    ("Catalina 501", 2022, "Chile", "H5", 18.8, 501, "25°4'51.93\"S", "69°55'46.79\"W"),
+    ("Catalina 503", 2017, "Chile", "H6", 29.3, 503, "25°5'37.61\"S", "69°54'53.56\"W"),
+    ("Catalina 508", 2019, "Chile", "L6", 327.0, 508, "25°5'45.14\"S", "69°54'24.72\"W"),
+    ("Dhofar 1001", 2001, "Oman", "H5", 1200.0, 1001, "19°1'12\"N", "54°33'36\"E"),
+    ("Aachen", 1880, "Germany", "L5", 21.0, None, None, None),
+]
+
+
+def sample_dataset() -> pd.DataFrame:
+    """A tiny stand-in for sy_df, with the columns of the monthly MetBull clone."""
+    return pd.DataFrame([
+        {"name": name, "year": year, "country": country, "type": mtype, "mass": mass,
+         "URL": PAGE_URL.format(code=code or 1), "numeric_id": code}
+        for name, year, country, mtype, mass, code, _, _ in SAMPLE_ROWS
+    ])
+
+
+@pytest.fixture
+def cassette_dir(tmp_path):
+    """Cassette holding the sample dataset and one MetBull page per sample meteorite."""
+    directory = str(tmp_path / "cassette")
+    cassette = transport.Cassette(directory)
+    dataset = sample_dataset()
+    cassette.put(url=DATASET_URL, status=200, headers={"Content-Type": "application/json"},
+                 body=dataset.to_json(orient="records", lines=True).encode("utf-8"))
+    for name, _, _, _, _, code, latitude, longitude in SAMPLE_ROWS:
+        properties = {"Pieces:": "1", "Weathering grade:": "W1"}
+        if latitude is not None:
+            properties.update({"Latitude:": latitude, "Longitude:": longitude})
+        cassette.put(url=PAGE_URL.format(code=code or 1), status=200, headers={"Content-Type": "text/html"},
+                     body=render_page(name, properties).encode("utf-8"))
+    return directory
+
+
+@pytest.fixture
+def offline_boulder(cassette_dir, tmp_path, monkeypatch):
+    """A Boulder loaded from the replayed sample dataset, with no network access."""
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path / "cache"))
+    transport.configure(mode="replay", cassette_dir=cassette_dir)
+    try:
+        yield Boulder()
+    finally:
+        transport.reset()
+        datasets.clear()
+        vocabulary._registry.clear()
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+import pytest
+
+from conftest import sample_dataset
+
+pa = pytest.importorskip("pyarrow")
+
+from sysyphus.scripts import arrow_io  # noqa: E402
+
+
+def test_ipc_roundtrip(tmp_path):
+    df = sample_dataset().astype({"numeric_id": "Int64"})
+    for stream in [False, True]:
+        path = arrow_io.write_ipc(df, str(tmp_path / f"sy_df_{stream}.arrow"), stream=stream)
+        table = arrow_io.read_ipc(path)
+        assert table.num_rows == len(df)
+        restored = arrow_io.to_pandas(table)
+        assert restored["name"].tolist() == df["name"].tolist()
+        assert restored["numeric_id"].dtype == "Int64"
+
+
+def test_named_index_is_kept():
+    df = sample_dataset().set_index("name")
+    assert "name" in arrow_io.to_arrow(df).column_names
+
+
+def test_share_and_attach():
+    df = sample_dataset()
+    with arrow_io.share(df) as shared:
+        attached = arrow_io.attach(shared.name)
+        assert attached.table.equals(shared.table)
+        assert attached.to_pandas()["country"].tolist() == df["country"].tolist()
+        attached.close()
+
+        # A sibling process reads the same block
+        probe = (
+            "from sysyphus.scripts import arrow_io\n"
+            f"shared = arrow_io.attach({shared.name!r})\n"
+            "print(shared.table.num_rows)\n"
+            "shared.close()\n"
+        )
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+        assert output.stdout.strip() == str(len(df))
+
+    with pytest.raises(FileNotFoundError):
+        arrow_io.attach(shared.name)  # unlinked by its owner
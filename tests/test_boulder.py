@@ -1,5 +1,12 @@
+import json
+import os
 import unittest
+
+import pandas as pd
+import pytest
+
 from sysyphus.models import boulder as test_boulder
+from sysyphus.scripts import writers
 
 
 class TestBoulder(unittest.TestCase):
@@ -31,5 +38,153 @@ class TestBoulder(unittest.TestCase):
         del self.boulder
 
 
+def test_search_offline(offline_boulder):
+    result = offline_boulder.search(name="Catalina", country="chile", mtype="h5")
+    assert result["name"].tolist() == ["Catalina 501"]
+    assert offline_boulder.selected_meteorites is result
+
+    with pytest.raises(ValueError):
+        offline_boulder.search(mtype="not a type")
+
+
+def test_search_by_classification_offline(offline_boulder):
+    result = offline_boulder.search(classification={"group": "H"})
+    assert result["name"].tolist() == ["Catalina 501", "Catalina 503", "Dhofar 1001"]
+
+    result = offline_boulder.search(country="chile", classification={"petrologic_type": 6})
+    assert result["name"].tolist() == ["Catalina 503", "Catalina 508"]
+
+    with pytest.raises(ValueError):
+        offline_boulder.search(classification={"family": "H"})
+
+
+def test_explain_and_profile_offline(offline_boulder):
+    report = offline_boulder.explain(name="Catalina", country="chile", classification={"petrologic_type": 6})
+    assert [step.name for step in report.steps] == ["name", "country", "classification"]
+    assert [(step.rows_in, step.rows_out) for step in report.steps] == [(5, 3), (3, 3), (3, 2)]
+    assert report.steps[-1].access.startswith("precomputed classification columns")
+    assert report.rows_out == 2 and report.dataset["rows"] == 5
+    assert not hasattr(offline_boulder, "selected_meteorites")  # explaining does not select
+
+    offline_boulder.search(name="Dhofar", country="chile", mtype="H5", profile=True)
+    report = offline_boulder.query_report
+    assert [step.skipped for step in report.steps] == [False, False, True]
+    assert report.rows_out == 0 and len(report.as_frame()) == 3
+    assert "skipped" in str(report)
+
+
+def test_memory_budget_offline(offline_boulder):
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    for meteorite in offline_boulder.met_list:  # html kept, like extract_properties(purge_after=False)
+        meteorite.table_soup, meteorite.soup_bytes = "<td>" + "x" * 1000 + "</td>", 1009
+    results = offline_boulder.display_search()
+    usage = offline_boulder.memory_usage()
+    assert usage["usage"]["soups"] > 0 and usage["usage"]["df_searched"] > 0 and usage["limit"] is None
+
+    offline_boulder.memory.limit = usage["usage"]["sy_df"]  # no room for anything else
+    evicted = offline_boulder.memory.enforce()
+    assert evicted[0] == "soups" and {"selected_meteorites", "df_searched"} <= set(evicted)
+    assert all(meteorite.table_soup is None for meteorite in offline_boulder.met_list)
+    assert offline_boulder.memory_usage()["spilled"] == ["df_searched", "selected_meteorites"]
+
+    pd.testing.assert_frame_equal(offline_boulder.df_searched, results)  # read back from disk
+    offline_boulder.dump_search()
+    assert not hasattr(offline_boulder, "selected_meteorites") and not offline_boulder.memory.spilled
+
+
+def test_request_metbull_with_scrape_cache(offline_boulder, tmp_path):
+    offline_boulder.scrape_cache = test_boulder.ScrapeCache(path=str(tmp_path / "scrape_cache.sqlite"))
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    assert len(offline_boulder.scrape_cache) == 3
+
+    offline_boulder.request_metbull()
+    assert offline_boulder.stats.counters["cache_hits"] == 3  # the replayed pages are counted apart
+    assert offline_boulder.stats.counters["replayed"] == 3
+
+
+def test_prefetch_after_search_offline(offline_boulder):
+    offline_boulder.prefetch = True
+    offline_boulder.search(name="Catalina")
+    assert offline_boulder.prefetcher.wait(timeout=10)
+    offline_boulder.request_metbull()
+    assert offline_boulder.stats.counters["prefetch_hits"] == 3
+    assert all(meteorite.extracted for meteorite in offline_boulder.met_list)
+
+    offline_boulder.dump_search()
+    assert offline_boulder.prefetcher is None
+
+
+def test_save_search_streamed_and_partitioned(offline_boulder, tmp_path):
+    offline_boulder.search(name="Catalina")
+    with writers.ResultWriter(directory=str(tmp_path / "stream"), batch_size=2) as writer:
+        offline_boulder.request_metbull(on_result=writer.add)
+    assert writer.rows == 3 and len(writer.written) == 2
+
+    offline_boulder.display_search()
+    written = offline_boulder.save_search(
+        filepath=str(tmp_path / "archive"), file_format="parquet", partition_cols=["fall_country", "type"]
+    )
+    assert len(written) == 3  # Chile/H5, Chile/H6, Chile/L6
+    archive = writers.read_partitioned(str(tmp_path / "archive"), filters={"type": "H5"})
+    assert archive["name"].tolist() == ["Catalina 501"]
+
+    with pytest.raises(ValueError):
+        offline_boulder.save_search(filepath=str(tmp_path / "archive"), file_format="csv", partition_cols=["type"])
+
+
+def test_request_chunked(offline_boulder, tmp_path):
+    offline_boulder.search(name="Catalina")
+    directory = str(tmp_path / "sweep")
+    written = offline_boulder.request_chunked(directory=directory, chunk_size=2, file_format="csv")
+    assert [os.path.basename(path) for path in written] == ["part-00000.csv", "part-00001.csv"]
+    results = pd.concat([pd.read_csv(path) for path in written])
+    assert sorted(results["name"]) == ["Catalina 501", "Catalina 503", "Catalina 508"]
+    assert not hasattr(offline_boulder, "met_list")
+
+    assert offline_boulder.request_chunked(directory=directory, chunk_size=2, file_format="csv") == []  # all done
+    with pytest.raises(ValueError):
+        offline_boulder.request_chunked(directory=directory, chunk_size=1, file_format="csv")
+
+    progress_path = os.path.join(directory, "_progress.json")
+    with open(progress_path, mode="r") as file:
+        progress = json.load(file)
+    with open(progress_path, mode="w") as file:  # interrupted after the first chunk
+        json.dump(progress | {"chunks_done": 1}, file)
+    written = offline_boulder.request_chunked(directory=directory, chunk_size=2, file_format="csv")
+    assert [os.path.basename(path) for path in written] == ["part-00001.csv"]
+
+    offline_boulder.selected_meteorites = offline_boulder.selected_meteorites.iloc[::-1]  # same size, other order
+    with pytest.raises(ValueError):
+        offline_boulder.request_chunked(directory=directory, chunk_size=2, file_format="csv")
+
+
+def test_request_chunked_partitioned_resume_does_not_duplicate(offline_boulder, tmp_path):
+    pytest.importorskip("pyarrow")
+    offline_boulder.search(name="Catalina")
+    directory = str(tmp_path / "sweep")
+    offline_boulder.request_chunked(directory=directory, chunk_size=2, partition_cols=["type"])
+    progress_path = os.path.join(directory, "_progress.json")
+    with open(progress_path, mode="r") as file:
+        progress = json.load(file)
+    with open(progress_path, mode="w") as file:  # crashed after writing the last chunk, before recording it
+        json.dump(progress | {"chunks_done": 1}, file)
+    offline_boulder.request_chunked(directory=directory, chunk_size=2, partition_cols=["type"])
+
+    results = writers.read_partitioned(directory)
+    assert sorted(results["name"]) == ["Catalina 501", "Catalina 503", "Catalina 508"]
+
+
+def test_to_arrow(offline_boulder):
+    pytest.importorskip("pyarrow")
+    assert offline_boulder.to_arrow().num_rows == len(offline_boulder.sy_df)
+    with pytest.raises(AttributeError):
+        offline_boulder.to_arrow(results=True)
+
+    with offline_boulder.share() as shared:
+        assert shared.to_pandas()["name"].tolist() == offline_boulder.sy_df["name"].tolist()
+
+
 if __name__ == "__main__":
     unittest.main()
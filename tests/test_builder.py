@@ -0,0 +1,77 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import builder, delta, remote_load, transport
+from sysyphus.scripts.standin import StandInServer, render_listing
+
+
+LISTING = [
+    {"name": "Aachen", "code": 1, "year": 1880, "place": "Nordrhein-Westfalen, Germany", "type": "L5", "mass": "21 g"},
+    {"name": "Catalina 501", "code": 501, "year": 2022, "place": "Antofagasta, Chile", "type": "H5", "mass": "18.8 g"},
+    {"name": "Catalina 503", "code": 503, "year": 2017, "place": "Antofagasta, Chile", "type": "H6", "mass": "29.3 g"},
+    {"name": "Dhofar 1001", "code": 1001, "year": 2001, "place": "Oman", "type": "H5", "mass": "1.2 kg"},
+]
+
+
+def put_listing(cassette: transport.Cassette, meteorites: list, page_size: int = 3) -> None:
+    for page, start in enumerate(range(0, len(meteorites) + 1, page_size)):
+        body = render_listing(meteorites[start:start + page_size]).encode("utf-8")
+        cassette.put(url=builder.listing_url(page, page_size=page_size), status=200, headers={}, body=body)
+
+
+@pytest.fixture
+def listing_server(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path / "cache"))
+    cassette = transport.Cassette(str(tmp_path / "cassette"))
+    put_listing(cassette, LISTING)
+    with StandInServer(cassette_dir=str(tmp_path / "cassette")) as server:
+        transport.configure(base_url=server.url)
+        try:
+            yield server
+        finally:
+            transport.reset()
+
+
+def test_parse_listing():
+    rows = builder.parse_listing(render_listing(LISTING[2:]).encode("utf-8"), url=builder.listing_url(0))
+    assert rows[0] == {
+        "name": "Catalina 503", "year": 2017, "country": "Chile", "type": "H6", "mass": 29.3,
+        "URL": "https://www.lpi.usra.edu/meteor/metbull.php?code=503", "numeric_id": 503,
+    }
+    assert rows[1]["mass"] == 1200.0 and rows[1]["country"] == "Oman"
+    assert builder.parse_listing(b"<html><table><tr><td>x</td></tr></table></html>", url="") == []
+
+
+def test_builds_then_only_parses_changed_pages(listing_server, tmp_path):
+    output = str(tmp_path / "datasets")
+    report = builder.build(output, version="2026-09", page_size=3)
+    assert (report["rows"], report["pages"], report["changed_pages"], report["delta"]) == (4, 2, 2, None)
+
+    df = remote_load.read_dataset(os.path.join(output, "metbull_data.json"))
+    assert df["name"].tolist() == [meteorite["name"] for meteorite in LISTING]
+    assert pd.isna(df.loc[0, "numeric_id"]) and df.loc[3, "mass"] == 1200.0
+    with open(os.path.join(output, "country_validation.json")) as file:
+        assert sorted(json.load(file)) == ["chile", "germany", "oman"]  # normalized, like get_uniques
+    assert remote_load.load_snapshot()[1]["version"] == "2026-09"
+
+    changed = LISTING[:3] + [LISTING[3] | {"mass": "1.3 kg"}, LISTING[3] | {"name": "Dhofar 1002", "code": 1002}]
+    put_listing(listing_server.cassette, changed)  # the second page changes, the first one does not
+    report = builder.build(output, version="2026-10", page_size=3)
+    assert (report["not_modified"], report["changed_pages"]) == (1, 1)
+    assert report["delta"] == {"added": 1, "changed": 1, "removed": 0}
+
+    manifest = builder.read_manifest(output)
+    assert manifest["version"] == "2026-10"
+    checksum = remote_load.file_sha256(os.path.join(output, "metbull_data.json"))
+    assert manifest["checksums"]["metbull_data.json"] == checksum
+    assert delta.delta_chain(manifest, "2026-09") == [
+        {"from": "2026-09", "to": "2026-10", "path": "deltas/2026-09_2026-10.json.gz"},
+    ]
+
+
+def test_failed_listing_page_aborts_the_build(listing_server, tmp_path):
+    with pytest.raises(ConnectionError):
+        builder.build(str(tmp_path / "datasets"), page_size=2)  # not recorded with this page size : 404
@@ -0,0 +1,70 @@
+import json
+
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import classification
+from sysyphus.scripts.classification import add_columns, parse_type, select
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("L6", {"class": "chondrite", "subclass": "ordinary", "group": "L", "petrologic_min": 6, "petrologic_max": 6}),
+    ("LL3.8-4", {"group": "LL", "petrologic_min": 3.8, "petrologic_max": 4, "modifiers": []}),
+    ("H/L3.6", {"group": "H/L", "petrologic_min": 3.6}),
+    ("CVred3", {"subclass": "carbonaceous", "group": "CV", "subgroup": "red", "petrologic_min": 3}),
+    ("CBb", {"group": "CB", "subgroup": "b", "petrologic_min": None}),
+    ("H5-melt breccia", {"group": "H", "petrologic_max": 5, "modifiers": ["melt breccia"]}),
+    ("L(LL)3.05", {"group": "L", "petrologic_min": 3.05, "modifiers": ["LL affinity"]}),
+    ("H?", {"group": "H", "modifiers": ["uncertain"]}),
+    ("Iron, IAB-sLL-an", {"class": "iron", "group": "IAB", "subgroup": "SLL", "modifiers": ["anomalous"]}),
+    ("Iron, ungrouped", {"class": "iron", "group": None, "modifiers": ["ungrouped"]}),
+    ("Martian (shergottite)", {"class": "achondrite", "subclass": "martian", "group": "shergottite"}),
+    ("Eucrite-pmict", {"subclass": "HED", "group": "eucrite", "modifiers": ["polymict"]}),
+    ("Pallasite, PMG-an", {"class": "stony-iron", "group": "pallasite", "subgroup": "PMG"}),
+    ("Acapulcoite/lodranite", {"class": "primitive achondrite", "group": "acapulcoite"}),
+    ("Pseudometeorite", {"class": "other", "group": None}),
+])
+def test_parse_type(raw, expected):
+    fields = parse_type(raw)
+    for field, value in expected.items():
+        assert fields[field] == value, field
+
+
+def test_every_known_type_parses():
+    with open("sysyphus/utils/type_validation.json") as file:
+        types = json.load(file)
+    for raw in types:
+        assert parse_type(raw)["class"] is not None, raw
+    assert parse_type(None) == classification.empty_fields()
+
+
+def test_add_columns_and_select():
+    df = pd.DataFrame({
+        "name": ["a", "b", "c", "d", "e", "f"],
+        "type": ["H5", "H6", "L6", "H5-melt breccia", "Iron, IIIAB", None],
+    })
+    df = add_columns(df)
+    assert df["type_group"].dtype == "category"
+    assert df["type_group"].tolist()[:5] == ["H", "H", "L", "H", "IIIAB"]
+    assert pd.isna(df["type_group"].iloc[5])
+
+    assert df[select(df, {"group": "h"})]["name"].tolist() == ["a", "b", "d"]
+    assert df[select(df, {"group": ["L", "IIIAB"]})]["name"].tolist() == ["c", "e"]
+    assert df[select(df, {"petrologic_type": 6})]["name"].tolist() == ["b", "c"]
+    assert df[select(df, {"class": "chondrite", "modifier": "melt breccia"})]["name"].tolist() == ["d"]
+    assert classification.drop_columns(df).columns.tolist() == ["name", "type"]
+
+    with pytest.raises(ValueError):
+        select(df, {"family": "H"})
+
+
+def test_petrologic_ranges():
+    df = add_columns(pd.DataFrame({"type": ["LL3.2", "LL3.8-4", "LL<3.5", "LL5", "LL"]}))
+    assert select(df, {"petrologic_type": 3}).tolist() == [True, True, True, False, False]
+    assert select(df, {"petrologic_type": 3.3}).tolist() == [False, False, True, False, False]
+    assert select(df, {"petrologic_type": (3.9, 5)}).tolist() == [False, True, False, True, False]
+
+
+def test_describe():
+    assert classification.describe("LL3.8-4") == "chondrite > ordinary > LL, type 3.8-4"
+    assert classification.describe("Iron, IAB-sLL-an") == "iron > IAB > SLL, anomalous"
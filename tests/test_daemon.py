@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from sysyphus.models.client import BoulderClient
+from sysyphus.scripts.daemon import make_server
+from sysyphus.scripts.scrape_cache import ScrapeCache
+
+
+@pytest.fixture
+def client(offline_boulder, tmp_path):
+    offline_boulder.scrape_cache = ScrapeCache(path=str(tmp_path / "scrape_cache.sqlite"))
+    server = make_server(boulder=offline_boulder, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield BoulderClient(url=f"http://127.0.0.1:{server.server_address[1]}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_health(client):
+    assert client.health() == {"status": "ok", "rows": 5, "cached_pages": 0}
+
+
+def test_search_scrape_and_render(client):
+    result = client.search(name="catalina", numeric_range=[500, 505])
+    assert result["name"].tolist() == ["Catalina 501", "Catalina 503"]
+
+    with pytest.warns(UserWarning):
+        assert client.display_search().empty
+
+    client.request_metbull(rate_limiter=4)
+    assert client.df_searched.loc["Catalina 501", "weathering_g"] == "W1"
+    assert client.health()["cached_pages"] == 2
+
+    rendered = client.display_search(ommit=["latitude", "longitude"])
+    assert rendered.loc["Catalina 503", "coordinates"][0] == pytest.approx(-25.0937805, abs=1e-6)
+    assert "latitude" not in rendered.columns
+
+
+def test_search_by_classification(client):
+    result = client.search(country="chile", classification={"petrologic_type": 6})
+    assert result["name"].tolist() == ["Catalina 503", "Catalina 508"]
+
+
+def test_invalid_search(client):
+    with pytest.raises(ValueError):
+        client.search(country="Atlantis")
+    with pytest.raises(ValueError):
+        client.search(classification={"family": "H"})
+    with pytest.raises(ValueError):
+        client.search()
@@ -0,0 +1,66 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysyphus.models.boulder import Boulder
+from sysyphus.scripts import datasets
+
+
+def test_boulders_share_the_dataset(offline_boulder):
+    stats_before = dict(offline_boulder.stats.stages)
+    second = Boulder()
+
+    assert "download" not in second.stats.stages  # loaded once for the process
+    assert "download" in stats_before
+    assert np.shares_memory(offline_boulder.sy_df["mass"].to_numpy(), second.sy_df["mass"].to_numpy())
+    assert list(datasets.loaded()) == ["json"]
+
+    # Copy-on-write : a session changing its view does not change the others
+    second.sy_df.loc[0, "mass"] = -1.0
+    assert offline_boulder.sy_df.loc[0, "mass"] != -1.0
+    assert datasets.get()[0].loc[0, "mass"] != -1.0
+
+    # Per session state stays separate
+    second.search(name="Catalina")
+    assert not hasattr(offline_boulder, "selected_meteorites")
+
+
+def test_in_place_edits_stay_in_their_boulder(offline_boulder):
+    second = Boulder()
+    before = offline_boulder.sy_df.copy()
+
+    second.sy_df.iloc[0, second.sy_df.columns.get_loc("mass")] = -1.0
+    second.sy_df.loc[second.sy_df["name"].str.startswith("Catalina"), "country"] = "Atacama"
+    second.sy_df.fillna({"year": 0}, inplace=True)
+    with pytest.raises(ValueError):  # the shared arrays are read-only
+        second.sy_df["mass"].to_numpy()[1] = -1.0
+
+    pd.testing.assert_frame_equal(offline_boulder.sy_df, before)
+    pd.testing.assert_frame_equal(datasets.get()[0], before)
+    assert (second.sy_df["country"] == "Atacama").sum() == 3
+
+
+def test_private_dataset(offline_boulder):
+    private = Boulder(shared=False)
+    assert "download" in private.stats.stages
+    assert not np.shares_memory(offline_boulder.sy_df["mass"].to_numpy(), private.sy_df["mass"].to_numpy())
+
+
+def test_concurrent_first_load(offline_boulder, monkeypatch):
+    datasets.clear()
+    calls = []
+    original = datasets.load
+
+    def counting_load(**kwargs):
+        calls.append(kwargs)
+        return original(**kwargs)
+
+    monkeypatch.setattr(datasets, "load", counting_load)
+    threads = [threading.Thread(target=datasets.get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
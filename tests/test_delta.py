@@ -0,0 +1,76 @@
+import json
+
+import pandas as pd
+import pytest
+
+from conftest import DATASET_URL, sample_dataset
+from sysyphus.scripts import delta, remote_load, transport
+
+
+@pytest.fixture
+def versions():
+    old = sample_dataset().astype({"numeric_id": "Int64"})
+    new = old.copy()
+    new.loc[new["name"] == "Aachen", "type"] = "L6"  # changed
+    new = new[new["name"] != "Catalina 508"]  # removed
+    new = pd.concat([new, pd.DataFrame([{  # added
+        "name": "Catalina 700", "year": 2023, "country": "Chile", "type": "H4", "mass": 12.0,
+        "URL": "https://www.lpi.usra.edu/meteor/metbull.php?code=700", "numeric_id": 700,
+    }])], ignore_index=True).astype({"numeric_id": "Int64"})
+    return old, new
+
+
+def test_compute_and_apply(versions):
+    old, new = versions
+    row_delta = delta.compute_delta(old, new)
+
+    assert row_delta["added"]["name"].tolist() == ["Catalina 700"]
+    assert row_delta["changed"]["name"].tolist() == ["Aachen"]
+    assert row_delta["removed"]["name"].tolist() == ["Catalina 508"]
+    assert delta.touched_urls(row_delta) == old.loc[old["name"] == "Aachen", "URL"].tolist()
+
+    applied = delta.apply_delta(old, row_delta)
+    assert delta.is_empty(delta.compute_delta(applied, new))
+    assert applied["numeric_id"].dtype == "Int64"
+
+
+def test_write_read_and_publish(versions, tmp_path):
+    old, new = versions
+    manifest = delta.publish(old, new, from_version="2026-09", to_version="2026-10", directory=str(tmp_path))
+    manifest = delta.publish(new, new, from_version="2026-10", to_version="2026-11", directory=str(tmp_path))
+
+    assert manifest["version"] == "2026-11"
+    assert [entry["to"] for entry in delta.delta_chain(manifest, "2026-09")] == ["2026-10", "2026-11"]
+    assert delta.delta_chain(manifest, "2026-11") == []
+    assert delta.delta_chain(manifest, "2020-01") is None
+
+    row_delta = delta.read_delta(str(tmp_path / manifest["deltas"][0]["path"]))
+    assert row_delta["from_version"] == "2026-09"
+    assert delta.is_empty(delta.compute_delta(delta.apply_delta(old, row_delta), new))
+
+
+def test_update_dataset(versions, tmp_path, monkeypatch):
+    old, new = versions
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path / "cache"))
+    published = tmp_path / "published"
+    manifest = delta.publish(old, new, from_version="2026-09", to_version="2026-10", directory=str(published))
+
+    cassette = transport.Cassette(str(tmp_path / "cassette"))
+    cassette.put(url=f"{remote_load.DATASETS_URL}manifest.json", status=200, headers={},
+                 body=json.dumps(manifest).encode("utf-8"))
+    path = manifest["deltas"][0]["path"]
+    cassette.put(url=f"{remote_load.DATASETS_URL}{path}", status=200, headers={}, body=(published / path).read_bytes())
+    cassette.put(url=DATASET_URL, status=200, headers={}, body=new.to_json(orient="records", lines=True).encode())
+
+    remote_load.save_snapshot(old, version="2026-09")
+    transport.configure(mode="replay", cassette_dir=str(tmp_path / "cassette"))
+    try:
+        df, version, deltas = remote_load.update_dataset()
+        assert version == "2026-10" and len(deltas) == 1
+        assert delta.is_empty(delta.compute_delta(df, new))
+        assert remote_load.load_snapshot()[1]["version"] == "2026-10"
+
+        # Up to date : nothing but the manifest is fetched
+        assert remote_load.update_dataset()[2] == []
+    finally:
+        transport.reset()
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import enriched, transport
+from sysyphus.scripts.scrape_cache import ScrapeCache
+
+
+def test_bundle_serves_without_requests(offline_boulder, tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    offline_boulder.scrape_cache = ScrapeCache(path=str(tmp_path / "scrape_cache.sqlite"))
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    scraped = offline_boulder.display_search()
+
+    bundle = enriched.build(records=offline_boulder.scrape_cache.items(), df=offline_boulder.sy_df, version="2026-10")
+    assert len(bundle) == 3 and bundle.version == "2026-10"
+    assert bundle.frame["fa_content"].dtype == float
+    path = bundle.save(str(tmp_path / "enriched"))
+    bundle = enriched.EnrichedBundle.load(path)
+    assert bundle.frame.index.name == "URL" and len(bundle) == 3
+
+    def no_request(*args, **kwargs):
+        raise AssertionError("no page should be requested")
+
+    monkeypatch.setattr(transport, "fetch", no_request)
+    offline_boulder.scrape_cache = None
+    offline_boulder.enriched_bundle = bundle
+    offline_boulder.dump_search()
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    assert offline_boulder.stats.counters["bundle_hits"] == 3
+
+    served = offline_boulder.display_search()
+    pd.testing.assert_frame_equal(served, scraped)
+
+
+def test_bundle_records_and_discard(offline_boulder):
+    url = offline_boulder.sy_df["URL"].iloc[0]
+    records = {
+        url: {"latitude": "50°46'N", "mass": "21 kg", "fa_content": 18.5, "coordinates": [50.77, None]},
+        "https://example.com/not-in-the-dataset": {"mass": "1 g"},
+    }
+    bundle = enriched.build(records=records, df=offline_boulder.sy_df)
+    assert list(bundle.frame.index) == [url]
+    assert bundle.frame.loc[url, "name"] == offline_boulder.sy_df["name"].iloc[0]
+
+    record = bundle.get_many([url])[url]
+    assert record["mass"] == "21 kg" and record["fa_content"] == 18.5
+    assert "pieces" not in record  # missing values keep the Meteorite defaults
+    assert record["coordinates"][0] == 50.77 and np.isnan(record["coordinates"][1])
+
+    bundle.discard([url])
+    assert len(bundle) == 0 and bundle.meta["rows"] == 0
@@ -0,0 +1,36 @@
+import json
+
+import pandas as pd
+
+from sysyphus.scripts.explain import QueryReport
+from sysyphus.scripts.search import apply_filters
+
+
+def make_df() -> pd.DataFrame:
+    return pd.DataFrame({
+        "name": ["Catalina 501", "Catalina 503", "Aachen"],
+        "numeric_id": [501, 503, None],
+        "country": ["Chile", "Chile", "Germany"],
+        "type": ["H5", "H6", "L5"],
+    })
+
+
+def test_report_follows_the_filters():
+    parameters = {"namespace": "catalina", "numeric_range": [500, 502], "type": "H5"}
+    report = QueryReport(parameters=parameters, dataset={"rows": 3})
+    result = apply_filters(make_df(), parameters, report=report)
+
+    assert result["name"].tolist() == ["Catalina 501"]
+    assert [(step.name, step.rows_in, step.rows_out) for step in report.steps] == [("name", 3, 1), ("type", 1, 1)]
+    assert "numeric_id" in report.steps[0].access
+    assert report.steps[0].selectivity == 1 / 3
+    assert report.slowest() in report.steps
+    assert all(step.allocated >= step.retained >= 0 for step in report.steps)
+    assert json.loads(json.dumps(report.to_dict()))["rows_out"] == 1
+
+
+def test_report_without_memory_tracing():
+    report = QueryReport(parameters={"country": "chile"}, memory=False)
+    apply_filters(make_df(), {"country": "chile"}, report=report)
+    assert report.steps[0].allocated == 0 and report.steps[0].seconds > 0
+    assert report.rows_out == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from sysyphus.models.meteorite import fetch_table
+from sysyphus.scripts import metrics, transport
+from sysyphus.scripts.html_stream import TableScanner, read_until_table
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+PAGE_URL = "https://www.lpi.usra.edu/meteor/metbull.php?code=1234"
+TAIL = "<p>Reference, pictures and plenty of markup</p>\n" * 20000  # ~1 MB after the table
+
+
+@pytest.fixture(autouse=True)
+def reset_transport():
+    yield
+    transport.reset()
+
+
+@pytest.fixture
+def long_page_cassette(tmp_path):
+    page = render_page("Catalina 501", {"Latitude:": "25°4'51.93\"S", "Pieces:": "3"})
+    page = page.replace("</body>", f"{TAIL}</body>")
+    cassette = transport.Cassette(str(tmp_path / "source"))
+    cassette.put(url=PAGE_URL, status=200, headers={"Content-Type": "text/html"}, body=page.encode("utf-8"))
+    return str(tmp_path / "source"), len(page.encode("utf-8"))
+
+
+def test_scanner_handles_nested_tables_and_split_tags():
+    page = '<table><tr><td>x</td></tr></table><table id="maintable"><tr><td><table><tr>' \
+           '<td>1</td></tr></table></td></tr></table><p>tail</p>'
+    end = page.index("<p>")
+    scanner = TableScanner()
+    fed = ""
+    for position in range(0, len(page), 3):  # tags cut anywhere
+        fed += page[position:position + 3]
+        scanner.feed(page[position:position + 3])
+        if scanner.complete:
+            break
+    assert scanner.complete
+    assert end <= len(fed) < end + 3
+
+    scanner = TableScanner(table_id="missing")
+    scanner.feed(page)
+    assert not scanner.complete
+
+
+def test_stops_reading_after_the_table(long_page_cassette):
+    cassette_dir, size = long_page_cassette
+    with StandInServer(cassette_dir=cassette_dir) as server:
+        transport.configure(base_url=server.url)
+        response = transport.fetch(PAGE_URL, stream=True)
+        content, complete = read_until_table(response)
+
+        assert complete
+        assert b"</table>" in content
+        assert len(content) < size // 10
+
+        pool = transport.get_session().get_adapter(server.url).poolmanager.connection_from_url(server.url)
+        assert pool.pool.qsize() == pool.pool.maxsize  # the connection slot went back to the pool
+
+        stats = metrics.Stats()
+        table = fetch_table(PAGE_URL, stats=stats)
+        assert "Pieces:" in table.text and "25°4'51.93" in table.text
+        assert stats.counters["early_closes"] == 1
+        assert server.connections == 2  # ~1 MB left each time : closed rather than downloaded
+
+
+def test_small_rest_is_drained_and_the_connection_reused(tmp_path):
+    page = render_page("Aachen", {"Pieces:": "1"}).replace("</body>", "<p>References</p>\n" * 200 + "</body>")
+    cassette = transport.Cassette(str(tmp_path))
+    cassette.put(url=PAGE_URL, status=200, headers={"Content-Type": "text/html"}, body=page.encode("utf-8"))
+    with StandInServer(cassette_dir=str(tmp_path)) as server:
+        transport.configure(base_url=server.url)
+        for _ in range(3):
+            _, complete = read_until_table(transport.fetch(PAGE_URL, stream=True))
+            assert complete
+    assert server.connections == 1  # kept alive for every page
+
+
+def test_replayed_pages_are_read_whole(long_page_cassette):
+    cassette_dir, size = long_page_cassette
+    transport.configure(mode="replay", cassette_dir=cassette_dir)
+    content, complete = read_until_table(transport.fetch(PAGE_URL, stream=True))
+    assert complete and len(content) < size  # slices of the recorded body, stopped all the same
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+import pytest
+
+import sysyphus
+
+
+HEAVY_MODULES = ["pandas", "numpy", "bs4", "requests", "tqdm"]
+
+
+@pytest.mark.parametrize("module", ["sysyphus", "sysyphus.scripts.search", "sysyphus.scripts.metrics"])
+def test_lightweight_imports(module):
+    probe = f"import sys, {module}; print(','.join(name for name in {HEAVY_MODULES} if name in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+    assert loaded.strip() == ""
+
+
+def test_lazy_boulder():
+    from sysyphus.models.boulder import Boulder
+
+    assert sysyphus.Boulder is Boulder
+    assert "Boulder" in dir(sysyphus)
+    with pytest.raises(AttributeError):
+        sysyphus.Pebble
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import memory
+from sysyphus.scripts.memory import MemoryBudget
+
+
+class Holder:
+    def __getattr__(self, name: str):
+        budget = self.__dict__.get("budget")
+        if budget is not None and budget.is_spilled(name):
+            return budget.restore(name)
+        raise AttributeError(name)
+
+
+def test_parse_size():
+    assert memory.parse_size("512MB") == 512 * 1024 ** 2
+    assert memory.parse_size("1.5 kb") == 1536
+    assert memory.parse_size(100) == 100 and memory.parse_size(None) is None
+    with pytest.raises(ValueError):
+        memory.parse_size("a lot")
+
+
+def test_shared_objects_are_counted_once():
+    df = pd.DataFrame({"name": ["Aachen"] * 1000, "mass": np.arange(1000.0)})
+    seen = set()
+    assert memory.object_size(df, seen) >= 8000
+    assert memory.object_size({"df": df}, seen) < 1000
+    assert memory.object_size(np.zeros(100)) == 800
+
+
+def test_eviction_order_and_spill(tmp_path):
+    holder = Holder()
+    holder.budget = MemoryBudget(limit="1kb", spill_dir=str(tmp_path))
+    holder.frame = pd.DataFrame({"value": np.arange(1000.0)})
+    holder.index = np.zeros(10)
+    soups = {"freed": False}
+    holder.budget.track_attribute(holder, "frame", "spill")
+    holder.budget.track_attribute(holder, "index", "cache")
+    holder.budget.track("soups", "soups", lambda seen: 0 if soups["freed"] else 4096,
+                        evict=lambda: soups.update(freed=True))
+
+    assert holder.budget.total() > 1024
+    assert holder.budget.enforce() == ["soups", "index", "frame"]
+    assert holder.index is None and "frame" not in holder.__dict__
+    assert holder.budget.total() < 1024
+
+    assert holder.frame["value"].sum() == np.arange(1000.0).sum()  # read back on access
+    assert not holder.budget.spilled and not list(tmp_path.iterdir())
+
+    holder.budget.policy = "lru"
+    holder.index = np.zeros(10)
+    holder.budget.touch("index")
+    assert holder.budget.enforce() == ["frame"]  # least recently used first, whatever the kind
+
+    with pytest.raises(ValueError):
+        MemoryBudget(policy="fifo")
+
+
+def test_temporary_spill_directory_is_removed(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path))
+    holder = Holder()
+    holder.budget = MemoryBudget(limit=0)
+    holder.frame = pd.DataFrame({"value": np.arange(100.0)})
+    holder.budget.track_attribute(holder, "frame", "spill")
+
+    holder.budget.enforce()
+    directory = holder.budget.spill_dir
+    assert directory.startswith(str(tmp_path)) and len(list(tmp_path.glob("spill-*"))) == 1
+    assert len(holder.frame) == 100  # restored, nothing is spilled anymore
+    assert holder.budget.spill_dir is None and not list(tmp_path.glob("spill-*"))
+
+    holder.budget.enforce()
+    holder.budget.close()
+    assert not holder.budget.spilled and not list(tmp_path.glob("spill-*"))
+
+
+def test_soup_size_is_not_measured_from_the_tree():
+    class Kept:  # a meteorite keeping its parsed html, see Meteorite.keep_page
+        table_soup, soup_bytes = object(), 1000
+
+    assert memory.soup_size(Kept()) == 1000 * memory.SOUP_FACTOR
+    Kept.table_soup = None
+    assert memory.soup_size(Kept()) == 0
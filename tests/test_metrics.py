@@ -0,0 +1,68 @@
+import math
+
+import pytest
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import metrics, transport
+from sysyphus.scripts.standin import render_page
+
+
+def test_histogram():
+    histogram = metrics.Histogram()
+    for value in [0.002, 0.003, 0.02, 0.4]:
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.total == pytest.approx(0.425)
+    assert histogram.quantile(0.5) == 0.005
+    assert histogram.quantile(1.0) == 0.4
+    assert math.isnan(metrics.Histogram().quantile(0.5))
+
+
+def test_timer_counters_and_hooks():
+    stats = metrics.Stats(track_urls=True)
+    events = []
+    stats.add_hook(events.append)
+
+    with stats.timer("http", url="https://example.com") as fields:
+        fields.update(bytes=120, retries=1, status=200)
+    stats.incr("cache_hits")
+
+    assert stats.counters == {"bytes": 120, "retries": 1, "cache_hits": 1}
+    assert stats.urls["https://example.com"]["status"] == 200
+    assert stats.summary()["stages"]["http"]["count"] == 1
+    assert events[0]["stage"] == "http" and events[0]["bytes"] == 120
+
+    stats.reset()
+    assert stats.summary() == {"counters": {}, "stages": {}, "urls": 0}
+
+
+def test_urls_not_tracked_by_default():
+    stats = metrics.Stats()
+    with stats.timer("http", url="https://example.com") as fields:
+        fields.update(bytes=120, status=200)
+    assert stats.urls == {} and stats.counters == {"bytes": 120}
+
+
+def test_timed_without_stats():
+    with metrics.timed(None, "search", rows=3) as fields:
+        fields["rows"] = 4
+
+
+def test_meteorite_stages(tmp_path):
+    url = "https://www.lpi.usra.edu/meteor/metbull.php?code=7"
+    cassette = transport.Cassette(str(tmp_path))
+    cassette.put(url=url, status=200, headers={}, body=render_page("Aachen", {"Pieces:": "1"}).encode("utf-8"))
+    transport.configure(mode="replay", cassette_dir=str(tmp_path))
+
+    stats = metrics.Stats(track_urls=True)
+    try:
+        meteorite = Meteorite(name="Aachen", year="1880", country="Germany", type="L5", mass="21", url=url, stats=stats)
+        meteorite.extract_properties()
+    finally:
+        transport.reset()
+
+    assert meteorite.pieces == "1"
+    assert set(stats.stages) == {"http", "page_read", "html_parse", "extract"}
+    assert stats.counters["replayed"] == 1 and "cache_hits" not in stats.counters
+    assert stats.urls[url]["requests"] == 1
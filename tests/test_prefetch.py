@@ -0,0 +1,74 @@
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import metrics, scheduler, transport
+from sysyphus.scripts import user_requests as u_requests
+from sysyphus.scripts.prefetch import Prefetcher
+from sysyphus.scripts.scrape_cache import ScrapeCache
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+URLS = [f"https://www.lpi.usra.edu/meteor/metbull.php?code={code}" for code in range(1, 7)]
+
+
+def make_meteorites(stats: metrics.Stats = None) -> list:
+    return [
+        Meteorite(name="Aachen", year="1880", country="Germany", type="L5", mass="21", url=url, stats=stats)
+        for url in URLS
+    ]
+
+
+def record_pages(directory: str) -> None:
+    cassette = transport.Cassette(directory)
+    for url in URLS:
+        cassette.put(url=url, status=200, headers={}, body=render_page("Aachen", {"Pieces:": "1"}).encode("utf-8"))
+
+
+def test_prefetch_then_request_loads_the_prefetched_pages(tmp_path):
+    record_pages(str(tmp_path / "cassette"))
+    cache = ScrapeCache(path=str(tmp_path / "cache.sqlite"))
+    stats = metrics.Stats()
+    try:
+        with StandInServer(cassette_dir=str(tmp_path / "cassette")) as server:
+            transport.configure(base_url=server.url)
+            prefetcher = Prefetcher(make_meteorites(), cache=cache, rate_limiter=2, stats=stats)
+            assert prefetcher.job.priority == scheduler.PRIORITIES["background"]
+            assert prefetcher.wait(timeout=10) and prefetcher.done
+            assert len(prefetcher) == len(cache) == len(URLS)
+            assert prefetcher.job not in scheduler.get_scheduler().jobs()
+
+            meteorites = make_meteorites()
+            requested = u_requests.request_cached(meteorites, prefetched=prefetcher, stats=stats)
+    finally:
+        transport.reset()
+
+    assert requested == []
+    assert stats.counters["prefetched"] == stats.counters["prefetch_hits"] == len(URLS)
+    assert all(meteorite.extracted and meteorite.pieces == "1" for meteorite in meteorites)
+
+
+def test_cancel_drops_the_pages_not_started(tmp_path):
+    record_pages(str(tmp_path / "cassette"))
+    try:
+        with StandInServer(cassette_dir=str(tmp_path / "cassette"), latency=0.05) as server:
+            transport.configure(base_url=server.url)
+            prefetcher = Prefetcher(make_meteorites(), rate_limiter=1)
+            prefetcher.cancel()
+            assert prefetcher.wait(timeout=10) and prefetcher.cancelled
+    finally:
+        transport.reset()
+
+    assert len(prefetcher) <= 1  # at most the page already being requested
+    assert "cancelled" in repr(prefetcher)
+
+
+def test_cancel_hands_the_requests_running_over_at_the_caller_priority():
+    prefetcher = Prefetcher([])
+    prefetcher.cancel(priority="interactive")
+    assert prefetcher.cancelled and prefetcher.job.priority == scheduler.PRIORITIES["interactive"]
+    prefetcher.cancel(priority="bulk")  # never lowered
+    assert prefetcher.job.priority == scheduler.PRIORITIES["interactive"]
+
+
+def test_nothing_to_prefetch():
+    prefetcher = Prefetcher([])
+    assert prefetcher.done and len(prefetcher) == 0
+    assert prefetcher.job not in scheduler.get_scheduler().jobs()
@@ -1,7 +1,15 @@
+import hashlib
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import patch
+import pandas as pd
 import requests
+from sysyphus.scripts import remote_load, transport
+from sysyphus.scripts.metrics import Stats
 from sysyphus.scripts.remote_load import check_internet_connection
+from sysyphus.scripts.standin import StandInServer
 
 
 class TestRemoteLoad(unittest.TestCase):
@@ -26,5 +34,87 @@ class TestRemoteLoad(unittest.TestCase):
         self.assertFalse(result)
 
 
+
+class TestStreamedDownload(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dataset_path = os.path.join(self.tmp_dir.name, "metbull_data.json")
+        lines = [f'{{"name": "Catalina {code}", "numeric_id": {code}, "mass": 1.5}}' for code in range(1000)]
+        with open(self.dataset_path, mode="w") as file:
+            file.write("\n".join(lines) + "\n")
+        with open(self.dataset_path, mode="rb") as file:
+            self.sha256 = hashlib.sha256(file.read()).hexdigest()
+
+        self.server = StandInServer(cassette_dir=os.path.join(self.tmp_dir.name, "cassette")).start()
+        self.server.dataset_path = self.dataset_path
+        transport.configure(base_url=self.server.url)
+        self.env = patch.dict(os.environ, {"SYSYPHUS_CACHE_DIR": os.path.join(self.tmp_dir.name, "cache")})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        transport.reset()
+        self.server.stop()
+        self.tmp_dir.cleanup()
+
+    def test_get_remote_data(self):
+        stats = Stats()
+        df = remote_load.get_remote_data(stats=stats)
+
+        self.assertEqual(len(df), 1000)
+        self.assertEqual(df["numeric_id"].iloc[-1], 999)
+        self.assertEqual(stats.counters["bytes"], os.path.getsize(self.dataset_path))  # decoded size
+
+        filepath = os.path.join(remote_load.download_dir(), "metbull_data.json")
+        with open(f"{filepath}.sha256", mode="r") as file:
+            self.assertEqual(file.read(), self.sha256)
+        files = sorted(os.listdir(remote_load.download_dir()))  # no temporary file left
+        self.assertEqual(files, ["metbull_data.json", "metbull_data.json.sha256"])
+
+    def test_checksum_mismatch(self):
+        filepath = os.path.join(self.tmp_dir.name, "download.json")
+        url = f"{remote_load.DATASETS_URL}metbull_data.json"
+
+        self.assertEqual(remote_load.download_dataset(url=url, filepath=filepath, sha256=self.sha256), self.sha256)
+        os.remove(filepath)
+        with self.assertRaises(ValueError):
+            remote_load.download_dataset(url=url, filepath=filepath, sha256="0" * 64)
+        self.assertFalse(os.path.exists(filepath))
+        self.assertFalse([name for name in os.listdir(self.tmp_dir.name) if name.endswith(".part")])
+
+    def test_manifest_checksum_is_verified_and_reused(self):
+        cassette = transport.Cassette(os.path.join(self.tmp_dir.name, "cassette"))
+        self.server.cassette = cassette
+
+        def publish(sha256):
+            manifest = {"version": "2026-10", "deltas": [], "checksums": {"metbull_data.json": sha256}}
+            cassette.put(url=f"{remote_load.DATASETS_URL}manifest.json", status=200,
+                         headers={"Content-Type": "application/json"}, body=json.dumps(manifest).encode("utf-8"))
+
+        publish("0" * 64)
+        with self.assertRaises(ValueError):
+            remote_load.get_remote_data(manifest=remote_load.fetch_manifest())
+
+        publish(self.sha256)
+        manifest = remote_load.fetch_manifest()
+        self.assertEqual(len(remote_load.get_remote_data(manifest=manifest)), 1000)
+        stats = Stats()
+        self.assertEqual(len(remote_load.get_remote_data(stats=stats, manifest=manifest)), 1000)
+        self.assertEqual(stats.counters["download_reused"], 1)
+        self.assertNotIn("download", stats.stages)
+
+        stats = Stats()  # no manifest given : none is fetched, the file is downloaded again
+        self.assertEqual(len(remote_load.get_remote_data(stats=stats)), 1000)
+        self.assertIn("download", stats.stages)
+        self.assertNotIn("download_reused", stats.counters)
+
+    def test_read_dataset_by_chunks(self):
+        with open(self.dataset_path, mode="a") as file:
+            file.write('{"name": "Aachen", "numeric_id": 1, "mass": null, "fall": "Fell"}\n')
+        expected = pd.read_json(self.dataset_path, orient="records", lines=True)
+        with patch.object(remote_load, "PARSE_CHUNK_ROWS", 64):
+            df = remote_load.read_dataset(self.dataset_path)
+        pd.testing.assert_frame_equal(df, expected)
+
 if __name__ == '__main__':
     unittest.main()
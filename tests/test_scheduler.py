@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from sysyphus.scripts import scheduler, transport
+from sysyphus.scripts.scheduler import Scheduler
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+def wait_until(condition: callable, timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.001)
+
+
+def test_budget_is_shared_by_every_job():
+    shared = Scheduler(budget=3)
+    running, peak, lock = [0], [0], threading.Lock()
+
+    def request(job):
+        with shared.slot(job):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.005)
+            with lock:
+                running[0] -= 1
+
+    with shared.job("a") as first, shared.job("b", priority="bulk") as second:
+        threads = [threading.Thread(target=request, args=(job,)) for job in [first, second] for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert first.granted == second.granted == 10
+    assert peak[0] == 3
+    assert shared.jobs() == []
+
+
+def granted_order(shared: Scheduler, jobs: list, per_job: int) -> list:
+    """Holds the only slot while every request queues, then returns the order in which they were served."""
+    order, threads = [], []
+    blocker = scheduler.Job(name="blocker", priority=0)
+    shared.acquire(blocker)
+
+    def request(job):
+        with shared.slot(job):
+            order.append(job.name)
+
+    for job in jobs:
+        for _ in range(per_job):
+            threads.append(threading.Thread(target=request, args=(job,)))
+            threads[-1].start()
+            wait_until(lambda: sum(job.waiting for job in jobs) == len(threads))
+    shared.release(blocker)
+    for thread in threads:
+        thread.join()
+    return order
+
+
+def test_interactive_jobs_go_first():
+    shared = Scheduler(budget=1)
+    with shared.job("sweep", priority="bulk") as sweep, shared.job("lookup", priority="interactive") as lookup:
+        assert granted_order(shared, [sweep, lookup], per_job=3) == ["lookup"] * 3 + ["sweep"] * 3
+
+
+def test_jobs_of_same_priority_take_turns():
+    shared = Scheduler(budget=1)
+    with shared.job("a") as first, shared.job("b") as second:
+        assert granted_order(shared, [first, second], per_job=3) == ["a", "b"] * 3
+
+
+def test_promoted_job_overtakes_the_queue():
+    shared = Scheduler(budget=1)
+    blocker = scheduler.Job(name="blocker", priority=0)
+    shared.acquire(blocker)
+    order = []
+
+    def request(job):
+        with shared.slot(job):
+            order.append(job.name)
+
+    with shared.job("sweep", priority="bulk") as sweep, shared.job("prefetch", priority="background") as prefetch:
+        threads = [threading.Thread(target=request, args=(job,)) for job in [sweep, prefetch]]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: sweep.waiting == prefetch.waiting == 1)
+        shared.set_priority(prefetch, "interactive")  # e.g. request_metbull joins the page it waits for
+        shared.release(blocker)
+        for thread in threads:
+            thread.join()
+    assert order == ["prefetch", "sweep"]
+
+
+def test_transport_requests_use_the_thread_job(tmp_path):
+    url = "https://www.lpi.usra.edu/meteor/metbull.php?code=1"
+    cassette = transport.Cassette(str(tmp_path))
+    cassette.put(url=url, status=200, headers={}, body=render_page("Aachen", {}).encode("utf-8"))
+    try:
+        with StandInServer(cassette_dir=str(tmp_path)) as server:
+            transport.configure(base_url=server.url)
+            with scheduler.get_scheduler().job("test", priority="interactive") as job:
+                assert scheduler.run_as(job, transport.fetch, url).status_code == 200
+                assert job.granted == 1 and job.in_flight == 0
+            assert scheduler.current_job().name == "default"
+    finally:
+        transport.reset()
+
+    with pytest.raises(ValueError):
+        scheduler.as_priority("urgent")
+
+
+def test_streamed_bodies_hold_their_slot(tmp_path):
+    urls = [f"https://www.lpi.usra.edu/meteor/metbull.php?code={code}" for code in range(8)]
+    cassette = transport.Cassette(str(tmp_path))
+    for url in urls:
+        cassette.put(url=url, status=200, headers={}, body=render_page("Aachen", {}).encode("utf-8"))
+    shared = scheduler.get_scheduler()
+    budget = shared.budget
+    reading, peak, lock = [0], [0], threading.Lock()
+
+    def download(url):
+        response = transport.fetch(url, stream=True)
+        with lock:
+            reading[0] += 1
+            peak[0] = max(peak[0], reading[0])
+        time.sleep(0.02)  # a slow body transfer
+        body = b"".join(response.iter_content(chunk_size=1024))
+        with lock:
+            reading[0] -= 1
+        response.close()
+        assert body
+
+    try:
+        shared.set_budget(2)
+        with StandInServer(cassette_dir=str(tmp_path)) as server:
+            transport.configure(base_url=server.url)
+            threads = [threading.Thread(target=download, args=(url,)) for url in urls]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+    finally:
+        shared.set_budget(budget)
+        transport.reset()
+
+    assert peak[0] == 2  # bodies read concurrently, not only requests waiting for headers
+    assert shared.active == 0
@@ -0,0 +1,84 @@
+import sqlite3
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import metrics, transport
+from sysyphus.scripts import user_requests as u_requests
+from sysyphus.scripts.scrape_cache import ScrapeCache
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+def make_meteorite(url: str, stats: metrics.Stats = None) -> Meteorite:
+    return Meteorite(name="Aachen", year="1880", country="Germany", type="L5", mass="21", url=url, stats=stats)
+
+
+def test_put_get_and_hydrate(tmp_path):
+    cache = ScrapeCache(path=str(tmp_path / "cache.sqlite"))
+    scraped = make_meteorite("https://example.com/1")
+    scraped.pieces = "2"
+    scraped.coordinates = (50.775, 6.083)
+    scraped.extracted = True
+    cache.put_many([scraped, make_meteorite("https://example.com/2")])  # the second one was never extracted
+
+    assert len(cache) == 1
+    assert "https://example.com/1" in cache
+    assert cache.get("https://example.com/1")["pieces"] == "2"
+
+    fresh = [make_meteorite("https://example.com/1"), make_meteorite("https://example.com/3")]
+    missing = cache.hydrate(fresh)
+
+    assert [meteorite.url for meteorite in missing] == ["https://example.com/3"]
+    assert fresh[0].coordinates == (50.775, 6.083)
+    assert fresh[0].extracted
+
+
+def test_old_caches_get_the_validator_columns(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.execute("CREATE TABLE pages (url TEXT PRIMARY KEY, name TEXT, properties TEXT, fetched_at REAL)")
+        connection.execute("INSERT INTO pages VALUES ('https://example.com/1', 'Aachen', '{\"pieces\": \"2\"}', 0)")
+    connection.close()
+
+    cache = ScrapeCache(path=path)
+    assert cache.get("https://example.com/1") == {"pieces": "2"}
+    assert cache.validators(["https://example.com/1"]) == {
+        "https://example.com/1": {"etag": None, "last_modified": None, "content_hash": None},
+    }
+    assert cache.urls(fetched_before=1) == ["https://example.com/1"]
+    assert cache.urls(fetched_before=0) == []
+
+
+def test_refresh_only_parses_changed_pages(tmp_path):
+    urls = [f"https://www.lpi.usra.edu/meteor/metbull.php?code={code}" for code in [1, 2]]
+    cassette = transport.Cassette(str(tmp_path / "cassette"))
+    for url in urls:
+        cassette.put(url=url, status=200, headers={}, body=render_page("Aachen", {"Pieces:": "1"}).encode("utf-8"))
+    cache = ScrapeCache(path=str(tmp_path / "cache.sqlite"))
+    try:
+        with StandInServer(cassette_dir=str(tmp_path / "cassette")) as server:
+            transport.configure(base_url=server.url)
+            u_requests.request_cached([make_meteorite(url) for url in urls], cache=cache)
+            assert all(validators["etag"] for validators in cache.validators(urls).values())
+
+            server.cassette.put(url=urls[1], status=200, headers={},
+                                body=render_page("Aachen", {"Pieces:": "5"}).encode("utf-8"))
+            stats = metrics.Stats()
+            meteorites = [make_meteorite(url, stats=stats) for url in urls]
+            summary = u_requests.refresh_cached(meteorites, cache=cache, stats=stats)
+            assert summary == {"refreshed": 2, "changed": [urls[1]], "unchanged": 1, "failed": 0}
+            assert stats.counters["not_modified"] == 1
+            assert stats.stages["html_parse"].count == 1
+            assert cache.get(urls[1])["pieces"] == "5"
+
+            with sqlite3.connect(cache.path) as connection:  # a server without validators : the hash decides
+                connection.execute("UPDATE pages SET etag = NULL")
+            stats = metrics.Stats()
+            refreshed = [make_meteorite(url, stats=stats) for url in urls]
+            summary = u_requests.refresh_cached(refreshed, cache=cache, stats=stats)
+            assert summary["unchanged"] == 2 and stats.counters["unchanged_pages"] == 2
+            assert "html_parse" not in stats.stages
+            assert [meteorite.pieces for meteorite in refreshed] == ["1", "5"]
+            assert all(validators["etag"] for validators in cache.validators(urls).values())
+    finally:
+        transport.reset()
+        cache.close()
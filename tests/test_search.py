@@ -2,6 +2,8 @@ import pandas as pd
 import pytest
 
 from sysyphus.scripts.search import (
+    apply_filters,
+    build_parameters,
     search_by_name,
     search_by_type,
     search_by_country,
@@ -124,3 +126,20 @@ def test_validate_mtype():
     mtype, message = validate_mtype("", validation_file="sysyphus/utils/type_validation.json")
     assert mtype is None
     assert "blank selected" in message
+
+
+def test_apply_filters(sample_dataframe):
+    result = apply_filters(sample_dataframe, {"namespace": "Meteorite", "numeric_range": [100, 200], "type": "type2"})
+    assert result["name"].tolist() == ["Meteorite2"]
+
+    # An empty step ends the search with an empty DataFrame rather than an error message
+    assert apply_filters(sample_dataframe, {"namespace": "Meteorite", "country": "Country4"}).empty
+    assert list(sample_dataframe.columns) == ["name", "numeric_id", "type", "country"]
+
+
+def test_build_parameters():
+    assert build_parameters(name="Catalina", numeric_range=(600, 550), country="Chile") == {
+        "namespace": "Catalina", "numeric_range": [550, 600], "country": "chile"
+    }
+    with pytest.raises(ValueError):
+        build_parameters(name="C")
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import transport
+from sysyphus.scripts.metrics import Stats
+from sysyphus.scripts.singleflight import SingleFlight
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+def run_threads(target, count: int) -> list:
+    results = [None] * count
+
+    def worker(index):
+        results[index] = target()
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight()
+    calls = []
+
+    def slow(value):
+        calls.append(value)
+        time.sleep(0.1)
+        return value * 2
+
+    results = run_threads(lambda: flight.do("key", slow, 21), count=8)
+    assert len(calls) == 1
+    assert [result for result, _ in results] == [42] * 8
+    assert sum(shared for _, shared in results) == 7 == flight.coalesced
+    assert flight.in_flight() == []
+
+    flight.do("key", slow, 1)  # landed flights are not cached
+    assert len(calls) == 2
+
+
+def test_exceptions_reach_every_caller():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("boom")
+
+    def call():
+        try:
+            flight.do("key", failing)
+        except RuntimeError as e:
+            return str(e)
+
+    assert run_threads(call, count=4) == ["boom"] * 4
+
+
+def test_async_and_threads_share_flights():
+    flight = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "page"
+
+    async def main():
+        thread = threading.Thread(target=flight.do, args=("key", slow))
+        thread.start()
+        await asyncio.sleep(0.02)
+        results = await asyncio.gather(*[flight.do_async("key", slow) for _ in range(5)])
+        thread.join()
+        return results
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [("page", True)] * 5
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_meteorites_coalesce_page_requests(tmp_path, use_async):
+    url = "https://www.lpi.usra.edu/meteor/metbull.php?code=52"
+    cassette = transport.Cassette(str(tmp_path))
+    cassette.put(url=url, status=200, headers={"Content-Type": "text/html"},
+                 body=render_page("Allende", {"Pieces:": "many"}).encode("utf-8"))
+
+    stats = Stats()
+    meteorites = [
+        Meteorite(name="Allende", year=1969, country="Mexico", type="CV3", mass="2 t", url=url, stats=stats)
+        for _ in range(6)
+    ]
+    with StandInServer(cassette_dir=str(tmp_path), latency=0.2) as server:
+        transport.configure(base_url=server.url)
+        try:
+            if use_async:
+                async def main():
+                    await asyncio.gather(*[meteorite.extract_properties_async() for meteorite in meteorites])
+                asyncio.run(main())
+            else:
+                pending = list(meteorites)
+                run_threads(lambda: pending.pop().extract_properties(), count=6)
+        finally:
+            transport.reset()
+
+    assert server.hits == {200: 1}
+    assert [meteorite.pieces for meteorite in meteorites] == ["many"] * 6
+    assert stats.counters["coalesced"] == 5
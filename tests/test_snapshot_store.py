@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from conftest import sample_dataset  # noqa: E402
+from sysyphus.models.boulder import Boulder  # noqa: E402
+from sysyphus.scripts import datasets, delta, snapshot_store, vocabulary  # noqa: E402
+
+
+@pytest.fixture
+def months():
+    """Three monthly versions : a type changed, then a row removed and one added."""
+    first = sample_dataset().astype({"numeric_id": "Int64", "year": "Int64"})
+    second = first.copy()
+    second.loc[second["name"] == "Aachen", "type"] = "L6"
+    third = pd.concat([second[second["name"] != "Catalina 508"], pd.DataFrame([{
+        "name": "Catalina 700", "year": 2023, "country": "Chile", "type": "H4", "mass": 12.0,
+        "URL": "https://www.lpi.usra.edu/meteor/metbull.php?code=700", "numeric_id": 700,
+    }])], ignore_index=True).astype({"numeric_id": "Int64", "year": "Int64"})
+    return {"2026-01": first, "2026-02": second, "2026-03": third}
+
+
+def test_versions_are_deduplicated(months, tmp_path):
+    directory = str(tmp_path / "history")
+    entries = [snapshot_store.add(df, version, directory=directory) for version, df in months.items()]
+    assert [entry["new_rows"] for entry in entries] == [5, 1, 1]
+    assert snapshot_store.add(months["2026-03"], "2026-03", directory=directory)["new_rows"] == 1  # already stored
+
+    usage = snapshot_store.disk_usage(directory)
+    assert usage["versions"] == 3 and usage["stored_rows"] == 7 and usage["version_rows"] == 15
+
+    for version, df in months.items():
+        opened, opened_version = snapshot_store.open_version(version, directory=directory)
+        assert opened_version == version
+        assert delta.is_empty(delta.compute_delta(opened, df))
+        assert opened["numeric_id"].dtype == "Int64"
+        assert opened["name"].tolist() == df["name"].tolist()  # row order kept
+
+
+def test_resolve_remove_and_compact(months, tmp_path):
+    directory = str(tmp_path / "history")
+    for version, df in months.items():
+        snapshot_store.add(df, version, directory=directory)
+
+    assert snapshot_store.resolve("2026-02-17", directory=directory) == "2026-02"
+    assert snapshot_store.resolve("2030", directory=directory) == "2026-03"
+    with pytest.raises(ValueError):
+        snapshot_store.resolve("2025-12", directory=directory)
+
+    snapshot_store.remove("2026-01", directory=directory)
+    assert snapshot_store.versions(directory) == ["2026-02", "2026-03"]
+    assert snapshot_store.compact(directory=directory) == 1  # Aachen's old type
+    assert snapshot_store.compact(directory=directory) == 0
+    opened, _ = snapshot_store.open_version("2026-03", directory=directory)
+    assert delta.is_empty(delta.compute_delta(opened, months["2026-03"]))
+
+    with pytest.raises(ValueError):
+        snapshot_store.add(months["2026-03"].drop(columns=["mass"]), "2026-04", directory=directory)
+
+
+def test_boulder_as_of(months, tmp_path, monkeypatch):
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path / "cache"))
+    for version, df in months.items():
+        snapshot_store.add(df, version)
+    latest = vocabulary.Vocabulary(["L6", "H5"])
+    vocabulary.register("type", latest)
+    try:
+        boulder = Boulder(as_of="2026-02")
+        assert boulder.dataset_version == "2026-02" and not boulder.shared
+        assert boulder.search(name="Aachen")["type"].tolist() == ["L6"]
+        assert "type_group" in boulder.sy_df.columns
+        assert not datasets.is_loaded()
+        assert vocabulary.get_vocabulary("type") is latest  # the latest dataset's, used by every other Boulder
+    finally:
+        datasets.clear()
+        vocabulary._registry.clear()
+
+
+def test_compact_twice_in_a_row(months, tmp_path):
+    directory = str(tmp_path / "history")
+    first = months["2026-01"]
+    snapshot_store.add(first, "v1", directory=directory)
+    snapshot_store.add(first.iloc[:4], "v2", directory=directory)
+    snapshot_store.remove("v1", directory=directory)
+    assert snapshot_store.compact(directory=directory) == 1
+    snapshot_store.add(first.iloc[:3], "v3", directory=directory)
+    snapshot_store.remove("v2", directory=directory)
+    assert snapshot_store.compact(directory=directory) == 1
+
+    opened, _ = snapshot_store.open_version("v3", directory=directory)
+    assert opened["name"].tolist() == first["name"].iloc[:3].tolist()
+    segments = sorted(path.name for path in (tmp_path / "history" / "segments").iterdir())
+    assert segments == [segment["file"] for segment in snapshot_store.read_index(directory)["segments"]]
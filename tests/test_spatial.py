@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import classification, delta, remote_load
+from sysyphus.scripts.scrape_cache import ScrapeCache
+from sysyphus.scripts.spatial import SpatialIndex, haversine
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(7)
+    latitudes = rng.uniform(-89, 89, 5000)
+    longitudes = rng.uniform(-180, 180, 5000)
+    latitudes[:3] = np.nan  # missing coordinates are skipped
+    return [f"m{i}" for i in range(5000)], latitudes, longitudes
+
+
+@pytest.mark.parametrize("latitude, longitude, radius_km", [
+    (-25.1, -69.9, 800), (0, 179.9, 1500), (88, 10, 600), (45, 3, 5000),
+])
+def test_radius_matches_brute_force(points, latitude, longitude, radius_km):
+    keys, latitudes, longitudes = points
+    index = SpatialIndex(keys, latitudes, longitudes)
+    result = index.radius(latitude, longitude, radius_km)
+
+    distances = haversine(latitude, longitude, latitudes, longitudes)
+    expected = {key for key, distance in zip(keys, distances) if distance <= radius_km}
+    assert set(result.index) == expected
+    assert result["distance_km"].is_monotonic_increasing
+
+
+def test_nearest_and_bbox(points):
+    keys, latitudes, longitudes = points
+    index = SpatialIndex(keys, latitudes, longitudes, cell_deg=2)
+    assert len(index) == 4997
+
+    nearest = index.nearest(-25.1, -69.9, k=7)
+    distances = pd.Series(haversine(-25.1, -69.9, latitudes, longitudes), index=keys).dropna()
+    assert list(nearest.index) == list(distances.sort_values().index[:7])
+
+    box = index.bbox(-30, 170, -10, -170)  # crosses the antimeridian
+    inside = (latitudes >= -30) & (latitudes <= -10) & ((longitudes >= 170) | (longitudes <= -170))
+    assert set(box.index) == set(np.asarray(keys)[inside])
+
+
+def test_from_frame():
+    df = pd.DataFrame({"coordinates": [(-25.08, -69.93), None, (19.02, 54.56)]}, index=["a", "b", "c"])
+    index = SpatialIndex.from_frame(df)
+    assert list(index.nearest(19, 54, k=5).index) == ["c", "a"]
+
+
+def test_boulder_spatial_search(offline_boulder):
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    offline_boulder.search(name="Dhofar")
+    offline_boulder.request_metbull()  # the index covers the current selection only, without scrape cache
+
+    near_dhofar = offline_boulder.spatial_search(latitude=19, longitude=54.5, radius_km=50)
+    assert near_dhofar["name"].tolist() == ["Dhofar 1001"]
+    assert offline_boulder.spatial_search(latitude=19, longitude=54.5, k=3, country="Chile").empty
+
+    with pytest.raises(ValueError):
+        offline_boulder.spatial_search(latitude=19, longitude=54.5)
+
+
+def test_index_covers_the_scrape_cache(offline_boulder, tmp_path):
+    offline_boulder.scrape_cache = ScrapeCache(path=str(tmp_path / "scrape_cache.sqlite"))
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    offline_boulder.search(name="Dhofar")
+    offline_boulder.request_metbull()
+
+    nearest = offline_boulder.spatial_search(latitude=-25.1, longitude=-69.9, k=2)
+    assert nearest["name"].tolist() == ["Catalina 508", "Catalina 503"]
+    assert offline_boulder.spatial_search(bbox=(-26, -70, -25, -69))["name"].nunique() == 3
+
+
+def test_refresh_dataset_drops_the_index(offline_boulder, tmp_path, monkeypatch):
+    offline_boulder.scrape_cache = ScrapeCache(path=str(tmp_path / "scrape_cache.sqlite"))
+    offline_boulder.search(name="Catalina")
+    offline_boulder.request_metbull()
+    changed_url = offline_boulder.selected_meteorites.set_index("name").loc["Catalina 508", "URL"]
+    offline_boulder.dump_search()  # served by the scrape cache only
+    assert changed_url in offline_boulder.get_spatial_index().keys
+
+    base = classification.drop_columns(offline_boulder.sy_df)
+    new = base.copy()
+    new.loc[new["name"] == "Catalina 508", "mass"] = 1.0  # its page, coordinates included, may have changed too
+    row_delta = delta.compute_delta(base, new)
+    offline_boulder.dataset_version = "2026-09"
+    monkeypatch.setattr(remote_load, "fetch_manifest", lambda: {"version": "2026-10", "deltas": []})
+    monkeypatch.setattr(remote_load, "fetch_deltas", lambda **kwargs: [row_delta])
+    assert offline_boulder.refresh_dataset()["changed"] == 1
+
+    assert changed_url not in offline_boulder.get_spatial_index().keys  # rebuilt without the stale coordinates
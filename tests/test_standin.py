@@ -0,0 +1,36 @@
+import requests
+
+from sysyphus.scripts.standin import StandInServer, render_page
+from sysyphus.scripts.transport import Cassette
+
+
+def test_render_page():
+    page = render_page("Aachen", {"Pieces:": "1"})
+    assert 'id="maintable"' in page
+    assert "<td>Pieces:</td><td>1</td>" in page
+
+
+def test_serves_cassette_and_dataset(tmp_path):
+    cassette = Cassette(str(tmp_path / "cassette"))
+    cassette.put(url="https://example.com/page?code=1", status=200, headers={}, body=b"<html></html>")
+    dataset = tmp_path / "metbull_data.json"
+    dataset.write_text('{"name": "Aachen"}\n')
+
+    with StandInServer(cassette_dir=str(tmp_path / "cassette"), dataset_path=str(dataset)) as server:
+        assert requests.get(f"{server.url}/page?code=1").content == b"<html></html>"
+        assert requests.get(f"{server.url}/page?code=2").status_code == 404
+        response = requests.get(f"{server.url}/main/datasets/metbull_data.json")
+        assert response.text == '{"name": "Aachen"}\n'
+        assert response.headers["Content-Encoding"] == "gzip"
+
+    assert server.hits == {200: 2, 404: 1}
+
+
+def test_error_injection_is_seeded(tmp_path):
+    statuses = []
+    for _ in range(2):
+        with StandInServer(cassette_dir=str(tmp_path), error_rate=0.5, seed=3) as server:
+            statuses.append([requests.get(f"{server.url}/x").status_code for _ in range(10)])
+
+    assert statuses[0] == statuses[1]
+    assert set(statuses[0]) == {404, 503}
@@ -0,0 +1,77 @@
+import os
+
+from collections import OrderedDict
+
+import pytest
+
+from conftest import sample_dataset
+from sysyphus.scripts import summaries
+from sysyphus.scripts.metrics import Stats
+
+
+@pytest.fixture
+def sy_df(tmp_path, monkeypatch):
+    monkeypatch.setenv("SYSYPHUS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(summaries, "_memory", OrderedDict())
+    return sample_dataset().astype({"numeric_id": "Int64", "year": "Int64"})
+
+
+def test_precomputed_tables(sy_df):
+    result = summaries.build(sy_df)
+    by_country = result.query(by="country", quantiles=True)
+
+    assert by_country.loc["Chile", "count"] == 3
+    assert by_country.loc["Chile", "mass_max"] == 327.0
+    assert by_country.loc["Chile", "mass_p50"] == 29.3
+    assert result.year_histogram(decade=True).loc[2010] == 2  # 2017, 2019
+    assert result.crosstab().loc["H5", "Oman"] == 1
+    assert result.crosstab("country", "type").loc["Oman", "H5"] == 1
+
+
+def test_filtered_queries_use_the_cube(sy_df):
+    result = summaries.build(sy_df)  # no dataset attached : a scan would raise
+    by_type = result.query(by="type", filters={"country": "chile", "decade": [2010, 2020]})
+
+    assert by_type["count"].to_dict() == {"H5": 1, "H6": 1, "L6": 1}
+    assert by_type.loc["L6", "mass_mean"] == 327.0
+    with pytest.raises(ValueError):
+        result.query(by="type", filters={"country": "Chile"}, quantiles=True)
+    with pytest.raises(ValueError):
+        result.query(by="mass")
+
+
+def test_scan_fallback(sy_df):
+    result = summaries.get(sy_df)
+    by_type = result.query(by="type", filters={"name": ["Catalina 501", "Dhofar 1001"]}, quantiles=True)
+    assert by_type.loc["H5", "count"] == 2
+    assert by_type.loc["H5", "mass_p95"] > 18.8
+
+
+def test_persisted_per_version(sy_df):
+    stats = Stats()
+    summaries.get(sy_df, version="2026-10", stats=stats)
+    assert os.path.exists(summaries.summaries_path("2026-10"))
+    assert stats.stages["summaries_build"].count == 1
+
+    summaries._memory.clear()  # new process : loaded from disk, not rebuilt
+    loaded = summaries.get(sy_df, version="2026-10", stats=stats)
+    assert stats.stages["summaries_build"].count == 1
+    assert loaded.query(by="country")["count"].sum() == len(sy_df)
+
+    summaries.get(sy_df, stats=stats)  # no version : keyed on the content
+    assert stats.stages["summaries_build"].count == 2
+
+
+def test_boulder_summarize(offline_boulder):
+    assert offline_boulder.summarize("country").loc["Oman", "count"] == 1
+    assert offline_boulder.summarize("decade", filters={"type": "H5"})["count"].sum() == 2
+
+
+def test_only_the_last_versions_stay_in_memory(sy_df):
+    for version in ["2026-08", "2026-09", "2026-10"]:
+        summaries.get(sy_df, version=version)
+    assert list(summaries._memory) == ["2026-09", "2026-10"]
+
+    summaries.get(sy_df, version="2026-09")  # used again : most recent
+    summaries.get(sy_df, version="2026-08")  # read back from its file
+    assert list(summaries._memory) == ["2026-09", "2026-08"]
@@ -0,0 +1,50 @@
+import json
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import metrics, transport
+from sysyphus.scripts.standin import render_page
+from sysyphus.scripts.tracing import Tracer
+from sysyphus.scripts.user_requests import request_selected
+
+
+def test_tracer_events():
+    stats = metrics.Stats()
+    tracer = Tracer().attach(stats)
+
+    with stats.timer("search", rows=3):
+        pass
+    stats.observe("queue_wait", 0.01, url="https://example.com")
+    tracer.detach(stats)
+    stats.observe("search", 0.01)
+
+    phases = [event["ph"] for event in tracer.events]
+    assert phases == ["X", "b", "e"]
+    assert tracer.events[0]["args"] == {"rows": 3}
+    assert tracer.events[1]["id"] == tracer.events[2]["id"]
+
+
+def test_trace_of_request_selected(tmp_path):
+    cassette = transport.Cassette(str(tmp_path / "cassette"))
+    stats = metrics.Stats()
+    meteorites = []
+    for code in range(4):
+        url = f"https://www.lpi.usra.edu/meteor/metbull.php?code={code}"
+        cassette.put(url=url, status=200, headers={}, body=render_page(str(code), {"Pieces:": "1"}).encode("utf-8"))
+        meteorites.append(Meteorite(name=str(code), year="2000", country="Oman", type="H5", mass="1", url=url,
+                                    stats=stats))
+
+    tracer = Tracer().attach(stats)
+    transport.configure(mode="replay", cassette_dir=str(tmp_path / "cassette"))
+    try:
+        request_selected(meteorites, rate_limiter=2)
+    finally:
+        transport.reset()
+
+    tracer.export(str(tmp_path / "trace.json"))
+    with open(tmp_path / "trace.json") as file:
+        trace = json.load(file)
+
+    names = [event["name"] for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert names.count("meteorite") == 4
+    assert names.count("http") == 4
+    assert any(event["ph"] == "M" for event in trace["traceEvents"])
@@ -0,0 +1,90 @@
+import time
+
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import transport
+from sysyphus.scripts.standin import StandInServer, render_page
+
+
+PAGE_URL = "https://www.lpi.usra.edu/meteor/metbull.php?code=1234"
+
+
+@pytest.fixture
+def cassette_dir(tmp_path):
+    cassette = transport.Cassette(str(tmp_path / "source"))
+    page = render_page("Catalina 501", {"Latitude:": "25°4'51.93\"S", "Longitude:": "69°55'46.79\"W"})
+    cassette.put(url=PAGE_URL, status=200, headers={"Content-Type": "text/html"}, body=page.encode("utf-8"))
+    return str(tmp_path / "source")
+
+
+@pytest.fixture(autouse=True)
+def reset_transport():
+    yield
+    transport.reset()
+
+
+def test_configure_rejects_invalid_options():
+    with pytest.raises(ValueError):
+        transport.configure(mode="whatever")
+    with pytest.raises(ValueError):
+        transport.configure(speed=12)
+    with pytest.raises(ValueError):
+        transport.configure(mode="replay")
+
+
+def test_rewrite_url():
+    transport.configure(base_url="http://127.0.0.1:8765")
+    assert transport.rewrite_url(PAGE_URL) == "http://127.0.0.1:8765/meteor/metbull.php?code=1234"
+    assert transport.is_local()
+
+
+def test_record_then_replay(cassette_dir, tmp_path):
+    recorded_dir = str(tmp_path / "recorded")
+
+    with StandInServer(cassette_dir=cassette_dir) as server:
+        transport.configure(mode="record", cassette_dir=recorded_dir, base_url=server.url)
+        response = transport.fetch(PAGE_URL)
+        assert response.status_code == 200
+
+    # Server is down, the page must come from the recording, keyed on the original url
+    transport.configure(mode="replay", cassette_dir=recorded_dir, base_url=None)
+    replayed = transport.fetch(PAGE_URL)
+    assert replayed.content == response.content
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        transport.fetch("https://www.lpi.usra.edu/meteor/metbull.php?code=1")
+
+
+def test_retries_on_throttling(cassette_dir):
+    with StandInServer(cassette_dir=cassette_dir, throttle_rate=1.0, retry_after=0) as server:
+        transport.configure(base_url=server.url, retries=2)
+        response = transport.fetch(PAGE_URL)
+
+    assert response.status_code == 429
+    assert server.hits[429] == 3
+
+
+def test_retry_after_is_capped():
+    def delay(value: str) -> float:
+        response = transport.make_response(url=PAGE_URL, status=429, headers={"Retry-After": value}, body=b"")
+        return transport.retry_delay(response, attempt=0)
+
+    transport.configure(max_retry_after=30)
+    assert delay("3600") == 30
+    assert delay("2") == 2
+    assert 3 < delay(formatdate(time.time() + 5, usegmt=True)) <= 5  # HTTP date form
+    assert delay(formatdate(time.time() - 60, usegmt=True)) == 0
+    assert delay("soon") == transport.get_config()["backoff"]  # unreadable : backoff
+
+
+def test_meteorite_extraction_in_replay(cassette_dir):
+    transport.configure(mode="replay", cassette_dir=cassette_dir)
+    meteorite = Meteorite(name="Catalina 501", year="2022", country="Chile", type="H5", mass="18.8", url=PAGE_URL)
+    meteorite.extract_properties()
+
+    assert meteorite.coordinates[0] == pytest.approx(-25.0810916, abs=1e-6)
+    assert meteorite.coordinates[1] == pytest.approx(-69.9296638, abs=1e-6)
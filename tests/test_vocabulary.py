@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from sysyphus.scripts import vocabulary
+from sysyphus.scripts.search import validate_country, validate_mtype
+from sysyphus.scripts.vocabulary import Vocabulary
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    yield
+    vocabulary._registry.clear()
+
+
+def test_vocabulary():
+    terms = Vocabulary(["Chile", " chile ", "China", "Costa  Rica", None, float("nan")])
+
+    assert len(terms) == 3
+    assert terms.validate("CHILE")
+    assert "costa rica" in terms
+    assert terms.canonicalize(" Costa Rica ") == "costa rica"
+    assert terms.canonicalize("Peru") is None
+    assert terms.complete("ch") == ["chile", "china"]
+    assert terms.complete("c", limit=1) == ["chile"]
+    assert terms.complete("x") == []
+
+
+def test_packaged_vocabulary():
+    assert vocabulary.get_vocabulary("country").validate("Oman")
+    assert vocabulary.get_vocabulary("type").validate("h5")
+    with pytest.raises(KeyError):
+        vocabulary.get_vocabulary("colour")
+
+
+def test_registered_dataset_vocabulary():
+    df = pd.DataFrame({"country": ["Narnia", None], "type": ["Unobtainium", "H5"]})
+    vocabulary.register_dataset(df)
+
+    assert validate_country("narnia") == ("narnia", None)
+    assert validate_mtype("Unobtainium") == ("unobtainium", None)
+
+    country, message = validate_country("Narn")
+    assert country is None
+    assert "did you mean: narnia" in message
@@ -0,0 +1,116 @@
+import os
+
+import pandas as pd
+import pytest
+
+from sysyphus.models.meteorite import Meteorite
+from sysyphus.scripts import writers
+
+
+@pytest.fixture
+def results():
+    """Looks like df_searched : one row per meteorite, indexed by name."""
+    return pd.DataFrame({
+        "name": ["Catalina 501", "Catalina 503", "Dhofar 1001"],
+        "type": ["H5", "H6", "H5"],
+        "fall_country": ["Chile", "Chile", "Oman"],
+        "fall_year": [2022, 2017, None],
+        "mass": [18.8, 29.3, 1200.0],
+    }).set_index("name")
+
+
+@pytest.mark.parametrize("file_format, compression", [
+    ("csv", None), ("csv", "gzip"), ("json", "bz2"), ("pickle", "xz"), ("parquet", "zstd"),
+])
+def test_save_formats(results, tmp_path, file_format, compression):
+    path = writers.save(results, filepath=str(tmp_path / "results"), file_format=file_format, compression=compression)
+    assert path.startswith(str(tmp_path / "results")) and os.path.exists(path)
+
+    stored = writers.as_table(writers.read_file(path, file_format, compression))
+    assert stored["name"].tolist() == results.index.tolist()
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".tmp")] == []
+
+
+def test_save_append_and_upsert(results, tmp_path):
+    filepath = str(tmp_path / "results")
+    writers.save(results, filepath=filepath)
+    writers.save(results.iloc[:1], filepath=filepath, mode="append")
+    assert len(pd.read_csv(f"{filepath}.csv")) == 4
+
+    update = results.iloc[:1].assign(mass=19.0)
+    writers.save(update, filepath=filepath, mode="upsert")
+    stored = pd.read_csv(f"{filepath}.csv")
+    assert len(stored) == 3
+    assert stored.set_index("name").loc["Catalina 501", "mass"] == 19.0
+
+
+def test_csv_keeps_the_index(results, tmp_path):
+    filepath = str(tmp_path / "results")
+    table = results.reset_index()  # unnamed index, still written like save_search always did
+    writers.save(table, filepath=filepath)
+    writers.save(table.iloc[:1], filepath=filepath, mode="append")
+    stored = pd.read_csv(f"{filepath}.csv", index_col=0)
+    assert stored.index.tolist() == [0, 1, 2, 3]
+    assert stored.columns.tolist() == table.columns.tolist()
+
+
+def test_atomic_write_keeps_previous_file(results, tmp_path):
+    path = writers.save(results, filepath=str(tmp_path / "results"))
+    with pytest.raises(RuntimeError):
+        with writers.atomic_path(path) as tmp_file:
+            with open(tmp_file, mode="w") as file:
+                file.write("partial")
+            raise RuntimeError("interrupted")
+
+    assert len(pd.read_csv(path)) == 3
+    assert os.listdir(tmp_path) == ["results.csv"]
+
+
+def test_invalid_options(results, tmp_path):
+    with pytest.raises(ValueError):
+        writers.save(results, filepath=str(tmp_path / "results"), compression="snappy")
+    with pytest.raises(ValueError):
+        writers.save(results, filepath=str(tmp_path / "results"), mode="merge")
+
+
+def test_partitioned(results, tmp_path):
+    directory = str(tmp_path / "archive")
+    written = writers.save_partitioned(results, directory=directory, partition_cols=["fall_country", "fall_year"])
+    assert len(written) == 3
+    assert os.path.isdir(os.path.join(directory, "fall_country=Chile", "fall_year=2022"))
+    assert os.path.isdir(os.path.join(directory, "fall_country=Oman", f"fall_year={writers.NULL_PARTITION}"))
+
+    writers.save_partitioned(results.iloc[:1], directory=directory, partition_cols=["fall_country", "fall_year"])
+    assert len(writers.read_partitioned(directory)) == 4  # appended
+
+    update = results.iloc[:1].assign(mass=19.0)
+    writers.save_partitioned(update, directory=directory, partition_cols=["fall_country", "fall_year"], mode="upsert")
+    stored = writers.read_partitioned(directory)
+    assert len(stored) == 3
+    assert stored.set_index("name").loc["Catalina 501", "mass"] == 19.0
+    assert stored["fall_year"].dtype == results["fall_year"].dtype
+
+    chile = writers.read_partitioned(directory, filters={"fall_country": "Chile", "fall_year": [2017, 2022]})
+    assert sorted(chile["name"]) == ["Catalina 501", "Catalina 503"]
+
+    with pytest.raises(ValueError):
+        writers.save_partitioned(results, directory=directory, partition_cols=["type"])
+
+
+def test_result_writer(tmp_path):
+    meteorites = []
+    for code in range(5):
+        meteorite = Meteorite(name=f"Catalina {code}", year=2020, country="Chile", type="H5", mass="1 g", url=str(code))
+        meteorite.load_record({"pieces": "1"})
+        meteorites.append(meteorite)
+
+    with writers.ResultWriter(directory=str(tmp_path), file_format="csv", compression="gzip", batch_size=2) as writer:
+        for meteorite in meteorites:
+            writer.add(meteorite)
+
+    assert writer.rows == 5
+    assert [os.path.basename(path) for path in writer.written] == [
+        "part-00000.csv.gz", "part-00001.csv.gz", "part-00002.csv.gz"
+    ]
+    stored = pd.concat(pd.read_csv(path) for path in writer.written)
+    assert stored["name"].tolist() == [meteorite.name for meteorite in meteorites]